@@ -0,0 +1,188 @@
+"""In-process cache of the most recent bars per (symbol, timeframe).
+
+Each entry is an app.bars column batch holding up to ``capacity`` of the newest
+stored bars, ascending by ts. Entries are filled on the first read that misses
+and kept current by the OHLC upserts, so repeated chart and strategy reads do
+not touch Postgres. Cold pairs are evicted LRU once either the pair count or
+the byte budget is exceeded.
+
+The cache lives on the event loop thread and takes no locks.
+"""
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from app.bars import BAR_FIELDS, columns_len, columns_to_rows, dedupe_columns
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)) or default)
+    except Exception:
+        return default
+
+
+def _slice(cols: dict, start: int) -> dict:
+    out = {"symbol": cols["symbol"], "timeframe": cols["timeframe"]}
+    for name in BAR_FIELDS:
+        out[name] = cols[name][start:].copy()
+    return out
+
+
+def _nbytes(cols: dict) -> int:
+    return sum(int(cols[name].nbytes) for name in BAR_FIELDS)
+
+
+class _Entry:
+    __slots__ = ("cols", "complete", "nbytes")
+
+    def __init__(self, cols: dict, complete: bool) -> None:
+        self.cols = cols
+        # True when the table held fewer bars than we asked for, i.e. this is the full history.
+        self.complete = complete
+        self.nbytes = _nbytes(cols)
+
+
+class BarCache:
+    """Ring buffer of recent bars per pair with LRU eviction and hit counters."""
+
+    def __init__(
+        self,
+        *,
+        capacity: int | None = None,
+        max_pairs: int | None = None,
+        max_bytes: int | None = None,
+    ) -> None:
+        self.capacity = capacity if capacity is not None else _env_int("BAR_CACHE_BARS", 2000)
+        self.max_pairs = max_pairs if max_pairs is not None else _env_int("BAR_CACHE_MAX_PAIRS", 64)
+        self.max_bytes = max_bytes if max_bytes is not None else _env_int("BAR_CACHE_MAX_MB", 64) * 1024 * 1024
+        self._entries: "OrderedDict[tuple[str, str], _Entry]" = OrderedDict()
+        # Bumped on every write to a pair; a populate that raced with a write is discarded.
+        self._versions: dict[tuple[str, str], int] = {}
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0 and self.max_pairs > 0
+
+    # --- Reads ---
+
+    def get_columns(self, symbol: str, timeframe: str, limit: int) -> dict | None:
+        """Newest ``limit`` bars as a column batch (copies), or None on a miss."""
+        key = (symbol, timeframe)
+        entry = self._entries.get(key)
+        if entry is None or limit > self.capacity:
+            self.misses += 1
+            return None
+        n = columns_len(entry.cols)
+        if n < limit and not entry.complete:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return _slice(entry.cols, max(0, n - limit))
+
+    def get_rows(self, symbol: str, timeframe: str, limit: int) -> list[dict] | None:
+        """Same as ``get_columns`` but in the ``fetch_ohlc_bars`` row shape."""
+        cols = self.get_columns(symbol, timeframe, limit)
+        if cols is None:
+            return None
+        return columns_to_rows(cols, iso_ts=True)
+
+    def window_marker(self, symbol: str, timeframe: str, limit: int) -> tuple[int, int | None] | None:
+        """(bar count, last epoch ts) of the newest ``limit`` bars, or None on a miss."""
+        entry = self._entries.get((symbol, timeframe))
+        if entry is None or limit > self.capacity:
+            return None
+        n = columns_len(entry.cols)
+        if n < limit and not entry.complete:
+            return None
+        self._entries.move_to_end((symbol, timeframe))
+        self.hits += 1
+        return min(n, limit), (int(entry.cols["ts"][-1]) if n else None)
+
+    # --- Writes ---
+
+    def version(self, symbol: str, timeframe: str) -> int:
+        return self._versions.get((symbol, timeframe), 0)
+
+    def populate(self, cols: dict, *, requested: int, version: int) -> None:
+        """Store bars read from the database (ascending), unless a write raced the read."""
+        if not self.enabled:
+            return
+        key = (cols["symbol"], cols["timeframe"])
+        if self._versions.get(key, 0) != version:
+            return
+        n = columns_len(cols)
+        complete = n < requested
+        if n > self.capacity:
+            cols = _slice(cols, n - self.capacity)
+            complete = False
+        self._store(key, _Entry(cols, complete))
+
+    def apply(self, cols: dict) -> None:
+        """Merge freshly upserted bars into a cached pair (no-op if not cached)."""
+        if columns_len(cols) == 0:
+            return
+        key = (cols["symbol"], cols["timeframe"])
+        self._versions[key] = self._versions.get(key, 0) + 1
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        incoming = cols
+        if not entry.complete and columns_len(entry.cols):
+            # Older than the buffer: would leave a gap, and is not "recent" anyway.
+            keep = incoming["ts"] >= entry.cols["ts"][0]
+            if not keep.all():
+                incoming = {"symbol": key[0], "timeframe": key[1], **{f: incoming[f][keep] for f in BAR_FIELDS}}
+        if columns_len(incoming) == 0:
+            return
+        merged = {"symbol": key[0], "timeframe": key[1]}
+        for name in BAR_FIELDS:
+            merged[name] = np.concatenate([entry.cols[name], np.asarray(incoming[name], dtype=entry.cols[name].dtype)])
+        merged = dedupe_columns(merged)
+        n = columns_len(merged)
+        complete = entry.complete
+        if n > self.capacity:
+            merged = _slice(merged, n - self.capacity)
+            complete = False
+        self._store(key, _Entry(merged, complete))
+
+    def invalidate(self, symbol: str | None = None, timeframe: str | None = None) -> None:
+        """Drop cached pairs matching the given symbol/timeframe (all when omitted)."""
+        for key in list(self._entries):
+            if (symbol is None or key[0] == symbol) and (timeframe is None or key[1] == timeframe):
+                self._versions[key] = self._versions.get(key, 0) + 1
+                self._bytes -= self._entries.pop(key).nbytes
+
+    def _store(self, key: tuple[str, str], entry: _Entry) -> None:
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old.nbytes
+        self._entries[key] = entry
+        self._bytes += entry.nbytes
+        while self._entries and (len(self._entries) > self.max_pairs or self._bytes > self.max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "capacity": self.capacity,
+            "pairs": len(self._entries),
+            "max_pairs": self.max_pairs,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else None,
+            "evictions": self.evictions,
+        }
+
+
+bar_cache = BarCache()
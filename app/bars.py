@@ -0,0 +1,190 @@
+"""Columnar OHLC bar batches.
+
+A batch is a plain dict holding the symbol/timeframe and one numpy array per
+field, all the same length:
+
+    {"symbol": "XAUUSD", "timeframe": "H1",
+     "ts": int64 epoch seconds (UTC), "open"/"high"/"low"/"close": float64,
+     "tick_volume"/"spread"/"real_volume": int64}
+
+MT5 rate arrays convert to this form without a per-bar Python loop; the
+list-of-dicts shape used by older call sites is available as a view via
+`columns_to_rows`.
+"""
+from datetime import datetime, timezone
+
+import numpy as np
+
+PRICE_FIELDS = ("open", "high", "low", "close")
+VOLUME_FIELDS = ("tick_volume", "spread", "real_volume")
+BAR_FIELDS = ("ts",) + PRICE_FIELDS + VOLUME_FIELDS
+
+
+def empty_columns(symbol: str, timeframe: str) -> dict:
+    cols: dict = {"symbol": symbol, "timeframe": timeframe, "ts": np.empty(0, dtype=np.int64)}
+    for name in PRICE_FIELDS:
+        cols[name] = np.empty(0, dtype=np.float64)
+    for name in VOLUME_FIELDS:
+        cols[name] = np.empty(0, dtype=np.int64)
+    return cols
+
+
+def columns_len(cols: dict | None) -> int:
+    if not cols:
+        return 0
+    ts = cols.get("ts")
+    return 0 if ts is None else int(len(ts))
+
+
+def rates_to_columns(rates, symbol: str, timeframe: str) -> dict:
+    """Convert an MT5 ``copy_rates_*`` structured array into columns in bulk."""
+    if rates is None or len(rates) == 0:
+        return empty_columns(symbol, timeframe)
+    names = set(getattr(rates, "dtype", None).names or [])
+    n = len(rates)
+    cols: dict = {
+        "symbol": symbol,
+        "timeframe": timeframe,
+        "ts": np.asarray(rates["time"], dtype=np.int64),
+    }
+    for name in PRICE_FIELDS:
+        cols[name] = np.asarray(rates[name], dtype=np.float64)
+    for name in VOLUME_FIELDS:
+        cols[name] = np.asarray(rates[name], dtype=np.int64) if name in names else np.zeros(n, dtype=np.int64)
+    return cols
+
+
+def rows_to_columns(rows: list[dict], symbol: str, timeframe: str) -> dict:
+    """Build columns from bar dicts (ts as datetime or ISO string)."""
+    if not rows:
+        return empty_columns(symbol, timeframe)
+    ts = []
+    for r in rows:
+        t = r["ts"]
+        if isinstance(t, str):
+            t = datetime.fromisoformat(t)
+        if t.tzinfo is None:
+            t = t.replace(tzinfo=timezone.utc)
+        ts.append(int(t.timestamp()))
+    cols: dict = {"symbol": symbol, "timeframe": timeframe, "ts": np.asarray(ts, dtype=np.int64)}
+    for name in PRICE_FIELDS:
+        cols[name] = np.asarray([r[name] for r in rows], dtype=np.float64)
+    for name in VOLUME_FIELDS:
+        cols[name] = np.asarray([r.get(name) or 0 for r in rows], dtype=np.int64)
+    return cols
+
+
+# Postgres binary COPY: 11-byte signature, int32 flags, int32 extension length,
+# then per tuple an int16 field count and an (int32 length, value) pair per field.
+_PGCOPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+# timestamptz travels as microseconds since 2000-01-01 UTC.
+_PG_EPOCH_OFFSET = 946_684_800
+
+
+# Wire type per column kind; "timestamptz" is decoded to int64 epoch seconds.
+_PGCOPY_KINDS = {"timestamptz": ">i8", "int8": ">i8", "float8": ">f8"}
+BAR_COPY_FIELDS = (("ts", "timestamptz"),) + tuple((n, "float8") for n in PRICE_FIELDS) + tuple(
+    (n, "int8") for n in VOLUME_FIELDS
+)
+
+
+def pgcopy_decode(buf: bytes, fields) -> dict[str, np.ndarray]:
+    """Decode a binary ``COPY ... TO STDOUT`` stream into one array per field.
+
+    ``fields`` is a sequence of ``(name, kind)`` in select-list order, with
+    kind one of timestamptz/int8/float8. The query must not emit NULLs, so
+    every tuple has the same width and the payload is read as one numpy view.
+    """
+    dtype = np.dtype(
+        [("nfields", ">i2")]
+        + [item for name, kind in fields for item in ((f"{name}_len", ">i4"), (name, _PGCOPY_KINDS[kind]))]
+    )
+    if not buf.startswith(_PGCOPY_SIGNATURE):
+        raise ValueError("not a PostgreSQL binary COPY stream")
+    ext_len = int.from_bytes(buf[15:19], "big")
+    start = 19 + ext_len
+    end = len(buf) - 2  # int16 -1 trailer
+    count, rest = divmod(max(0, end - start), dtype.itemsize)
+    if rest:
+        raise ValueError("binary COPY tuples are not fixed width (NULL or mistyped column?)")
+    body = np.frombuffer(buf, dtype=dtype, count=count, offset=start)
+    if (body["nfields"] != len(fields)).any():
+        raise ValueError("unexpected field count in binary COPY stream")
+    out: dict[str, np.ndarray] = {}
+    for name, kind in fields:
+        if kind == "timestamptz":
+            out[name] = body[name] // 1_000_000 + _PG_EPOCH_OFFSET
+        elif kind == "float8":
+            out[name] = body[name].astype(np.float64)
+        else:
+            out[name] = body[name].astype(np.int64)
+    return out
+
+
+def pgcopy_to_columns(buf: bytes, symbol: str, timeframe: str) -> dict:
+    """Decode a binary COPY of ``ts, open, high, low, close, tick_volume,
+    spread, real_volume`` (integers cast to int8) into a column batch."""
+    cols: dict = {"symbol": symbol, "timeframe": timeframe}
+    cols.update(pgcopy_decode(buf, BAR_COPY_FIELDS))
+    return cols
+
+
+def columns_to_rows(cols: dict, *, iso_ts: bool = False) -> list[dict]:
+    """Dict-per-bar view: [{symbol, timeframe, ts (UTC datetime), open, ...}].
+
+    With ``iso_ts`` the ts is an ISO-8601 string, matching fetch_ohlc_bars.
+    """
+    n = columns_len(cols)
+    if n == 0:
+        return []
+    symbol = cols["symbol"]
+    timeframe = cols["timeframe"]
+    # tolist() converts to Python scalars in C; only the dict assembly is per bar.
+    fields = {name: cols[name].tolist() for name in BAR_FIELDS}
+    fromts = datetime.fromtimestamp
+    utc = timezone.utc
+    if iso_ts:
+        fields["ts"] = [fromts(ts, tz=utc).isoformat() for ts in fields["ts"]]
+    else:
+        fields["ts"] = [fromts(ts, tz=utc) for ts in fields["ts"]]
+    return [
+        {
+            "symbol": symbol,
+            "timeframe": timeframe,
+            "ts": ts,
+            "open": o,
+            "high": h,
+            "low": lo,
+            "close": c,
+            "tick_volume": tv,
+            "spread": sp,
+            "real_volume": rv,
+        }
+        for ts, o, h, lo, c, tv, sp, rv in zip(
+            fields["ts"],
+            fields["open"],
+            fields["high"],
+            fields["low"],
+            fields["close"],
+            fields["tick_volume"],
+            fields["spread"],
+            fields["real_volume"],
+        )
+    ]
+
+
+def dedupe_columns(cols: dict) -> dict:
+    """Sort by ts and keep the last occurrence of duplicate timestamps."""
+    n = columns_len(cols)
+    if n < 2:
+        return cols
+    ts = cols["ts"]
+    if np.all(ts[1:] > ts[:-1]):
+        return cols
+    # np.unique on the reversed array returns the first (i.e. last original) index.
+    _, rev_idx = np.unique(ts[::-1], return_index=True)
+    idx = (n - 1) - rev_idx
+    out = {"symbol": cols["symbol"], "timeframe": cols["timeframe"]}
+    for name in BAR_FIELDS:
+        out[name] = cols[name][idx]
+    return out
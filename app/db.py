@@ -1,8 +1,17 @@
 import os
+import asyncio
+import logging
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import Iterable, Mapping
+from typing import Iterable, Mapping, Sequence
 import asyncpg
+import numpy as np
+
+from app.bars import BAR_FIELDS, columns_len, dedupe_columns, pgcopy_decode, pgcopy_to_columns, rows_to_columns
+from app.bar_cache import bar_cache
+from app.jsonio import dumps_text, loads
+
+logger = logging.getLogger("mt5app.db")
 
 
 def get_db_url() -> str:
@@ -15,13 +24,22 @@ def get_db_url() -> str:
     )
 
 
+async def _init_connection(conn: asyncpg.Connection) -> None:
+    # Any NUMERIC still in the schema (ohlc_bars before the float migration)
+    # decodes straight to float instead of Decimal.
+    await conn.set_type_codec("numeric", schema="pg_catalog", encoder=str, decoder=float, format="text")
+    # json/jsonb columns take and return Python objects (app.jsonio, orjson when available).
+    for typename in ("json", "jsonb"):
+        await conn.set_type_codec(typename, schema="pg_catalog", encoder=dumps_text, decoder=loads, format="text")
+
+
 async def create_pool() -> asyncpg.pool.Pool:
     db_url = get_db_url()
     if not db_url:
         raise RuntimeError(
             "DATABASE_URL or DATABASE_MT_URL not set. Export one before starting the app."
         )
-    return await asyncpg.create_pool(dsn=db_url, min_size=1, max_size=5)
+    return await asyncpg.create_pool(dsn=db_url, min_size=1, max_size=5, init=_init_connection)
 
 
 async def init_schema(pool: asyncpg.pool.Pool) -> None:
@@ -32,16 +50,253 @@ async def init_schema(pool: asyncpg.pool.Pool) -> None:
         await conn.execute(sql)
 
 
-async def upsert_ohlc_bars(pool: asyncpg.pool.Pool, rows: list[dict]) -> int:
-    if not rows:
-        return 0
-    # rows: [{symbol, timeframe, ts, open, high, low, close, tick_volume, spread, real_volume}]
-    q = (
-        """
-        INSERT INTO ohlc_bars
-            (symbol, timeframe, ts, open, high, low, close, tick_volume, spread, real_volume)
-        VALUES
-            ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
+# --- ohlc_bars float migration ---
+# Databases created before prices were stored as DOUBLE PRECISION still have
+# NUMERIC columns. The migration copies bars into a float8 shadow table in
+# keyset batches while a trigger mirrors concurrent writes, then swaps the two
+# tables in one short transaction, so reads and ingest keep running. It is safe
+# to interrupt: a restart resumes from what the shadow table already holds.
+
+_OHLC_SHADOW_SETUP = """
+    CREATE TABLE IF NOT EXISTS ohlc_bars_f8 (
+        symbol       TEXT             NOT NULL,
+        timeframe    TEXT             NOT NULL,
+        ts           TIMESTAMPTZ      NOT NULL,
+        open         DOUBLE PRECISION NOT NULL,
+        high         DOUBLE PRECISION NOT NULL,
+        low          DOUBLE PRECISION NOT NULL,
+        close        DOUBLE PRECISION NOT NULL,
+        tick_volume  BIGINT,
+        spread       INTEGER,
+        real_volume  BIGINT,
+        PRIMARY KEY (symbol, timeframe, ts)
+    );
+    CREATE INDEX IF NOT EXISTS idx_ohlc_bars_f8_symbol_tf_ts ON ohlc_bars_f8(symbol, timeframe, ts DESC);
+
+    CREATE OR REPLACE FUNCTION ohlc_bars_f8_sync() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP <> 'INSERT' THEN
+            DELETE FROM ohlc_bars_f8
+            WHERE symbol = OLD.symbol AND timeframe = OLD.timeframe AND ts = OLD.ts;
+        END IF;
+        IF TG_OP = 'DELETE' THEN
+            RETURN OLD;
+        END IF;
+        INSERT INTO ohlc_bars_f8
+        VALUES (NEW.symbol, NEW.timeframe, NEW.ts, NEW.open::float8, NEW.high::float8,
+                NEW.low::float8, NEW.close::float8, NEW.tick_volume, NEW.spread, NEW.real_volume)
+        ON CONFLICT (symbol, timeframe, ts) DO UPDATE SET
+            open = EXCLUDED.open, high = EXCLUDED.high, low = EXCLUDED.low, close = EXCLUDED.close,
+            tick_volume = EXCLUDED.tick_volume, spread = EXCLUDED.spread, real_volume = EXCLUDED.real_volume;
+        RETURN NEW;
+    END
+    $$;
+
+    DROP TRIGGER IF EXISTS ohlc_bars_f8_sync ON ohlc_bars;
+    CREATE TRIGGER ohlc_bars_f8_sync
+        AFTER INSERT OR UPDATE OR DELETE ON ohlc_bars
+        FOR EACH ROW EXECUTE FUNCTION ohlc_bars_f8_sync();
+"""
+
+# Runs under a SHARE lock on ohlc_bars so no write lands between reading the
+# batch and inserting it; rows the trigger mirrored earlier are newer and kept.
+_OHLC_SHADOW_BATCH = """
+    WITH batch AS (
+        SELECT symbol, timeframe, ts, open, high, low, close, tick_volume, spread, real_volume
+        FROM ohlc_bars
+        WHERE symbol = $1 AND timeframe = $2 AND ($3::timestamptz IS NULL OR ts > $3)
+        ORDER BY ts
+        LIMIT $4
+    ), copied AS (
+        INSERT INTO ohlc_bars_f8
+        SELECT symbol, timeframe, ts, open::float8, high::float8, low::float8, close::float8,
+               tick_volume, spread, real_volume
+        FROM batch
+        ON CONFLICT (symbol, timeframe, ts) DO NOTHING
+    )
+    SELECT count(*) AS n, max(ts) AS last_ts FROM batch
+"""
+
+_OHLC_SHADOW_RECONCILE = """
+    INSERT INTO ohlc_bars_f8
+    SELECT symbol, timeframe, ts, open::float8, high::float8, low::float8, close::float8,
+           tick_volume, spread, real_volume
+    FROM ohlc_bars
+    ON CONFLICT (symbol, timeframe, ts) DO NOTHING;
+    DELETE FROM ohlc_bars_f8 f
+    WHERE NOT EXISTS (
+        SELECT 1 FROM ohlc_bars o
+        WHERE o.symbol = f.symbol AND o.timeframe = f.timeframe AND o.ts = f.ts
+    );
+"""
+
+# Cheap pre-swap check (index lookups per pair): returns what is out of step, or NULL.
+_OHLC_SHADOW_CHECK = """
+    SELECT CASE
+        WHEN NOT EXISTS (
+            SELECT 1 FROM pg_trigger WHERE tgrelid = 'ohlc_bars'::regclass AND tgname = 'ohlc_bars_f8_sync'
+        ) THEN 'trigger missing'
+        ELSE (
+            SELECT string_agg(p.symbol || ' ' || p.timeframe, ', ')
+            FROM unnest($1::text[], $2::text[]) AS p(symbol, timeframe)
+            WHERE (SELECT max(ts) FROM ohlc_bars WHERE symbol = p.symbol AND timeframe = p.timeframe)
+                IS DISTINCT FROM (SELECT max(ts) FROM ohlc_bars_f8 WHERE symbol = p.symbol AND timeframe = p.timeframe)
+        )
+    END
+"""
+
+_OHLC_SHADOW_SWAP = """
+    DROP TRIGGER ohlc_bars_f8_sync ON ohlc_bars;
+    DROP FUNCTION ohlc_bars_f8_sync();
+    DROP TABLE ohlc_bars;
+    ALTER TABLE ohlc_bars_f8 RENAME TO ohlc_bars;
+    ALTER TABLE ohlc_bars RENAME CONSTRAINT ohlc_bars_f8_pkey TO ohlc_bars_pkey;
+    ALTER INDEX idx_ohlc_bars_f8_symbol_tf_ts RENAME TO idx_ohlc_bars_symbol_tf_ts;
+"""
+
+
+async def ohlc_price_type(pool: asyncpg.pool.Pool) -> str | None:
+    """SQL type of the ohlc_bars price columns ('numeric' or 'double precision')."""
+    q = """
+        SELECT data_type FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = 'ohlc_bars' AND column_name = 'close'
+    """
+    async with pool.acquire() as conn:
+        return await conn.fetchval(q)
+
+
+async def migrate_ohlc_bars_to_float(pool: asyncpg.pool.Pool, *, batch_size: int = 20_000) -> dict:
+    """Move ohlc_bars prices from NUMERIC to DOUBLE PRECISION without blocking writers.
+
+    Returns {"migrated": bool, "rows": copied}; a no-op once the columns are float8.
+    """
+    if await ohlc_price_type(pool) != "numeric":
+        return {"migrated": False, "rows": 0}
+    async with pool.acquire() as conn:
+        # CREATE TRIGGER waits for in-flight writers, so every later write is mirrored.
+        await conn.execute(_OHLC_SHADOW_SETUP)
+        pairs = await conn.fetch("SELECT DISTINCT symbol, timeframe FROM ohlc_bars")
+    logger.info("[migrate] ohlc_bars -> float8: copying %d symbol/timeframe pairs", len(pairs))
+    copied = 0
+    for pair in pairs:
+        last_ts = None
+        while True:
+            async with pool.acquire() as conn:
+                async with conn.transaction():
+                    # Writers wait for one batch at most; readers are not blocked.
+                    await conn.execute("LOCK TABLE ohlc_bars IN SHARE MODE")
+                    row = await conn.fetchrow(_OHLC_SHADOW_BATCH, pair["symbol"], pair["timeframe"], last_ts, batch_size)
+            n = int(row["n"])
+            if n == 0:
+                break
+            copied += n
+            last_ts = row["last_ts"]
+            await asyncio.sleep(0)
+    if not await _swap_ohlc_shadow(pool):
+        # The trigger keeps mirroring; the next start finishes the migration.
+        return {"migrated": False, "rows": copied}
+    # Pooled connections cached the old table's row types.
+    await pool.expire_connections()
+    logger.info("[migrate] ohlc_bars -> float8: done, %d rows", copied)
+    return {"migrated": True, "rows": copied}
+
+
+async def _swap_ohlc_shadow(pool: asyncpg.pool.Pool) -> bool:
+    """Verify ohlc_bars_f8 against ohlc_bars and swap it in; the exclusive lock covers index lookups only.
+
+    Returns False (nothing swapped) if the cheap check under the lock finds the tables out of step.
+    """
+    async with pool.acquire() as conn:
+        # One snapshot covers both tables (trigger writes commit with their source row), so no lock is needed.
+        async with conn.transaction(isolation="repeatable_read", readonly=True):
+            counts = await conn.fetchrow(
+                "SELECT (SELECT count(*) FROM ohlc_bars) AS src, (SELECT count(*) FROM ohlc_bars_f8) AS dst"
+            )
+            pairs = await conn.fetch("SELECT DISTINCT symbol, timeframe FROM ohlc_bars")
+        if counts["src"] != counts["dst"]:
+            # Should not happen; close the gap with writers paused (readers are not blocked).
+            logger.warning("[migrate] ohlc_bars row count mismatch %s vs %s; reconciling", counts["src"], counts["dst"])
+            async with conn.transaction():
+                await conn.execute("LOCK TABLE ohlc_bars IN SHARE MODE")
+                await conn.execute(_OHLC_SHADOW_RECONCILE)
+        async with conn.transaction():
+            await conn.execute("LOCK TABLE ohlc_bars IN ACCESS EXCLUSIVE MODE")
+            # Only index lookups while everything waits: the mirror trigger is still in place
+            # and every pair's newest bar matches.
+            stale = await conn.fetchval(
+                _OHLC_SHADOW_CHECK, [p["symbol"] for p in pairs], [p["timeframe"] for p in pairs]
+            )
+            if stale:
+                logger.warning("[migrate] ohlc_bars shadow out of step (%s); swap postponed", stale)
+                return False
+            await conn.execute(_OHLC_SHADOW_SWAP)
+    return True
+
+
+# --- Bulk ingest ---
+# Batches at or above this many rows are streamed with binary COPY into a temp
+# staging table and merged with a single INSERT ... SELECT; smaller batches use
+# one statement per call (unnest arrays) or executemany.
+try:
+    COPY_THRESHOLD = int(os.getenv("DB_COPY_THRESHOLD", "1000"))
+except Exception:
+    COPY_THRESHOLD = 1000
+
+
+def _use_copy(n: int, copy: bool | None) -> bool:
+    if copy is not None:
+        return bool(copy)
+    return COPY_THRESHOLD > 0 and n >= COPY_THRESHOLD
+
+
+async def _copy_merge(
+    conn: asyncpg.Connection,
+    table: str,
+    columns: list[str],
+    records: list[tuple],
+    merge_sql: str,
+    *,
+    stage_types: Mapping[str, str] | None = None,
+    select_exprs: Mapping[str, str] | None = None,
+):
+    """COPY records into a temp staging table and merge them into `table`.
+
+    `merge_sql` is a template whose ``{insert}`` placeholder receives
+    ``INSERT INTO table (cols) SELECT cols FROM stage``; it adds the ON CONFLICT
+    and RETURNING clauses. `stage_types` overrides staging column types (e.g.
+    float8 for NUMERIC targets, which are far cheaper to encode client-side)
+    and `select_exprs` maps a column to the expression read from the stage
+    (e.g. ``to_timestamp(ts)`` for epoch seconds). Returns the rows fetched
+    from the merge statement.
+    """
+    stage = f"_stage_{table}"
+    cols = ", ".join(columns)
+    types = stage_types or {}
+    exprs = select_exprs or {}
+    stage_cols = ", ".join(f"NULL::{types[c]} AS {c}" if c in types else c for c in columns)
+    select_cols = ", ".join(exprs.get(c, c) for c in columns)
+    async with conn.transaction():
+        # Column types only (no NOT NULL/defaults); dropped on commit.
+        await conn.execute(
+            f"CREATE TEMP TABLE {stage} ON COMMIT DROP AS SELECT {stage_cols} FROM {table} WITH NO DATA"
+        )
+        await conn.copy_records_to_table(stage, records=records, columns=columns)
+        insert = f"INSERT INTO {table} ({cols}) SELECT {select_cols} FROM {stage}"
+        return await conn.fetch(merge_sql.format(insert=insert))
+
+
+_OHLC_COLUMNS = [
+    "symbol", "timeframe", "ts", "open", "high", "low", "close", "tick_volume", "spread", "real_volume",
+]
+# Prices travel as float8 (the MT5 source type); cast server-side on databases
+# still waiting for the float migration.
+_OHLC_STAGE_TYPES = {"open": "float8", "high": "float8", "low": "float8", "close": "float8"}
+
+# Counts inserted vs updated rows; rows identical to the stored bar are skipped
+# by the WHERE clause and never produce a new row version.
+_OHLC_MERGE = """
+    WITH merged AS (
+        {insert}
         ON CONFLICT (symbol, timeframe, ts) DO UPDATE SET
             open = EXCLUDED.open,
             high = EXCLUDED.high,
@@ -50,31 +305,141 @@ async def upsert_ohlc_bars(pool: asyncpg.pool.Pool, rows: list[dict]) -> int:
             tick_volume = EXCLUDED.tick_volume,
             spread = EXCLUDED.spread,
             real_volume = EXCLUDED.real_volume
-        """
+        WHERE (ohlc_bars.open, ohlc_bars.high, ohlc_bars.low, ohlc_bars.close,
+               ohlc_bars.tick_volume, ohlc_bars.spread, ohlc_bars.real_volume)
+            IS DISTINCT FROM
+              (EXCLUDED.open, EXCLUDED.high, EXCLUDED.low, EXCLUDED.close,
+               EXCLUDED.tick_volume, EXCLUDED.spread, EXCLUDED.real_volume)
+        RETURNING (xmax = 0) AS inserted
     )
-    args = [
-        (
-            r["symbol"],
-            r["timeframe"],
-            r["ts"],
-            r["open"],
-            r["high"],
-            r["low"],
-            r["close"],
-            r.get("tick_volume"),
-            r.get("spread"),
-            r.get("real_volume"),
-        )
-        for r in rows
-    ]
+    SELECT count(*) FILTER (WHERE inserted) AS inserted,
+           count(*) FILTER (WHERE NOT inserted) AS updated
+    FROM merged
+"""
+
+
+async def upsert_ohlc_bars(pool: asyncpg.pool.Pool, rows: list[dict], *, copy: bool | None = None) -> dict:
+    """Upsert bars, skipping rows identical to what is already stored.
+
+    Returns {"inserted", "updated", "unchanged"} so callers can react to real
+    changes only (unchanged rows produce no new row version).
+    """
+    if not rows:
+        return {"inserted": 0, "updated": 0, "unchanged": 0}
+    # rows: [{symbol, timeframe, ts, open, high, low, close, tick_volume, spread, real_volume}]
+    # Last row wins for duplicate keys; one statement cannot touch a key twice.
+    latest: dict[tuple, dict] = {}
+    for r in rows:
+        latest[(r["symbol"], r["timeframe"], r["ts"])] = r
+    uniq = list(latest.values())
     async with pool.acquire() as conn:
-        await conn.executemany(q, args)
-    return len(rows)
+        if _use_copy(len(uniq), copy):
+            records = [
+                (
+                    r["symbol"],
+                    r["timeframe"],
+                    r["ts"],
+                    r["open"],
+                    r["high"],
+                    r["low"],
+                    r["close"],
+                    r.get("tick_volume"),
+                    r.get("spread"),
+                    r.get("real_volume"),
+                )
+                for r in uniq
+            ]
+            res = (await _copy_merge(conn, "ohlc_bars", _OHLC_COLUMNS, records, _OHLC_MERGE, stage_types=_OHLC_STAGE_TYPES))[0]
+        else:
+            source = """
+                INSERT INTO ohlc_bars
+                    (symbol, timeframe, ts, open, high, low, close, tick_volume, spread, real_volume)
+                SELECT * FROM unnest(
+                    $1::text[], $2::text[], $3::timestamptz[],
+                    $4::float8[], $5::float8[], $6::float8[], $7::float8[],
+                    $8::bigint[], $9::integer[], $10::bigint[]
+                )
+            """
+            res = await conn.fetchrow(
+                _OHLC_MERGE.format(insert=source),
+                [r["symbol"] for r in uniq],
+                [r["timeframe"] for r in uniq],
+                [r["ts"] for r in uniq],
+                [r["open"] for r in uniq],
+                [r["high"] for r in uniq],
+                [r["low"] for r in uniq],
+                [r["close"] for r in uniq],
+                [r.get("tick_volume") for r in uniq],
+                [r.get("spread") for r in uniq],
+                [r.get("real_volume") for r in uniq],
+            )
+    inserted = int(res["inserted"])
+    updated = int(res["updated"])
+    if inserted or updated:
+        by_pair: dict[tuple[str, str], list[dict]] = {}
+        for r in uniq:
+            by_pair.setdefault((r["symbol"], r["timeframe"]), []).append(r)
+        for (symbol, timeframe), pair_rows in by_pair.items():
+            bar_cache.apply(rows_to_columns(pair_rows, symbol, timeframe))
+    return {"inserted": inserted, "updated": updated, "unchanged": len(uniq) - inserted - updated}
+
+
+async def upsert_ohlc_columns(pool: asyncpg.pool.Pool, cols: dict, *, copy: bool | None = None) -> dict:
+    """Columnar variant of `upsert_ohlc_bars` taking an app.bars batch.
+
+    Timestamps travel as int64 epoch seconds and are converted server-side, so
+    no per-bar datetime or dict is built. Same return value as upsert_ohlc_bars.
+    """
+    cols = dedupe_columns(cols)
+    n = columns_len(cols)
+    if n == 0:
+        return {"inserted": 0, "updated": 0, "unchanged": 0}
+    symbol = cols["symbol"]
+    timeframe = cols["timeframe"]
+    lists = [cols[name].tolist() for name in BAR_FIELDS]
+    async with pool.acquire() as conn:
+        if _use_copy(n, copy):
+            records = [(symbol, timeframe, *vals) for vals in zip(*lists)]
+            res = (
+                await _copy_merge(
+                    conn,
+                    "ohlc_bars",
+                    _OHLC_COLUMNS,
+                    records,
+                    _OHLC_MERGE,
+                    stage_types={**_OHLC_STAGE_TYPES, "ts": "int8"},
+                    select_exprs={"ts": "to_timestamp(ts)"},
+                )
+            )[0]
+        else:
+            source = """
+                INSERT INTO ohlc_bars
+                    (symbol, timeframe, ts, open, high, low, close, tick_volume, spread, real_volume)
+                SELECT $1::text, $2::text, to_timestamp(u.ts), u.open, u.high, u.low, u.close,
+                       u.tick_volume, u.spread, u.real_volume
+                FROM unnest(
+                    $3::int8[], $4::float8[], $5::float8[], $6::float8[], $7::float8[],
+                    $8::int8[], $9::int8[], $10::int8[]
+                ) AS u(ts, open, high, low, close, tick_volume, spread, real_volume)
+            """
+            res = await conn.fetchrow(_OHLC_MERGE.format(insert=source), symbol, timeframe, *lists)
+    inserted = int(res["inserted"])
+    updated = int(res["updated"])
+    if inserted or updated:
+        bar_cache.apply(cols)
+    return {"inserted": inserted, "updated": updated, "unchanged": n - inserted - updated}
 
 
 async def fetch_ohlc_bars(
     pool: asyncpg.pool.Pool, symbol: str, timeframe: str, limit: int = 500
 ) -> list[dict]:
+    """Newest ``limit`` bars, ascending; served from app.bar_cache when possible."""
+    cached = bar_cache.get_rows(symbol, timeframe, limit)
+    if cached is not None:
+        return cached
+    version = bar_cache.version(symbol, timeframe)
+    # Read a full buffer on a miss so later calls with other limits hit too.
+    want = max(limit, bar_cache.capacity) if bar_cache.enabled else limit
     q = (
         """
         SELECT symbol, timeframe, ts, open, high, low, close, tick_volume, spread, real_volume
@@ -85,19 +450,44 @@ async def fetch_ohlc_bars(
         """
     )
     async with pool.acquire() as conn:
-        rows = await conn.fetch(q, symbol, timeframe, limit)
-    # Return in ascending time for plotting
-    result = [dict(r) for r in reversed(rows)]
-    # Convert Decimal to float for JSON friendliness
+        rows = await conn.fetch(q, symbol, timeframe, want)
+    rows = rows[::-1]
+    if bar_cache.enabled:
+        bar_cache.populate(rows_to_columns(rows, symbol, timeframe), requested=want, version=version)
+    # Return in ascending time for plotting; prices already decode as float.
+    result = [dict(r) for r in rows[max(0, len(rows) - limit):]]
     for r in result:
-        for k in ("open", "high", "low", "close"):
-            v = r[k]
-            if v is not None:
-                r[k] = float(v)
         r["ts"] = r["ts"].isoformat()
     return result
 
 
+async def ohlc_window_marker(
+    pool: asyncpg.pool.Pool, symbol: str, timeframe: str, limit: int
+) -> tuple[int, int, int | None]:
+    """(write version, bar count, last epoch ts) of the newest ``limit`` bars.
+
+    Cheap change detector for the window ``fetch_ohlc_bars`` would return. The
+    version comes from app.bar_cache and is bumped by every upsert that touches
+    the pair, so in-place updates of the forming bar are seen as well.
+    """
+    version = bar_cache.version(symbol, timeframe)
+    cached = bar_cache.window_marker(symbol, timeframe, limit)
+    if cached is not None:
+        return (version, *cached)
+    q = """
+        SELECT count(*) AS n, extract(epoch FROM max(ts))::bigint AS last_ts
+        FROM (
+            SELECT ts FROM ohlc_bars
+            WHERE symbol = $1 AND timeframe = $2
+            ORDER BY ts DESC
+            LIMIT $3
+        ) AS recent
+    """
+    async with pool.acquire() as conn:
+        row = await conn.fetchrow(q, symbol, timeframe, limit)
+    return version, int(row["n"]), row["last_ts"]
+
+
 async def latest_bar_ts(pool: asyncpg.pool.Pool, symbol: str, timeframe: str):
     """Return the most recent timestamp we have for a symbol/timeframe, or None."""
     q = "SELECT ts FROM ohlc_bars WHERE symbol=$1 AND timeframe=$2 ORDER BY ts DESC LIMIT 1"
@@ -199,14 +589,128 @@ async def fetch_ohlc_bars_range(
     for rec in rows:
         row = dict(rec)
         row["ts"] = (rec["ts"].isoformat() if isinstance(rec["ts"], datetime) else str(rec["ts"]))
-        for key in ("open", "high", "low", "close"):
-            val = row[key]
-            if val is not None:
-                row[key] = float(val)
         result.append(row)
     return result
 
 
+async def _copy_out_binary(pool: asyncpg.pool.Pool, query: str, *args) -> bytes:
+    chunks: list[bytes] = []
+
+    async def _sink(chunk: bytes) -> None:
+        chunks.append(chunk)
+
+    async with pool.acquire() as conn:
+        await conn.copy_from_query(query, *args, output=_sink, format="binary")
+    return b"".join(chunks)
+
+
+_OHLC_ARRAYS_QUERY = """
+    SELECT ts, open::float8, high::float8, low::float8, close::float8,
+           COALESCE(tick_volume, 0)::int8, COALESCE(spread, 0)::int8, COALESCE(real_volume, 0)::int8
+    FROM (
+        SELECT ts, open, high, low, close, tick_volume, spread, real_volume
+        FROM ohlc_bars
+        WHERE symbol = $1
+          AND timeframe = $2
+          AND ($3::timestamptz IS NULL OR ts >= $3)
+          AND ($4::timestamptz IS NULL OR ts <= $4)
+        ORDER BY ts DESC
+        LIMIT $5
+    ) AS recent
+    ORDER BY ts ASC
+"""
+
+
+async def fetch_ohlc_arrays(
+    pool: asyncpg.pool.Pool,
+    symbol: str,
+    timeframe: str,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    *,
+    limit: int | None = None,
+) -> dict:
+    """Bars in ``[start, end]`` as an app.bars column batch (ascending).
+
+    Rows come over the binary COPY protocol and are decoded as one numpy view,
+    so no per-bar Python objects are built. With ``limit`` only the newest
+    ``limit`` bars of the range are returned; an open-ended ``limit`` read is
+    answered from app.bar_cache when it holds enough bars.
+    """
+    if limit is not None and start is None and end is None:
+        cached = bar_cache.get_columns(symbol, timeframe, limit)
+        if cached is not None:
+            return cached
+    buf = await _copy_out_binary(pool, _OHLC_ARRAYS_QUERY, symbol, timeframe, start, end, limit)
+    return pgcopy_to_columns(buf, symbol, timeframe)
+
+
+_CLOSE_SERIES_BATCH_QUERY = """
+    SELECT p.symbol, p.timeframe,
+           array_agg(extract(epoch FROM b.ts)::int8 ORDER BY b.ts) AS ts,
+           array_agg(b.close::float8 ORDER BY b.ts) AS close
+    FROM unnest($1::text[], $2::text[]) AS p(symbol, timeframe)
+    CROSS JOIN LATERAL (
+        SELECT ts, close
+        FROM ohlc_bars
+        WHERE symbol = p.symbol AND timeframe = p.timeframe
+          AND ($4::timestamptz IS NULL OR ts >= $4)
+          AND ($5::timestamptz IS NULL OR ts <= $5)
+        ORDER BY ts DESC
+        LIMIT $3
+    ) AS b
+    GROUP BY p.symbol, p.timeframe
+"""
+
+
+async def fetch_close_series_batch(
+    pool: asyncpg.pool.Pool,
+    pairs: Sequence[tuple[str, str]],
+    *,
+    limit: int,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> dict[tuple[str, str], dict]:
+    """Newest ``limit`` closes in ``[start, end]`` of many symbol/TF pairs: (symbol, tf) -> {"ts", "close"}, ascending.
+
+    Without a range, pairs app.bar_cache can serve skip the database; the rest
+    come from one query. Pairs without bars (in the range) are left out.
+    """
+    out: dict[tuple[str, str], dict] = {}
+    missing: list[tuple[str, str]] = []
+    for symbol, timeframe in pairs:
+        cached = bar_cache.get_columns(symbol, timeframe, limit) if start is None and end is None else None
+        if cached is not None:
+            out[(symbol, timeframe)] = {"ts": cached["ts"], "close": cached["close"]}
+        else:
+            missing.append((symbol, timeframe))
+    if missing:
+        async with pool.acquire() as conn:
+            records = await conn.fetch(
+                _CLOSE_SERIES_BATCH_QUERY, [p[0] for p in missing], [p[1] for p in missing], int(limit), start, end
+            )
+        for rec in records:
+            out[(rec["symbol"], rec["timeframe"])] = {
+                "ts": np.asarray(rec["ts"], dtype=np.int64),
+                "close": np.asarray(rec["close"], dtype=np.float64),
+            }
+    return out
+
+
+STL_COMPONENT_FIELDS = ("ts", "close", "trend", "seasonal", "resid")
+
+
+def _pack_stl_columns(columns: Mapping[str, object]) -> list[bytes]:
+    """STL columns as little-endian bytes (ts int64, the rest float8) in STL_COMPONENT_FIELDS order."""
+    packed = []
+    for name in STL_COMPONENT_FIELDS:
+        dtype = "<i8" if name == "ts" else "<f8"
+        packed.append(np.ascontiguousarray(columns[name], dtype=dtype).tobytes())
+    if len({len(b) for b in packed}) != 1:
+        raise ValueError("STL columns differ in length")
+    return packed
+
+
 async def create_stl_run(
     pool: asyncpg.pool.Pool,
     *,
@@ -216,98 +720,138 @@ async def create_stl_run(
     start_ts: datetime,
     end_ts: datetime,
     rows_count: int,
+    columns: Mapping[str, object] | None = None,
+    fingerprint: str | None = None,
+    engine: str = "statsmodels",
 ) -> dict:
-    q = """
-        INSERT INTO stl_runs (symbol, timeframe, period, start_ts, end_ts, rows_count)
-        VALUES ($1, $2, $3, $4, $5, $6)
-        RETURNING id, created_at
-    """
+    """Insert an STL run; with ``columns`` its packed components go in the same statement."""
+    if columns is None:
+        q = """
+            INSERT INTO stl_runs (symbol, timeframe, period, start_ts, end_ts, rows_count, fingerprint, engine)
+            VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+            RETURNING id, created_at
+        """
+        args: tuple = ()
+    else:
+        q = """
+            WITH run AS (
+                INSERT INTO stl_runs (symbol, timeframe, period, start_ts, end_ts, rows_count, fingerprint, engine)
+                VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+                RETURNING id, created_at
+            ), arrays AS (
+                INSERT INTO stl_run_arrays (run_id, ts, close, trend, seasonal, resid)
+                SELECT id, $9, $10, $11, $12, $13 FROM run
+            )
+            SELECT id, created_at FROM run
+        """
+        args = tuple(_pack_stl_columns(columns))
     async with pool.acquire() as conn:
-        row = await conn.fetchrow(q, symbol, timeframe, period, start_ts, end_ts, rows_count)
+        row = await conn.fetchrow(q, symbol, timeframe, period, start_ts, end_ts, rows_count, fingerprint, engine, *args)
     created_at = row["created_at"]
     if created_at and created_at.tzinfo is None:
         created_at = created_at.replace(tzinfo=timezone.utc)
     return {"id": row["id"], "created_at": created_at}
 
 
-async def insert_stl_components(
-    pool: asyncpg.pool.Pool,
-    run_id: int,
-    rows: list[dict],
-) -> int:
-    if not rows:
-        return 0
-    q = (
-        """
-        INSERT INTO stl_run_components (run_id, ts, close, trend, seasonal, resid)
-        VALUES ($1, $2, $3, $4, $5, $6)
-        ON CONFLICT (run_id, ts) DO UPDATE SET
-            close = EXCLUDED.close,
-            trend = EXCLUDED.trend,
-            seasonal = EXCLUDED.seasonal,
-            resid = EXCLUDED.resid
-        """
-    )
-    args = []
-    for rec in rows:
-        ts = rec["ts"]
-        if isinstance(ts, str):
-            ts = datetime.fromisoformat(ts)
-        if ts.tzinfo is None:
-            ts = ts.replace(tzinfo=timezone.utc)
-        args.append(
-            (
-                run_id,
-                ts,
-                rec.get("close"),
-                rec.get("trend"),
-                rec.get("seasonal"),
-                rec.get("resid"),
-            )
-        )
+def _stl_run_meta(rec) -> dict:
+    start_ts = rec["start_ts"]
+    end_ts = rec["end_ts"]
+    created_at = rec["created_at"]
+    if start_ts and start_ts.tzinfo is None:
+        start_ts = start_ts.replace(tzinfo=timezone.utc)
+    if end_ts and end_ts.tzinfo is None:
+        end_ts = end_ts.replace(tzinfo=timezone.utc)
+    if created_at and created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return {
+        "id": rec["id"],
+        "symbol": rec["symbol"],
+        "timeframe": rec["timeframe"],
+        "period": rec["period"],
+        "start_ts": start_ts,
+        "end_ts": end_ts,
+        "rows_count": rec["rows_count"],
+        "created_at": created_at,
+        "fingerprint": rec["fingerprint"],
+        "engine": rec["engine"],
+    }
+
+
+async def create_stl_runs(pool: asyncpg.pool.Pool, runs: Sequence[Mapping[str, object]]) -> list[dict]:
+    """Insert many STL runs and their packed components in one transaction.
+
+    Each item carries the ``create_stl_run`` keywords (``columns`` required).
+    Returns ``{"id", "created_at"}`` per item, in order.
+    """
+    if not runs:
+        return []
+    packed = [_pack_stl_columns(run["columns"]) for run in runs]
     async with pool.acquire() as conn:
-        await conn.executemany(q, args)
-    return len(rows)
+        async with conn.transaction():
+            # Reserve the ids up front so arrays can be matched to runs without relying on RETURNING order.
+            ids = [
+                r[0]
+                for r in await conn.fetch(
+                    "SELECT nextval(pg_get_serial_sequence('stl_runs', 'id')) FROM generate_series(1, $1)", len(runs)
+                )
+            ]
+            created = await conn.fetch(
+                """
+                INSERT INTO stl_runs (id, symbol, timeframe, period, start_ts, end_ts, rows_count, fingerprint, engine)
+                SELECT * FROM unnest(
+                    $1::int8[], $2::text[], $3::text[], $4::int4[], $5::timestamptz[], $6::timestamptz[],
+                    $7::int4[], $8::text[], $9::text[]
+                )
+                RETURNING id, created_at
+                """,
+                ids,
+                [run["symbol"] for run in runs],
+                [run["timeframe"] for run in runs],
+                [int(run["period"]) for run in runs],
+                [run["start_ts"] for run in runs],
+                [run["end_ts"] for run in runs],
+                [int(run["rows_count"]) for run in runs],
+                [run.get("fingerprint") for run in runs],
+                [run.get("engine") or "statsmodels" for run in runs],
+            )
+            await conn.execute(
+                """
+                INSERT INTO stl_run_arrays (run_id, ts, close, trend, seasonal, resid)
+                SELECT * FROM unnest($1::int8[], $2::bytea[], $3::bytea[], $4::bytea[], $5::bytea[], $6::bytea[])
+                """,
+                ids,
+                *([cols[i] for cols in packed] for i in range(len(STL_COMPONENT_FIELDS))),
+            )
+    created_at = {}
+    for rec in created:
+        ts = rec["created_at"]
+        created_at[rec["id"]] = ts.replace(tzinfo=timezone.utc) if ts and ts.tzinfo is None else ts
+    return [{"id": run_id, "created_at": created_at.get(run_id)} for run_id in ids]
 
 
 async def list_stl_runs(pool: asyncpg.pool.Pool, symbol: str, timeframe: str) -> list[dict]:
     q = """
-        SELECT id, symbol, timeframe, period, start_ts, end_ts, rows_count, created_at
+        SELECT id, symbol, timeframe, period, start_ts, end_ts, rows_count, created_at, fingerprint, engine
         FROM stl_runs
         WHERE symbol=$1 AND timeframe=$2
         ORDER BY created_at DESC
     """
     async with pool.acquire() as conn:
         rows = await conn.fetch(q, symbol, timeframe)
-    result = []
-    for rec in rows:
-        start_ts = rec["start_ts"]
-        end_ts = rec["end_ts"]
-        created_at = rec["created_at"]
-        if start_ts and start_ts.tzinfo is None:
-            start_ts = start_ts.replace(tzinfo=timezone.utc)
-        if end_ts and end_ts.tzinfo is None:
-            end_ts = end_ts.replace(tzinfo=timezone.utc)
-        if created_at and created_at.tzinfo is None:
-            created_at = created_at.replace(tzinfo=timezone.utc)
-        result.append(
-            {
-                "id": rec["id"],
-                "symbol": rec["symbol"],
-                "timeframe": rec["timeframe"],
-                "period": rec["period"],
-                "start_ts": start_ts,
-                "end_ts": end_ts,
-                "rows_count": rec["rows_count"],
-                "created_at": created_at,
-            }
-        )
-    return result
+    return [_stl_run_meta(rec) for rec in rows]
+
+
+async def stl_runs_marker(pool: asyncpg.pool.Pool, symbol: str, timeframe: str) -> tuple[int, int | None]:
+    """(run count, newest run id) for symbol/TF; runs are immutable, so this pins the set."""
+    q = "SELECT count(*) AS n, max(id) AS newest FROM stl_runs WHERE symbol=$1 AND timeframe=$2"
+    async with pool.acquire() as conn:
+        row = await conn.fetchrow(q, symbol, timeframe)
+    return int(row["n"]), row["newest"]
 
 
 async def get_stl_run(pool: asyncpg.pool.Pool, run_id: int) -> dict | None:
     q = """
-        SELECT id, symbol, timeframe, period, start_ts, end_ts, rows_count, created_at
+        SELECT id, symbol, timeframe, period, start_ts, end_ts, rows_count, created_at, fingerprint, engine
         FROM stl_runs
         WHERE id=$1
     """
@@ -315,25 +859,23 @@ async def get_stl_run(pool: asyncpg.pool.Pool, run_id: int) -> dict | None:
         rec = await conn.fetchrow(q, run_id)
     if not rec:
         return None
-    start_ts = rec["start_ts"]
-    end_ts = rec["end_ts"]
-    created_at = rec["created_at"]
-    if start_ts and start_ts.tzinfo is None:
-        start_ts = start_ts.replace(tzinfo=timezone.utc)
-    if end_ts and end_ts.tzinfo is None:
-        end_ts = end_ts.replace(tzinfo=timezone.utc)
-    if created_at and created_at.tzinfo is None:
-        created_at = created_at.replace(tzinfo=timezone.utc)
-    return {
-        "id": rec["id"],
-        "symbol": rec["symbol"],
-        "timeframe": rec["timeframe"],
-        "period": rec["period"],
-        "start_ts": start_ts,
-        "end_ts": end_ts,
-        "rows_count": rec["rows_count"],
-        "created_at": created_at,
-    }
+    return _stl_run_meta(rec)
+
+
+async def find_stl_run_by_fingerprint(
+    pool: asyncpg.pool.Pool, symbol: str, timeframe: str, fingerprint: str
+) -> dict | None:
+    """Newest run of symbol/TF computed from exactly these inputs, if any."""
+    q = """
+        SELECT id, symbol, timeframe, period, start_ts, end_ts, rows_count, created_at, fingerprint, engine
+        FROM stl_runs
+        WHERE symbol=$1 AND timeframe=$2 AND fingerprint=$3
+        ORDER BY created_at DESC
+        LIMIT 1
+    """
+    async with pool.acquire() as conn:
+        rec = await conn.fetchrow(q, symbol, timeframe, fingerprint)
+    return _stl_run_meta(rec) if rec else None
 
 
 async def delete_stl_run(pool: asyncpg.pool.Pool, run_id: int) -> int:
@@ -344,42 +886,125 @@ async def delete_stl_run(pool: asyncpg.pool.Pool, run_id: int) -> int:
     return int(result.split()[-1])
 
 
-async def fetch_stl_run_data(pool: asyncpg.pool.Pool, run_id: int) -> dict | None:
-    run = await get_stl_run(pool, run_id)
-    if not run:
-        return None
+async def find_stl_runs_by_fingerprints(pool: asyncpg.pool.Pool, fingerprints: Sequence[str]) -> dict[str, dict]:
+    """Newest run per fingerprint, for the fingerprints that have one."""
+    if not fingerprints:
+        return {}
     q = """
-        SELECT ts, close, trend, seasonal, resid
-        FROM stl_run_components
-        WHERE run_id=$1
-        ORDER BY ts ASC
+        SELECT DISTINCT ON (fingerprint)
+               id, symbol, timeframe, period, start_ts, end_ts, rows_count, created_at, fingerprint, engine
+        FROM stl_runs
+        WHERE fingerprint = ANY($1::text[])
+        ORDER BY fingerprint, created_at DESC
     """
     async with pool.acquire() as conn:
-        rows = await conn.fetch(q, run_id)
-    data = []
-    for rec in rows:
-        ts = rec["ts"]
-        if isinstance(ts, datetime):
-            ts = ts.isoformat()
-        row = {
-            "ts": ts,
-            "close": float(rec["close"]) if rec["close"] is not None else None,
-            "trend": float(rec["trend"]) if rec["trend"] is not None else None,
-            "seasonal": float(rec["seasonal"]) if rec["seasonal"] is not None else None,
-            "resid": float(rec["resid"]) if rec["resid"] is not None else None,
+        records = await conn.fetch(q, list(fingerprints))
+    return {rec["fingerprint"]: _stl_run_meta(rec) for rec in records}
+
+
+async def prune_stl_runs(pool: asyncpg.pool.Pool, keep: Sequence[tuple[str, str, int]]) -> int:
+    """Delete every run of each (symbol, timeframe) except its kept run id; returns runs deleted."""
+    if not keep:
+        return 0
+    q = """
+        DELETE FROM stl_runs r
+        USING unnest($1::text[], $2::text[], $3::int8[]) AS k(symbol, timeframe, keep_id)
+        WHERE r.symbol = k.symbol AND r.timeframe = k.timeframe AND r.id <> k.keep_id
+    """
+    async with pool.acquire() as conn:
+        result = await conn.execute(q, [k[0] for k in keep], [k[1] for k in keep], [int(k[2]) for k in keep])
+    return int(result.split()[-1])
+
+
+_STL_RUN_ARRAYS_QUERY = """
+    SELECT r.id, r.symbol, r.timeframe, r.period, r.start_ts, r.end_ts, r.rows_count, r.created_at, r.fingerprint, r.engine,
+           a.ts AS ts_packed, a.close, a.trend, a.seasonal, a.resid
+    FROM stl_runs r
+    LEFT JOIN stl_run_arrays a ON a.run_id = r.id
+    WHERE r.id = $1
+"""
+
+_STL_COMPONENT_COPY_FIELDS = (("ts", "timestamptz"),) + tuple((n, "float8") for n in STL_COMPONENT_FIELDS[1:])
+
+# Runs stored before stl_run_arrays: one row per point.
+_STL_COLUMNS_QUERY = """
+    SELECT ts,
+           COALESCE(close::float8, 'NaN'), COALESCE(trend::float8, 'NaN'),
+           COALESCE(seasonal::float8, 'NaN'), COALESCE(resid::float8, 'NaN')
+    FROM stl_run_components
+    WHERE run_id = $1
+    ORDER BY ts ASC
+"""
+
+
+def _slice_stl_columns(columns: dict, start, end, limit: int | None) -> dict:
+    ts = columns["ts"]
+    lo, hi = 0, len(ts)
+    if start is not None:
+        lo = int(np.searchsorted(ts, int(start.timestamp()), side="left"))
+    if end is not None:
+        hi = int(np.searchsorted(ts, int(end.timestamp()), side="right"))
+    if limit is not None and limit > 0:
+        lo = max(lo, hi - limit)
+    if (lo, hi) == (0, len(ts)):
+        return columns
+    return {name: col[lo:hi] for name, col in columns.items()}
+
+
+async def fetch_stl_run_columns(
+    pool: asyncpg.pool.Pool,
+    run_id: int,
+    *,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    limit: int | None = None,
+) -> dict | None:
+    """A run and its components as numpy columns (epoch ts, NaN for missing).
+
+    One row read for packed runs; ``start``/``end`` (inclusive) and ``limit``
+    (newest points) are applied to the arrays after the read.
+    """
+    async with pool.acquire() as conn:
+        rec = await conn.fetchrow(_STL_RUN_ARRAYS_QUERY, run_id)
+    if not rec:
+        return None
+    if rec["ts_packed"] is not None:
+        columns = {
+            name: np.frombuffer(rec["ts_packed" if name == "ts" else name], dtype="<i8" if name == "ts" else "<f8")
+            for name in STL_COMPONENT_FIELDS
         }
-        data.append(row)
-    return {"run": run, "rows": data}
+    else:
+        buf = await _copy_out_binary(pool, _STL_COLUMNS_QUERY, run_id)
+        columns = pgcopy_decode(buf, _STL_COMPONENT_COPY_FIELDS)
+    return {"run": _stl_run_meta(rec), "columns": _slice_stl_columns(columns, start, end, limit)}
 
 
+async def fetch_stl_run_data(pool: asyncpg.pool.Pool, run_id: int, *, limit: int | None = None) -> dict | None:
+    """Like ``fetch_stl_run_columns`` but one dict per point with ISO timestamps."""
+    data = await fetch_stl_run_columns(pool, run_id, limit=limit)
+    if data is None:
+        return None
+    cols = data["columns"]
+    values = {name: cols[name].tolist() for name in STL_COMPONENT_FIELDS[1:]}
+    rows = []
+    for i, ts in enumerate(cols["ts"].tolist()):
+        row = {"ts": datetime.fromtimestamp(ts, tz=timezone.utc).isoformat()}
+        for name, col in values.items():
+            v = col[i]
+            row[name] = v if v == v else None
+        rows.append(row)
+    return {"run": data["run"], "rows": rows}
+
 
-async def upsert_news_articles(pool: asyncpg.pool.Pool, rows: list[dict]) -> int:
+_NEWS_COLUMNS = ["symbol", "url", "title", "source", "site", "image", "published_at", "summary", "body"]
+
+
+async def upsert_news_articles(pool: asyncpg.pool.Pool, rows: list[dict], *, copy: bool | None = None) -> int:
     if not rows:
         return 0
     q = (
         """
-        INSERT INTO news_articles (symbol, url, title, source, site, image, published_at, summary, body)
-        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+        {insert}
         ON CONFLICT (symbol, url) DO UPDATE SET
             title = EXCLUDED.title,
             source = EXCLUDED.source,
@@ -435,7 +1060,15 @@ async def upsert_news_articles(pool: asyncpg.pool.Pool, rows: list[dict]) -> int
             )
         )
     async with pool.acquire() as conn:
-        await conn.executemany(q, args)
+        if _use_copy(len(args), copy):
+            args = list({(a[0], a[1]): a for a in args}.values())
+            await _copy_merge(conn, "news_articles", _NEWS_COLUMNS, args, q)
+        else:
+            insert = (
+                "INSERT INTO news_articles (symbol, url, title, source, site, image, published_at, summary, body)"
+                " VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)"
+            )
+            await conn.executemany(q.format(insert=insert), args)
     return len(rows)
 
 
@@ -580,18 +1213,23 @@ async def fetch_account_balances_daily(
     return out
 
 # --- Closed deals ---
+_CLOSED_DEAL_COLUMNS = [
+    "account_id", "deal_id", "order_id", "ts", "symbol", "profit", "commission", "swap", "volume", "entry", "comment",
+]
+
+
 async def upsert_closed_deals(
     pool: asyncpg.pool.Pool,
     *,
     account_id: int,
     rows: list[dict],
+    copy: bool | None = None,
 ) -> int:
     if not rows:
         return 0
     q = (
         """
-        INSERT INTO closed_deals (account_id, deal_id, order_id, ts, symbol, profit, commission, swap, volume, entry, comment)
-        VALUES ($1,$2,$3,$4,$5,$6,$7,$8,$9,$10,$11)
+        {insert}
         ON CONFLICT (account_id, deal_id) DO UPDATE SET
             order_id = EXCLUDED.order_id,
             ts = EXCLUDED.ts,
@@ -628,7 +1266,14 @@ async def upsert_closed_deals(
             )
         )
     async with pool.acquire() as conn:
-        await conn.executemany(q, args)
+        if _use_copy(len(args), copy):
+            await _copy_merge(conn, "closed_deals", _CLOSED_DEAL_COLUMNS, list({a[1]: a for a in args}.values()), q)
+        else:
+            insert = (
+                "INSERT INTO closed_deals (account_id, deal_id, order_id, ts, symbol, profit, commission, swap, volume, entry, comment)"
+                " VALUES ($1,$2,$3,$4,$5,$6,$7,$8,$9,$10,$11)"
+            )
+            await conn.executemany(q.format(insert=insert), args)
     return len(args)
 
 
@@ -710,11 +1355,8 @@ async def insert_health_run(
         RETURNING id, created_at
         """
     )
-    # Ensure JSONB receives a serialized string for compatibility
-    import json as _json
-    answers_str = _json.dumps(answers_json, ensure_ascii=False)
     async with pool.acquire() as conn:
-        row = await conn.fetchrow(q, kind, symbol, base_ccy, quote_ccy, int(news_count), news_ids, answers_str)
+        row = await conn.fetchrow(q, kind, symbol, base_ccy, quote_ccy, int(news_count), news_ids, answers_json)
     created_at = row["created_at"]
     if created_at and created_at.tzinfo is None:
         created_at = created_at.replace(tzinfo=timezone.utc)
@@ -770,14 +1412,6 @@ async def list_health_runs(
         created_at = rec["created_at"]
         if created_at and created_at.tzinfo is None:
             created_at = created_at.replace(tzinfo=timezone.utc)
-        # Normalize JSON field to dict
-        ans = rec["answers_json"]
-        try:
-            if isinstance(ans, str):
-                import json as _json
-                ans = _json.loads(ans)
-        except Exception:
-            pass
         result.append(
             {
                 "id": rec["id"],
@@ -787,7 +1421,7 @@ async def list_health_runs(
                 "quote_ccy": rec["quote_ccy"],
                 "news_count": rec["news_count"],
                 "news_ids": list(rec["news_ids"] or []),
-                "answers_json": ans,
+                "answers_json": rec["answers_json"],
                 "created_at": created_at,
             }
         )
@@ -809,13 +1443,6 @@ async def get_health_run_by_id(pool: asyncpg.pool.Pool, run_id: int) -> dict | N
     created_at = row["created_at"]
     if created_at and created_at.tzinfo is None:
         created_at = created_at.replace(tzinfo=timezone.utc)
-    ans = row["answers_json"]
-    try:
-        if isinstance(ans, str):
-            import json as _json
-            ans = _json.loads(ans)
-    except Exception:
-        pass
     return {
         "id": row["id"],
         "kind": row["kind"],
@@ -824,7 +1451,7 @@ async def get_health_run_by_id(pool: asyncpg.pool.Pool, run_id: int) -> dict | N
         "quote_ccy": row["quote_ccy"],
         "news_count": row["news_count"],
         "news_ids": list(row["news_ids"] or []),
-        "answers_json": ans,
+        "answers_json": row["answers_json"],
         "created_at": created_at,
     }
 
@@ -861,8 +1488,6 @@ async def insert_signal_trade(
         RETURNING id, ts
         """
     )
-    import json as _json
-    res_json = _json.dumps(result) if isinstance(result, dict) else None
     async with pool.acquire() as conn:
         row = await conn.fetchrow(
             q,
@@ -880,7 +1505,7 @@ async def insert_signal_trade(
             retcode,
             source,
             reason,
-            res_json,
+            result if isinstance(result, dict) else None,
         )
     return {"id": row["id"], "ts": row["ts"].isoformat() if hasattr(row["ts"], "isoformat") else str(row["ts"]) }
 
@@ -924,7 +1549,6 @@ async def list_signal_trades(
                     item[fld] = float(v)
                 except Exception:
                     pass
-        # result is JSON already
         out.append(item)
     return out
 
@@ -0,0 +1,83 @@
+"""JSON encoding for HTTP responses, websocket frames and jsonb columns.
+
+Backed by orjson when it is installed, with the stdlib as a fallback that
+produces the same values. Both paths serialize datetimes (naive ones are taken
+as UTC), numpy arrays and scalars, Decimals and sets directly, so callers can
+hand over rows and column batches without converting them first. NaN and
+infinities become null instead of the invalid ``NaN`` token stdlib emits.
+"""
+import datetime as _dt
+import decimal
+import json
+import math
+
+import numpy as np
+
+try:  # optional fast path
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+if orjson is not None:
+    _ORJSON_OPTS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC
+
+
+def _default(obj):
+    if isinstance(obj, _dt.datetime):
+        if obj.tzinfo is None:
+            obj = obj.replace(tzinfo=_dt.timezone.utc)
+        return obj.isoformat()
+    if isinstance(obj, (_dt.date, _dt.time)):
+        return obj.isoformat()
+    if isinstance(obj, np.ndarray):
+        return _finite(obj.tolist())
+    if isinstance(obj, np.generic):
+        return _finite(obj.item())
+    if isinstance(obj, decimal.Decimal):
+        return _finite(float(obj))
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _finite(obj):
+    # Stdlib path only: mirror orjson's null for non-finite floats.
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {k: _finite(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(v) for v in obj]
+    return obj
+
+
+def _stdlib_dumps(obj) -> str:
+    try:
+        return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":"), allow_nan=False)
+    except ValueError:
+        return json.dumps(_finite(obj), default=_default, ensure_ascii=False, separators=(",", ":"))
+
+
+def dumps(obj) -> bytes:
+    """Compact UTF-8 JSON bytes (for ``RequestHandler.finish``)."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=_default, option=_ORJSON_OPTS)
+        except (orjson.JSONEncodeError, TypeError):
+            # e.g. ints beyond 64 bits or non-contiguous arrays; stdlib copes with both.
+            pass
+    return _stdlib_dumps(obj).encode("utf-8")
+
+
+def dumps_text(obj) -> str:
+    """Same as ``dumps`` but ``str``: websocket text frames and asyncpg codecs need it."""
+    if orjson is not None:
+        return dumps(obj).decode("utf-8")
+    return _stdlib_dumps(obj)
+
+
+def loads(data):
+    """Parse JSON from ``str``/``bytes``."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -0,0 +1,316 @@
+"""Single-owner worker thread for MetaTrader5 calls.
+
+The MetaTrader5 package wraps one terminal connection and is not safe to call
+from several threads at once. Every terminal call is queued here and executed
+by one dedicated thread in priority order, so a long backfill can no longer
+delay an order or a tick read:
+
+    PRIORITY_TRADE        orders, closes, SL/TP changes
+    PRIORITY_MARKET       ticks, positions, account snapshots
+    PRIORITY_INTERACTIVE  bar fetches a user is waiting on
+    PRIORITY_BACKFILL     background history fetches and bulk jobs
+
+Calls within one lane run in submission order. A request that is cancelled
+before the worker picks it up is dropped instead of executed.
+"""
+import asyncio
+import itertools
+import logging
+import os
+import queue
+import threading
+import time
+
+logger = logging.getLogger("mt5app.bridge")
+
+PRIORITY_TRADE = 0
+PRIORITY_MARKET = 1
+PRIORITY_INTERACTIVE = 2
+PRIORITY_BACKFILL = 3
+
+LANES = {
+    PRIORITY_TRADE: "trade",
+    PRIORITY_MARKET: "market",
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_BACKFILL: "backfill",
+}
+
+_STOP = object()
+
+
+def _slow_wait_ms() -> float:
+    """Queue wait (env MT5_BRIDGE_SLOW_MS, default 500) above which a call is logged."""
+    try:
+        return float(os.getenv("MT5_BRIDGE_SLOW_MS", "500") or 500)
+    except Exception:
+        return 500.0
+
+
+class _LaneStats:
+    __slots__ = ("depth", "submitted", "completed", "failed", "dropped", "wait_total", "wait_max", "wait_last", "run_total", "run_max")
+
+    def __init__(self) -> None:
+        self.depth = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.wait_last = 0.0
+        self.run_total = 0.0
+        self.run_max = 0.0
+
+    def as_dict(self) -> dict:
+        done = self.completed + self.failed
+        return {
+            "depth": self.depth,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "wait_ms_avg": round(self.wait_total / done * 1000.0, 3) if done else None,
+            "wait_ms_max": round(self.wait_max * 1000.0, 3),
+            "wait_ms_last": round(self.wait_last * 1000.0, 3),
+            "run_ms_avg": round(self.run_total / done * 1000.0, 3) if done else None,
+            "run_ms_max": round(self.run_max * 1000.0, 3),
+        }
+
+
+class MT5Bridge:
+    """Priority queue served by one thread that owns all MetaTrader5 calls."""
+
+    def __init__(self, name: str = "mt5-bridge") -> None:
+        self.name = name
+        self._queue: queue.PriorityQueue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._lanes = {p: _LaneStats() for p in LANES}
+        self._current: tuple[int, str, float] | None = None
+        self._slow_wait = _slow_wait_ms() / 1000.0
+
+    # --- Lifecycle ---
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        logger.info("[mt5-bridge] worker thread started")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Ask the worker to exit once everything queued so far has run."""
+        thread = self._thread
+        if thread is None:
+            return
+        self._queue.put((len(LANES), next(self._seq), 0.0, _STOP, (), {}, None, None))
+        thread.join(timeout)
+        self._thread = None
+
+    # --- Submission ---
+
+    def submit(self, fn, *args, priority: int = PRIORITY_INTERACTIVE, **kwargs) -> asyncio.Future:
+        """Queue ``fn(*args, **kwargs)``; returns a future bound to the running loop."""
+        if priority not in LANES:
+            raise ValueError(f"unknown MT5 bridge priority: {priority}")
+        if self._thread is None:
+            self.start()
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        with self._lock:
+            lane = self._lanes[priority]
+            lane.depth += 1
+            lane.submitted += 1
+        self._queue.put((priority, next(self._seq), time.monotonic(), fn, args, kwargs, loop, fut))
+        return fut
+
+    async def call(self, fn, *args, priority: int = PRIORITY_INTERACTIVE, **kwargs):
+        """Run ``fn`` on the bridge thread and await its result."""
+        return await self.submit(fn, *args, priority=priority, **kwargs)
+
+    # --- Worker ---
+
+    @staticmethod
+    def _resolve(fut: asyncio.Future, result, exc: BaseException | None) -> None:
+        if fut.cancelled():
+            return
+        if exc is not None:
+            fut.set_exception(exc)
+        else:
+            fut.set_result(result)
+
+    def _run(self) -> None:
+        while True:
+            priority, _seq, enqueued, fn, args, kwargs, loop, fut = self._queue.get()
+            if fn is _STOP:
+                break
+            lane = self._lanes[priority]
+            if fut.cancelled() or loop.is_closed():
+                with self._lock:
+                    lane.depth -= 1
+                    lane.dropped += 1
+                continue
+            started = time.monotonic()
+            waited = started - enqueued
+            fn_name = getattr(fn, "__name__", repr(fn))
+            with self._lock:
+                lane.depth -= 1
+                self._current = (priority, fn_name, started)
+            if waited > self._slow_wait:
+                logger.warning(
+                    "[mt5-bridge] %s call %s waited %.0fms in queue", LANES[priority], fn_name, waited * 1000.0
+                )
+            result = None
+            error: BaseException | None = None
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as exc:  # handed back to the awaiting coroutine
+                error = exc
+            ran = time.monotonic() - started
+            with self._lock:
+                self._current = None
+                if error is None:
+                    lane.completed += 1
+                else:
+                    lane.failed += 1
+                lane.wait_total += waited
+                lane.wait_last = waited
+                lane.wait_max = max(lane.wait_max, waited)
+                lane.run_total += ran
+                lane.run_max = max(lane.run_max, ran)
+            try:
+                loop.call_soon_threadsafe(self._resolve, fut, result, error)
+            except RuntimeError:
+                # Loop closed while the call was running; nobody is waiting.
+                pass
+
+    # --- Introspection ---
+
+    def stats(self) -> dict:
+        with self._lock:
+            current = None
+            if self._current is not None:
+                priority, fn_name, started = self._current
+                current = {
+                    "lane": LANES[priority],
+                    "call": fn_name,
+                    "running_ms": round((time.monotonic() - started) * 1000.0, 3),
+                }
+            lanes = {LANES[p]: s.as_dict() for p, s in self._lanes.items()}
+        return {
+            "running": bool(self._thread is not None and self._thread.is_alive()),
+            "depth": sum(lane["depth"] for lane in lanes.values()),
+            "current": current,
+            "lanes": lanes,
+        }
+
+
+class AsyncMT5Client:
+    """Awaitable facade over ``MT5Client``; every method runs on the bridge.
+
+    Handlers use this instead of calling the blocking client from a coroutine.
+    Each method has a default lane; bar and history methods accept a
+    ``priority`` override so background jobs can queue behind interactive work.
+    Plain attributes (``current_login``, ``last_login_error``) are read through
+    without touching the terminal.
+    """
+
+    def __init__(self, client, bridge: MT5Bridge) -> None:
+        self._client = client
+        self._bridge = bridge
+
+    @property
+    def client(self):
+        return self._client
+
+    @property
+    def current_login(self):
+        return self._client.current_login
+
+    @property
+    def last_login_error(self):
+        return self._client.last_login_error
+
+    def _call(self, fn, *args, priority: int, **kwargs):
+        return self._bridge.call(fn, *args, priority=priority, **kwargs)
+
+    async def _snapshot_call(self, key: tuple, fn, *args, priority: int):
+        # A fresh snapshot is answered on the loop without queueing behind other calls.
+        peek = getattr(self._client, "cached_snapshot", None)
+        if peek is not None:
+            cached = peek(key)
+            if cached is not None:
+                return cached
+        return await self._call(fn, *args, priority=priority)
+
+    # --- Session ---
+
+    async def login(self, account: int, password: str, server: str | None = None) -> bool:
+        # Switching accounts changes what every other call sees; run it ahead of reads.
+        return await self._call(self._client.login, account, password, server, priority=PRIORITY_TRADE)
+
+    async def account_info(self) -> dict:
+        return await self._snapshot_call(("account",), self._client.account_info, priority=PRIORITY_MARKET)
+
+    # --- Market data ---
+
+    async def get_tick(self, symbol: str) -> dict:
+        return await self._call(self._client.get_tick, symbol, priority=PRIORITY_MARKET)
+
+    async def symbol_info(self, symbol: str):
+        return await self._snapshot_call(("symbol_info", symbol), self._client.symbol_info, symbol, priority=PRIORITY_MARKET)
+
+    async def fetch_bars(self, symbol: str, timeframe: str, count: int = 500, *, priority: int = PRIORITY_INTERACTIVE) -> list[dict]:
+        return await self._call(self._client.fetch_bars, symbol, timeframe, count, priority=priority)
+
+    async def fetch_bars_since(self, symbol: str, timeframe: str, since_dt, *, priority: int = PRIORITY_INTERACTIVE) -> list[dict]:
+        return await self._call(self._client.fetch_bars_since, symbol, timeframe, since_dt, priority=priority)
+
+    async def fetch_bar_columns(self, symbol: str, timeframe: str, count: int = 500, *, priority: int = PRIORITY_INTERACTIVE) -> dict:
+        return await self._call(self._client.fetch_bar_columns, symbol, timeframe, count, priority=priority)
+
+    async def fetch_bar_columns_since(self, symbol: str, timeframe: str, since_dt, *, priority: int = PRIORITY_INTERACTIVE) -> dict:
+        return await self._call(self._client.fetch_bar_columns_since, symbol, timeframe, since_dt, priority=priority)
+
+    async def fetch_bar_columns_range(self, symbol: str, timeframe: str, start_dt, end_dt, *, priority: int = PRIORITY_INTERACTIVE) -> dict:
+        return await self._call(self._client.fetch_bar_columns_range, symbol, timeframe, start_dt, end_dt, priority=priority)
+
+    # --- Positions and history ---
+
+    async def positions_for(self, symbol: str | None = None):
+        return await self._snapshot_call(
+            ("positions", "raw", symbol or "*"), self._client.positions_for, symbol, priority=PRIORITY_MARKET
+        )
+
+    async def list_positions(self, symbol: str) -> list[dict]:
+        return await self._snapshot_call(
+            ("positions", "rows", symbol), self._client.list_positions, symbol, priority=PRIORITY_MARKET
+        )
+
+    async def list_positions_all(self) -> list[dict]:
+        return await self._snapshot_call(("positions", "rows", "*"), self._client.list_positions_all, priority=PRIORITY_MARKET)
+
+    async def closed_deals(self, from_dt=None, to_dt=None, *, priority: int = PRIORITY_INTERACTIVE) -> list[dict]:
+        return await self._call(self._client.closed_deals, from_dt, to_dt, priority=priority)
+
+    # --- Trading ---
+
+    async def place_market(self, symbol: str, side: str, volume: float, **kwargs) -> dict:
+        return await self._call(self._client.place_market, symbol, side, volume, priority=PRIORITY_TRADE, **kwargs)
+
+    async def modify_position_sltp(self, symbol: str, ticket: int, sl: float | None, tp: float | None) -> dict:
+        return await self._call(self._client.modify_position_sltp, symbol, ticket, sl, tp, priority=PRIORITY_TRADE)
+
+    async def close_position(self, position, deviation: int = 20) -> dict:
+        return await self._call(self._client.close_position, position, deviation, priority=PRIORITY_TRADE)
+
+    async def close_all_for(self, symbol: str, deviation: int = 20, side: str | None = None) -> list[dict]:
+        return await self._call(self._client.close_all_for, symbol, deviation, side, priority=PRIORITY_TRADE)
+
+    async def close_all(self, deviation: int = 20, side: str | None = None) -> list[dict]:
+        return await self._call(self._client.close_all, deviation, side, priority=PRIORITY_TRADE)
+
+
+bridge = MT5Bridge()
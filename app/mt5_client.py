@@ -1,8 +1,14 @@
 import os
+import copy
+import time
 import logging
+import threading
 from datetime import datetime, timezone
+from functools import wraps
 from typing import Optional
 
+from app.bars import columns_to_rows, empty_columns, rates_to_columns
+
 try:
     import MetaTrader5 as mt5
 except Exception as e:  # pragma: no cover
@@ -25,12 +31,103 @@ TF_MAP = {
 }
 
 
+def _ttl_env(name: str, default_ms: int) -> float:
+    try:
+        return max(0, int(os.getenv(name, str(default_ms)) or default_ms)) / 1000.0
+    except Exception:
+        return default_ms / 1000.0
+
+
+# Snapshot TTLs in seconds per object kind; 0 disables caching for that kind.
+SNAPSHOT_TTLS = {
+    "positions": _ttl_env("MT5_CACHE_POSITIONS_MS", 1000),
+    "account": _ttl_env("MT5_CACHE_ACCOUNT_MS", 2000),
+    "symbol_info": _ttl_env("MT5_CACHE_SYMBOL_INFO_MS", 60000),
+}
+
+
+def _invalidates(*kinds: str):
+    """Drop cached snapshots of ``kinds`` once the wrapped trade call returns or fails."""
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return fn(self, *args, **kwargs)
+            finally:
+                self.invalidate_snapshots(*kinds)
+
+        return wrapper
+
+    return decorator
+
+
 class MT5Client:
     def __init__(self) -> None:
         self.initialized = False
         self.logger = logging.getLogger("mt5app.mt5")
         self.current_login: Optional[int] = None
         self.last_login_error: Optional[tuple[int, str]] = None
+        # Short-lived copies of positions / account / symbol info shared by all callers.
+        self._snap_lock = threading.Lock()
+        self._snap: dict[tuple, tuple[float, object]] = {}
+        self._snap_gen = 0
+        self._snap_hits: dict[str, int] = {k: 0 for k in SNAPSHOT_TTLS}
+        self._snap_misses: dict[str, int] = {k: 0 for k in SNAPSHOT_TTLS}
+
+    # --- Snapshot cache ---
+
+    def cached_snapshot(self, key: tuple):
+        """Return a copy of a fresh cached snapshot, or None; never touches the terminal."""
+        kind = key[0]
+        ttl = SNAPSHOT_TTLS.get(kind, 0.0)
+        if ttl <= 0:
+            return None
+        with self._snap_lock:
+            item = self._snap.get(key)
+            if item is None or (time.monotonic() - item[0]) > ttl:
+                return None
+            self._snap_hits[kind] += 1
+            value = item[1]
+        return copy.deepcopy(value)
+
+    def _snapshot(self, key: tuple, loader):
+        cached = self.cached_snapshot(key)
+        if cached is not None:
+            return cached
+        kind = key[0]
+        with self._snap_lock:
+            gen = self._snap_gen
+            self._snap_misses[kind] += 1
+        value = loader()
+        if SNAPSHOT_TTLS.get(kind, 0.0) > 0:
+            with self._snap_lock:
+                # A trade that finished while we were loading makes this value stale.
+                if gen == self._snap_gen:
+                    self._snap[key] = (time.monotonic(), copy.deepcopy(value))
+        return value
+
+    def invalidate_snapshots(self, *kinds: str) -> None:
+        """Forget cached snapshots of the given kinds (all kinds when none given)."""
+        with self._snap_lock:
+            self._snap_gen += 1
+            if not kinds:
+                self._snap.clear()
+                return
+            for key in [k for k in self._snap if k[0] in kinds]:
+                del self._snap[key]
+
+    def snapshot_stats(self) -> dict:
+        with self._snap_lock:
+            return {
+                kind: {
+                    "ttl_ms": int(ttl * 1000),
+                    "hits": self._snap_hits[kind],
+                    "misses": self._snap_misses[kind],
+                    "entries": sum(1 for k in self._snap if k[0] == kind),
+                }
+                for kind, ttl in SNAPSHOT_TTLS.items()
+            }
 
     # Backoff between failed initialize attempts to avoid log spam
     _last_init_attempt: float = 0.0
@@ -80,6 +177,7 @@ class MT5Client:
                 self.last_login_error = None
 
         self.initialized = True
+        self.invalidate_snapshots()
         info = mt5.account_info()
         if info:
             try:
@@ -87,6 +185,7 @@ class MT5Client:
             except (TypeError, ValueError):
                 self.current_login = None
 
+    @_invalidates()
     def login(self, account: int, password: str, server: Optional[str] = None) -> bool:
         """Ensure MT5 session is authenticated for the requested account.
 
@@ -152,6 +251,16 @@ class MT5Client:
         return False
 
     def fetch_bars(self, symbol: str, timeframe: str, count: int = 500) -> list[dict]:
+        return columns_to_rows(self.fetch_bar_columns(symbol, timeframe, count))
+
+    def fetch_bars_since(self, symbol: str, timeframe: str, since_dt) -> list[dict]:
+        return columns_to_rows(self.fetch_bar_columns_since(symbol, timeframe, since_dt))
+
+    def fetch_bars_range(self, symbol: str, timeframe: str, start_dt, end_dt) -> list[dict]:
+        return columns_to_rows(self.fetch_bar_columns_range(symbol, timeframe, start_dt, end_dt))
+
+    def fetch_bar_columns(self, symbol: str, timeframe: str, count: int = 500) -> dict:
+        """Latest `count` bars as columnar arrays (see app.bars)."""
         if not self.initialized:
             self.initialize()
 
@@ -170,31 +279,10 @@ class MT5Client:
             code, msg = mt5.last_error()
             raise RuntimeError(f"copy_rates_from_pos failed: {code} {msg}")
 
-        # rates is a numpy structured array; fields are accessible via indexing, not .get
-        names = set(getattr(rates, "dtype", None).names or [])
-        out = []
-        for r in rates:
-            ts = datetime.fromtimestamp(int(r["time"]), tz=timezone.utc)
-            tick_volume = int(r["tick_volume"]) if "tick_volume" in names else 0
-            spread = int(r["spread"]) if "spread" in names else 0
-            real_volume = int(r["real_volume"]) if "real_volume" in names else 0
-            out.append(
-                {
-                    "symbol": symbol,
-                    "timeframe": timeframe,
-                    "ts": ts,
-                    "open": float(r["open"]),
-                    "high": float(r["high"]),
-                    "low": float(r["low"]),
-                    "close": float(r["close"]),
-                    "tick_volume": tick_volume,
-                    "spread": spread,
-                    "real_volume": real_volume,
-                }
-            )
-        return out
+        # rates is a numpy structured array; convert it column-wise in one pass
+        return rates_to_columns(rates, symbol, timeframe)
 
-    def fetch_bars_since(self, symbol: str, timeframe: str, since_dt) -> list[dict]:
+    def fetch_bar_columns_since(self, symbol: str, timeframe: str, since_dt) -> dict:
         """Fetch bars from (since_dt, now] using copy_rates_range to support incremental updates.
         since_dt should be a timezone-aware datetime in UTC (or naive UTC).
         """
@@ -207,7 +295,7 @@ class MT5Client:
 
         # Normalize timestamp to UTC
         if since_dt is None:
-            return []
+            return empty_columns(symbol, timeframe)
         if getattr(since_dt, 'tzinfo', None) is None:
             since_dt = since_dt.replace(tzinfo=timezone.utc)
 
@@ -219,32 +307,11 @@ class MT5Client:
         if rates is None:
             code, msg = mt5.last_error()
             self.logger.warning("copy_rates_range returned None for %s %s (since %s): %s %s", symbol, timeframe, since_dt, code, msg)
-            return []
+            return empty_columns(symbol, timeframe)
 
-        names = set(getattr(rates, "dtype", None).names or [])
-        out = []
-        for r in rates:
-            ts = datetime.fromtimestamp(int(r["time"]), tz=timezone.utc)
-            tick_volume = int(r["tick_volume"]) if "tick_volume" in names else 0
-            spread = int(r["spread"]) if "spread" in names else 0
-            real_volume = int(r["real_volume"]) if "real_volume" in names else 0
-            out.append(
-                {
-                    "symbol": symbol,
-                    "timeframe": timeframe,
-                    "ts": ts,
-                    "open": float(r["open"]),
-                    "high": float(r["high"]),
-                    "low": float(r["low"]),
-                    "close": float(r["close"]),
-                    "tick_volume": tick_volume,
-                    "spread": spread,
-                    "real_volume": real_volume,
-                }
-            )
-        return out
+        return rates_to_columns(rates, symbol, timeframe)
 
-    def fetch_bars_range(self, symbol: str, timeframe: str, start_dt, end_dt) -> list[dict]:
+    def fetch_bar_columns_range(self, symbol: str, timeframe: str, start_dt, end_dt) -> dict:
         """Fetch bars in [start_dt, end_dt] using copy_rates_range.
         Datetimes should be timezone-aware UTC (or naive UTC). A small future buffer is applied to end_dt
         using MT5_HISTORY_FUTURE_HOURS env (default 12) to avoid boundary misses.
@@ -257,7 +324,7 @@ class MT5Client:
         tf = TF_MAP[timeframe]
 
         if start_dt is None or end_dt is None:
-            return []
+            return empty_columns(symbol, timeframe)
         if getattr(start_dt, 'tzinfo', None) is None:
             start_dt = start_dt.replace(tzinfo=timezone.utc)
         if getattr(end_dt, 'tzinfo', None) is None:
@@ -277,30 +344,9 @@ class MT5Client:
         if rates is None:
             code, msg = mt5.last_error()
             self.logger.warning("copy_rates_range returned None for %s %s (%s→%s): %s %s", symbol, timeframe, start_dt, eff_end, code, msg)
-            return []
+            return empty_columns(symbol, timeframe)
 
-        names = set(getattr(rates, "dtype", None).names or [])
-        out = []
-        for r in rates:
-            ts = datetime.fromtimestamp(int(r["time"]), tz=timezone.utc)
-            tick_volume = int(r["tick_volume"]) if "tick_volume" in names else 0
-            spread = int(r["spread"]) if "spread" in names else 0
-            real_volume = int(r["real_volume"]) if "real_volume" in names else 0
-            out.append(
-                {
-                    "symbol": symbol,
-                    "timeframe": timeframe,
-                    "ts": ts,
-                    "open": float(r["open"]),
-                    "high": float(r["high"]),
-                    "low": float(r["low"]),
-                    "close": float(r["close"]),
-                    "tick_volume": tick_volume,
-                    "spread": spread,
-                    "real_volume": real_volume,
-                }
-            )
-        return out
+        return rates_to_columns(rates, symbol, timeframe)
 
     # --- Trading helpers (demo-first; use at your own risk) ---
     def _ensure_initialized(self):
@@ -309,7 +355,7 @@ class MT5Client:
 
     def symbol_info(self, symbol: str):
         self._ensure_initialized()
-        return mt5.symbol_info(symbol)
+        return self._snapshot(("symbol_info", symbol), lambda: mt5.symbol_info(symbol))
 
     def _current_price(self, symbol: str, side: str) -> float:
         tick = mt5.symbol_info_tick(symbol)
@@ -327,12 +373,27 @@ class MT5Client:
             return mt5.ORDER_FILLING_RETURN
         return getattr(mt5, "ORDER_FILLING_FOK", 0)
 
-    def positions_for(self, symbol: str):
+    def positions_for(self, symbol: str | None = None, *, fresh: bool = False):
+        """Raw MT5 positions for a symbol, or for every symbol when omitted.
+
+        Served from the snapshot cache unless ``fresh`` is set.
+        """
         self._ensure_initialized()
-        return mt5.positions_get(symbol=symbol) or []
+
+        def load():
+            if not symbol:
+                return tuple(mt5.positions_get() or ())
+            return tuple(mt5.positions_get(symbol=symbol) or ())
+
+        if fresh:
+            return load()
+        return self._snapshot(("positions", "raw", symbol or "*"), load)
 
     def list_positions(self, symbol: str) -> list[dict]:
         """Return simplified open positions for a symbol."""
+        return self._snapshot(("positions", "rows", symbol), lambda: self._position_rows(symbol))
+
+    def _position_rows(self, symbol: str) -> list[dict]:
         pos = self.positions_for(symbol)
         out: list[dict] = []
         for p in pos:
@@ -354,6 +415,7 @@ class MT5Client:
                 continue
         return out
 
+    @_invalidates("positions", "account")
     def modify_position_sltp(self, symbol: str, ticket: int, sl: float | None, tp: float | None) -> dict:
         """Modify SL/TP for a single open position by ticket.
 
@@ -391,9 +453,11 @@ class MT5Client:
 
     def list_positions_all(self) -> list[dict]:
         """Return simplified open positions across all symbols."""
-        self._ensure_initialized()
+        return self._snapshot(("positions", "rows", "*"), self._position_rows_all)
+
+    def _position_rows_all(self) -> list[dict]:
         try:
-            all_pos = mt5.positions_get() or []
+            all_pos = self.positions_for(None)
         except Exception:
             all_pos = []
         out: list[dict] = []
@@ -414,6 +478,7 @@ class MT5Client:
                 continue
         return out
 
+    @_invalidates("positions", "account")
     def place_market(self, symbol: str, side: str, volume: float, deviation: int = 20, comment: str = "auto-quant", sl: float | None = None, tp: float | None = None) -> dict:
         self._ensure_initialized()
         info = self.symbol_info(symbol)
@@ -462,6 +527,7 @@ class MT5Client:
             "comment": getattr(result, "comment", ""),
         }
 
+    @_invalidates("positions", "account")
     def close_position(self, position, deviation: int = 20) -> dict:
         """Attempt to close a single position by ticket (hedging-safe)."""
         self._ensure_initialized()
@@ -521,7 +587,7 @@ class MT5Client:
 
     def close_all_for(self, symbol: str, deviation: int = 20, side: str | None = None) -> list[dict]:
         # In netting accounts, sending the opposite market order with same volume reduces/closes
-        pos = self.positions_for(symbol)
+        pos = self.positions_for(symbol, fresh=True)
         self.logger.info("close_all_for symbol=%s positions=%d side=%s", symbol, len(pos), side)
         out = []
         for p in pos:
@@ -569,7 +635,7 @@ class MT5Client:
         # Enrich with symbol metadata when available so the UI can format prices precisely
         info = None
         try:
-            info = mt5.symbol_info(symbol)
+            info = self.symbol_info(symbol)
         except Exception:
             info = None
         digits = int(getattr(info, "digits", 0) or 0) if info is not None else None
@@ -693,6 +759,9 @@ class MT5Client:
 
     def account_info(self) -> dict:
         self._ensure_initialized()
+        return self._snapshot(("account",), self._load_account_info)
+
+    def _load_account_info(self) -> dict:
         info = mt5.account_info()
         if not info:
             code, msg = mt5.last_error()
@@ -4,7 +4,7 @@ import re
 import json
 import logging
 import asyncio
-from functools import partial
+import time
 from datetime import datetime, timezone, timedelta
 from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
@@ -17,14 +17,15 @@ from tornado.httpclient import AsyncHTTPClient, HTTPRequest
 from tornado.log import access_log
 from dotenv import load_dotenv
 import numpy as np
-from statsmodels.tsa.seasonal import STL
 
 from app.db import (
     create_pool,
     init_schema,
-    upsert_ohlc_bars,
+    migrate_ohlc_bars_to_float,
+    upsert_ohlc_columns,
     fetch_ohlc_bars,
-    fetch_ohlc_bars_range,
+    fetch_ohlc_arrays,
+    ohlc_window_marker,
     ohlc_range,
     set_pref,
     get_pref,
@@ -32,11 +33,18 @@ from app.db import (
     set_prefs,
     get_prefs,
     create_stl_run,
-    insert_stl_components,
     list_stl_runs,
+    stl_runs_marker,
     get_stl_run,
     delete_stl_run,
     fetch_stl_run_data,
+    fetch_stl_run_columns,
+    find_stl_run_by_fingerprint,
+    find_stl_runs_by_fingerprints,
+    create_stl_runs,
+    prune_stl_runs,
+    fetch_close_series_batch,
+    STL_COMPONENT_FIELDS,
     insert_health_run,
     list_health_runs,
     get_health_run_by_id,
@@ -54,7 +62,22 @@ from app.db import (
     list_order_plan_links,
 )
 from app.mt5_client import client as mt5_client
+from app.mt5_bridge import bridge as mt5_bridge, AsyncMT5Client, PRIORITY_INTERACTIVE, PRIORITY_BACKFILL
+from app.bars import BAR_FIELDS, columns_len, columns_to_rows, rows_to_columns
+from app.bar_cache import bar_cache
+from app.tick_stream import TickSampler
+from app.ws_topics import UpdatesHub
+from app.jsonio import dumps, dumps_text
+from app.wire import negotiate_format, not_modified, strong_etag, write_columns
+from app.static_assets import (
+    CompressionTransform,
+    PrecompressedStaticFileHandler,
+    ServiceWorkerHandler,
+    precompress_static,
+)
 from app.strategy import crossover_strategy
+from app.stl_worker import run_stl, stl_engine, stl_fingerprint, shutdown_executor as shutdown_stl_workers
+from app.stl_incremental import incremental_enabled, plan_tail_refit, recall_state, remember_state, splice_tail
 from app.news_fetcher import fetch_symbol_digest
 from app.news_fetcher import fetch_fmp_snapshot
 from app.news_fetcher import fetch_fmp_forex_latest
@@ -67,6 +90,12 @@ except Exception:  # pragma: no cover - optional dependency
 
 
 EXECUTOR = ThreadPoolExecutor(max_workers=2)
+# Coroutines reach the terminal only through this facade (runs on the MT5 bridge thread).
+mt5_async = AsyncMT5Client(mt5_client, mt5_bridge)
+# /ws/updates clients and the symbols/timeframes/event types each one follows.
+UPDATES_HUB = UpdatesHub()
+# One terminal read per subscribed symbol per interval, shared by all clients; pushed via their outboxes.
+TICK_SAMPLER = TickSampler(mt5_async.get_tick, UPDATES_HUB.send)
 logger = logging.getLogger("mt5app")
 
 # Toggle noisy background/backfill logging without changing overall log level.
@@ -142,7 +171,6 @@ async def _resolve_symbol_weight(symbol: str) -> float:
     except Exception:
         return default
 
-WS_CLIENTS: set = set()
 NEWS_BACKFILL_CB = None
 BALANCE_CB = None
 CLOSED_ORDERS_CB = None
@@ -1003,23 +1031,11 @@ def _run_news_analysis(ai_client: MixedAIRequestJSONBase, article_text: str) ->
 
 
 async def _broadcast_ws(event: dict[str, object]) -> None:
-    """Send an event to all connected websocket clients."""
-    if not WS_CLIENTS:
-        return
-    msg = json.dumps(event)
-    dead = []
-    futures = []
-    for client in list(WS_CLIENTS):
-        try:
-            fut = client.write_message(msg)
-            if fut is not None:
-                futures.append(fut)
-        except Exception:
-            dead.append(client)
-    for client in dead:
-        WS_CLIENTS.discard(client)
-    if futures:
-        await asyncio.gather(*futures, return_exceptions=True)
+    """Queue an event for the websocket clients subscribed to its topic.
+
+    Returns without waiting for any socket; each client drains its own outbox.
+    """
+    UPDATES_HUB.publish(event)
 
 
 async def emit_fetch_event(
@@ -1035,6 +1051,7 @@ async def emit_fetch_event(
     status: str,
     note: str | None = None,
     error: str | None = None,
+    updated: int = 0,
 ) -> None:
     """Broadcast a standardized fetch-complete event to connected clients."""
     event = {
@@ -1045,6 +1062,7 @@ async def emit_fetch_event(
         "mode": mode,
         "fetch_mode": fetch_mode,
         "inserted": inserted,
+        "updated": updated,
         "fetched": fetched,
         "scope": scope,
         "background": background,
@@ -1057,6 +1075,40 @@ async def emit_fetch_event(
     await _broadcast_ws(event)
 
 
+async def emit_stl_progress(
+    *,
+    batch_id: str,
+    scope: str | None,
+    status: str,
+    total: int,
+    done: int,
+    failed: int,
+    reused: int,
+    started: float,
+) -> None:
+    """Aggregate progress of an STL batch; ``done`` counts stored, reused and failed pairs."""
+    elapsed = time.monotonic() - started
+    eta = None
+    if done >= total:
+        eta = 0.0
+    elif done:
+        eta = elapsed / done * (total - done)
+    event = {
+        "type": "stl_progress",
+        "ts": datetime.now(timezone.utc).isoformat(),
+        "batch_id": batch_id,
+        "scope": scope,
+        "status": status,
+        "total": total,
+        "done": done,
+        "failed": failed,
+        "reused": reused,
+        "elapsed_s": round(elapsed, 2),
+        "eta_s": round(eta, 1) if eta is not None else None,
+    }
+    await _broadcast_ws(event)
+
+
 async def emit_stl_event(
     *,
     symbol: str,
@@ -1235,6 +1287,16 @@ def _dt_to_iso(value):
     return value.isoformat()
 
 
+def _parse_since(value: str | None) -> datetime | None:
+    """``since=`` as epoch seconds or an ISO timestamp; raises ValueError when malformed."""
+    if value is None or not value.strip():
+        return None
+    value = value.strip()
+    if value.lstrip("-").isdigit():
+        return datetime.fromtimestamp(int(value), tz=timezone.utc)
+    return _normalize_dt(value)
+
+
 def _serialize_run(run: dict | None) -> dict | None:
     if not run:
         return None
@@ -1247,10 +1309,52 @@ def _serialize_run(run: dict | None) -> dict | None:
         "end_ts": _dt_to_iso(run.get("end_ts")),
         "rows_count": run.get("rows_count"),
         "created_at": _dt_to_iso(run.get("created_at")),
+        "engine": run.get("engine") or "statsmodels",
     }
 
 
-async def _compute_and_store_stl(
+async def _stl_state(pool, symbol: str, timeframe: str) -> dict | None:
+    """Last decomposition of symbol/TF for tail updates: in memory, else the latest stored run."""
+    state = recall_state(symbol, timeframe)
+    if state is not None:
+        return state
+    runs = await list_stl_runs(pool, str(symbol).upper(), str(timeframe).upper())
+    if not runs or runs[0].get("engine", "statsmodels") != "statsmodels":
+        return None
+    data = await fetch_stl_run_columns(pool, int(runs[0]["id"]))
+    if not data or len(data["columns"]["ts"]) == 0:
+        return None
+    cols = data["columns"]
+    if not all(np.isfinite(cols[name]).all() for name in ("close", "trend", "seasonal")):
+        return None
+    # After a restart the stored run counts as a fresh full fit.
+    remember_state(symbol, timeframe, period=int(data["run"]["period"]), **{k: cols[k] for k in STL_COMPONENT_FIELDS})
+    return recall_state(symbol, timeframe)
+
+
+STL_ROBUST = True
+# Points per STL fit (newest bars of the range) for computes and the needs_compute check.
+STL_MAX_POINTS = 1500
+# Finished runs stored per bulk insert by _compute_stl_batch.
+STL_BATCH_WRITE = 16
+
+
+async def _prune_stl_runs(pool, symbol: str, timeframe: str, *, keep_run_id: int | None) -> None:
+    """Delete every run of symbol/TF except ``keep_run_id`` (which may be an older, reused run)."""
+    try:
+        runs = await list_stl_runs(pool, str(symbol).upper(), str(timeframe).upper())
+        for old in runs:
+            if keep_run_id is not None and int(old["id"]) == int(keep_run_id):
+                continue
+            try:
+                await delete_stl_run(pool, int(old["id"]))
+            except Exception:
+                pass
+    except Exception:
+        pass
+
+
+async def _stl_inputs(
     pool,
     symbol: str,
     timeframe: str,
@@ -1259,8 +1363,11 @@ async def _compute_and_store_stl(
     start_dt: datetime | None = None,
     end_dt: datetime | None = None,
     max_points: int | None = None,
+    range_info: dict | None = None,
+    engine: str = "statsmodels",
 ) -> dict:
-    range_info = await ohlc_range(pool, symbol, timeframe)
+    """Bars, period and input fingerprint an STL fit of this request would use."""
+    range_info = range_info or await ohlc_range(pool, symbol, timeframe)
     if not range_info:
         raise ValueError("No bar data available for STL decomposition")
     dataset_start = range_info["start_ts"]
@@ -1273,89 +1380,384 @@ async def _compute_and_store_stl(
         end_dt = dataset_end
     if end_dt < start_dt:
         raise ValueError("End timestamp precedes start timestamp for STL computation")
-    rows = await fetch_ohlc_bars_range(
-        pool,
-        symbol,
-        timeframe,
-        start_ts=start_dt,
-        end_ts=end_dt,
-    )
-    if not rows:
-        raise ValueError("No bar data found in requested range for STL decomposition")
     # Enforce a cap on the number of points used for STL (use the most recent window)
-    if isinstance(max_points, int) and max_points > 0 and len(rows) > max_points:
-        rows = rows[-max_points:]
-    times: list[datetime] = []
-    closes: list[float] = []
-    for row in rows:
-        close = row.get("close")
-        ts_raw = row.get("ts")
-        if close is None or ts_raw is None:
-            continue
-        try:
-            ts = datetime.fromisoformat(ts_raw)
-        except Exception as exc:  # pragma: no cover - defensive
-            raise ValueError(f"Invalid timestamp encountered: {ts_raw}") from exc
-        if ts.tzinfo is None:
-            ts = ts.replace(tzinfo=timezone.utc)
-        times.append(ts)
-        closes.append(float(close))
-    if len(closes) < 12:
-        raise ValueError(f"Not enough samples ({len(closes)}) for STL decomposition")
+    cap = max_points if isinstance(max_points, int) and max_points > 0 else None
+    if end_dt >= dataset_end and start_dt <= dataset_start and cap is not None:
+        # Whole dataset, newest ``cap`` bars: an open range can be served by the bar cache.
+        bars = await fetch_ohlc_arrays(pool, symbol, timeframe, limit=cap)
+    else:
+        bars = await fetch_ohlc_arrays(pool, symbol, timeframe, start_dt, end_dt, limit=cap)
+    return {
+        **_stl_prepare(symbol, timeframe, bars["ts"], bars["close"], period=period, engine=engine),
+        "end_dt": end_dt,
+        "dataset_end": dataset_end,
+    }
+
+
+def _stl_prepare(
+    symbol: str,
+    timeframe: str,
+    ts_arr: np.ndarray,
+    series: np.ndarray,
+    *,
+    period: int | None = None,
+    engine: str = "statsmodels",
+) -> dict:
+    """Period, finite points and input fingerprint of an STL fit over ``series``."""
+    if len(series) == 0:
+        raise ValueError("No bar data found in requested range for STL decomposition")
+    if len(series) < 12:
+        raise ValueError(f"Not enough samples ({len(series)}) for STL decomposition")
     base_period = period or _stl_period_for_tf(timeframe)
     base_period = max(3, int(base_period))
-    adjusted_period = min(base_period, max(3, len(closes) // 2))
+    adjusted_period = min(base_period, max(3, len(series) // 2))
     if adjusted_period < 3:
         raise ValueError("Unable to determine a valid STL period for the available data")
-    series = np.asarray(closes, dtype=float)
     if not np.isfinite(series).all():
         mask = np.isfinite(series)
         series = series[mask]
-        times = [t for t, keep in zip(times, mask, strict=False) if keep]
+        ts_arr = ts_arr[mask]
     if len(series) < 3:
         raise ValueError("Insufficient finite values for STL decomposition")
-    stl = STL(series, period=adjusted_period, robust=True)
-    res = stl.fit()
-    records: list[dict] = []
-    for ts, close_val, trend_val, seasonal_val, resid_val in zip(
-        times,
-        series,
-        res.trend,
-        res.seasonal,
-        res.resid,
-        strict=False,
-    ):
-        records.append(
-            {
-                "ts": ts,
-                "close": float(close_val),
-                "trend": float(trend_val),
-                "seasonal": float(seasonal_val),
-                "resid": float(resid_val),
-            }
+    return {
+        "series": series,
+        "ts": ts_arr,
+        "period": adjusted_period,
+        "fingerprint": stl_fingerprint(symbol, timeframe, adjusted_period, STL_ROBUST, ts_arr, series, engine),
+        "tail_fingerprint": stl_fingerprint(
+            symbol, timeframe, adjusted_period, STL_ROBUST, ts_arr, series, engine, fit="tail"
+        ),
+    }
+
+
+async def _compute_and_store_stl(
+    pool,
+    symbol: str,
+    timeframe: str,
+    *,
+    period: int | None = None,
+    start_dt: datetime | None = None,
+    end_dt: datetime | None = None,
+    max_points: int | None = None,
+    incremental: bool = False,
+    engine: str | None = None,
+) -> dict:
+    """Fit STL over the newest ``max_points`` bars of the range and store it as a new run.
+
+    ``engine`` is "statsmodels" or "fast" (see app.stl_worker; default env
+    STL_ENGINE). A full-fit run of the same inputs (same fingerprint) is
+    returned instead of fitting again. With ``incremental`` and a stored
+    statsmodels decomposition the new window extends, only the tail is refit
+    (see app.stl_incremental) and a tail run of the same inputs is reused
+    too; otherwise a full fit. Tail runs carry their own fingerprint, so a
+    non-incremental compute never returns one.
+    """
+    engine = stl_engine(engine)
+    inputs = await _stl_inputs(
+        pool, symbol, timeframe, period=period, start_dt=start_dt, end_dt=end_dt, max_points=max_points, engine=engine
+    )
+    series = inputs["series"]
+    ts_arr = inputs["ts"]
+    adjusted_period = inputs["period"]
+    fingerprint = inputs["fingerprint"]
+    first_ts = datetime.fromtimestamp(int(ts_arr[0]), tz=timezone.utc)
+    last_ts = datetime.fromtimestamp(int(ts_arr[-1]), tz=timezone.utc)
+    existing = await find_stl_run_by_fingerprint(pool, str(symbol).upper(), str(timeframe).upper(), fingerprint)
+    if existing is None and incremental:
+        existing = await find_stl_run_by_fingerprint(
+            pool, str(symbol).upper(), str(timeframe).upper(), inputs["tail_fingerprint"]
+        )
+    if existing is not None:
+        return _reused_stl_result(existing)
+    plan, fit_reason = None, "requested"
+    state = None
+    # The fast engine is cheaper than a tail splice; tail updates are for statsmodels fits.
+    if incremental and engine == "statsmodels" and incremental_enabled():
+        state = await _stl_state(pool, symbol, timeframe)
+        plan, fit_reason = plan_tail_refit(state, ts_arr, series, adjusted_period)
+    # Fit in the STL process pool so the event loop keeps serving requests.
+    if plan is not None:
+        tail_trend, tail_seasonal, _ = await run_stl(series[-plan["window"]:], adjusted_period, STL_ROBUST, engine)
+        trend, seasonal, resid = splice_tail(state, plan, series, tail_trend, tail_seasonal)
+        since_full = state["since_full"] + plan["appended"]
+    else:
+        trend, seasonal, resid = await run_stl(series, adjusted_period, STL_ROBUST, engine)
+        since_full = 0
+    if engine == "statsmodels" and inputs["end_dt"] >= inputs["dataset_end"]:
+        # Window reaches the newest bar: later appends can refit from here.
+        remember_state(
+            symbol,
+            timeframe,
+            period=adjusted_period,
+            ts=ts_arr,
+            close=series,
+            trend=trend,
+            seasonal=seasonal,
+            resid=resid,
+            since_full=since_full,
         )
+    # Run row and packed components in one statement.
     run_meta = await create_stl_run(
         pool,
         symbol=symbol,
         timeframe=timeframe,
         period=adjusted_period,
-        start_ts=times[0],
-        end_ts=times[-1],
+        start_ts=first_ts,
+        end_ts=last_ts,
         rows_count=len(series),
+        columns={"ts": ts_arr, "close": series, "trend": trend, "seasonal": seasonal, "resid": resid},
+        fingerprint=inputs["tail_fingerprint"] if plan is not None else fingerprint,
+        engine=engine,
     )
-    inserted = await insert_stl_components(pool, run_meta["id"], records)
     created_at = run_meta.get("created_at")
     return {
         "run_id": run_meta["id"],
-        "inserted": inserted,
-        "points": len(records),
+        "inserted": len(series),
+        "points": len(series),
         "period": adjusted_period,
-        "start_ts": times[0].isoformat(),
-        "end_ts": times[-1].isoformat(),
+        "start_ts": first_ts.isoformat(),
+        "end_ts": last_ts.isoformat(),
         "created_at": created_at.isoformat() if created_at else None,
+        "fit": "tail" if plan is not None else "full",
+        "fit_reason": fit_reason,
+        "engine": engine,
+    }
+
+
+def _reused_stl_result(run: dict) -> dict:
+    """Compute result for a stored run whose fingerprint matched the requested inputs."""
+    return {
+        "run_id": run["id"],
+        "inserted": 0,
+        "points": run["rows_count"],
+        "period": run["period"],
+        "start_ts": _dt_to_iso(run["start_ts"]),
+        "end_ts": _dt_to_iso(run["end_ts"]),
+        "created_at": _dt_to_iso(run.get("created_at")),
+        "fit": "reused",
+        "fit_reason": "fingerprint",
+        "engine": run.get("engine") or "statsmodels",
     }
 
 
+async def _compute_stl_batch(
+    pool,
+    pairs: list[tuple[str, str]],
+    *,
+    period: int | None = None,
+    max_points: int = STL_MAX_POINTS,
+    start_dt: datetime | None = None,
+    end_dt: datetime | None = None,
+    engine: str | None = None,
+    scope: str | None = "all",
+    background: bool = True,
+) -> list[dict]:
+    """Fit STL for many symbol/TF pairs: one load, parallel fits, bulk writes.
+
+    The newest ``max_points`` closes of every pair within ``start_dt`` ..
+    ``end_dt`` (open ends allowed) come from one query, or app.bar_cache when
+    no range is given. The fingerprint hashes the loaded bars, so it follows
+    the range. Pairs whose inputs match a stored run's fingerprint reuse
+    it; the rest are fitted concurrently in the STL process pool and stored
+    STL_BATCH_WRITE runs per transaction as they finish. Each pair emits its
+    ``stl_complete`` events and the batch reports ``stl_progress`` with
+    done/total/ETA. Older runs of every pair are pruned in one statement at
+    the end. Returns one result per pair, in ``pairs`` order.
+    """
+    engine = stl_engine(engine)
+    start_dt = _normalize_dt(start_dt)
+    end_dt = _normalize_dt(end_dt)
+    event_start = _dt_to_iso(start_dt)
+    event_end = _dt_to_iso(end_dt)
+    started = time.monotonic()
+    batch_id = f"stl-{time.time_ns() // 1_000_000}"
+    total = len(pairs)
+    results: dict[tuple[str, str], dict] = {}
+    counts = {"failed": 0, "reused": 0}
+
+    async def _progress(status: str = "running") -> None:
+        await emit_stl_progress(
+            batch_id=batch_id,
+            scope=scope,
+            status=status,
+            total=total,
+            done=len(results),
+            failed=counts["failed"],
+            reused=counts["reused"],
+            started=started,
+        )
+
+    async def _failed(sym: str, tf: str, exc: Exception) -> None:
+        counts["failed"] += 1
+        results[(sym, tf)] = {"ok": False, "error": str(exc)}
+        logger.warning("[stl] %s %s failed: %s", sym, tf, exc)
+        await emit_stl_event(
+            symbol=sym,
+            timeframe=tf,
+            period=period,
+            status="error",
+            scope=scope,
+            background=background,
+            start_ts=event_start,
+            end_ts=event_end,
+            error=str(exc),
+        )
+
+    async def _completed(sym: str, tf: str, result: dict) -> None:
+        results[(sym, tf)] = {"ok": True, **result}
+        await emit_stl_event(
+            symbol=sym,
+            timeframe=tf,
+            period=result.get("period"),
+            status="completed",
+            scope=scope,
+            background=background,
+            points=result.get("points"),
+            note=f"inserted={result.get('inserted')} engine={engine}",
+            run_id=result.get("run_id"),
+            start_ts=result.get("start_ts"),
+            end_ts=result.get("end_ts"),
+            created_at=result.get("created_at"),
+        )
+
+    for sym, tf in pairs:
+        await emit_stl_event(
+            symbol=sym,
+            timeframe=tf,
+            period=period,
+            status="scheduled",
+            scope=scope,
+            background=background,
+            start_ts=event_start,
+            end_ts=event_end,
+        )
+    await _progress("started")
+
+    try:
+        if start_dt is not None and end_dt is not None and end_dt < start_dt:
+            raise ValueError("End timestamp precedes start timestamp for STL computation")
+        series = await fetch_close_series_batch(pool, pairs, limit=max_points, start=start_dt, end=end_dt)
+    except Exception as exc:
+        for sym, tf in pairs:
+            await _failed(sym, tf, exc)
+        await _progress("failed")
+        return [{"symbol": sym, "timeframe": tf, **results[(sym, tf)]} for sym, tf in pairs]
+
+    prepared: dict[tuple[str, str], dict] = {}
+    for sym, tf in pairs:
+        cols = series.get((sym, tf))
+        try:
+            if cols is None:
+                if start_dt is not None or end_dt is not None:
+                    raise ValueError("No bar data found in requested range for STL decomposition")
+                raise ValueError("No bar data available for STL decomposition")
+            prepared[(sym, tf)] = _stl_prepare(sym, tf, cols["ts"], cols["close"], period=period, engine=engine)
+        except ValueError as exc:
+            await _failed(sym, tf, exc)
+
+    existing = await find_stl_runs_by_fingerprints(pool, [inputs["fingerprint"] for inputs in prepared.values()])
+    to_fit: list[tuple[str, str]] = []
+    for key, inputs in prepared.items():
+        run = existing.get(inputs["fingerprint"])
+        if run is None:
+            to_fit.append(key)
+            continue
+        counts["reused"] += 1
+        await _completed(*key, _reused_stl_result(run))
+    if results:
+        await _progress()
+
+    async def _fit(key: tuple[str, str]):
+        inputs = prepared[key]
+        try:
+            return key, await run_stl(inputs["series"], inputs["period"], STL_ROBUST, engine), None
+        except Exception as exc:
+            return key, None, exc
+
+    pending: list[tuple[tuple[str, str], dict]] = []
+
+    async def _store() -> None:
+        chunk = pending[:]
+        pending.clear()
+        try:
+            metas = await create_stl_runs(pool, [row for _key, row in chunk])
+        except Exception as exc:
+            for key, _row in chunk:
+                await _failed(*key, exc)
+        else:
+            for (key, row), meta in zip(chunk, metas):
+                await _completed(
+                    *key,
+                    {
+                        "run_id": meta["id"],
+                        "inserted": row["rows_count"],
+                        "points": row["rows_count"],
+                        "period": row["period"],
+                        "start_ts": row["start_ts"].isoformat(),
+                        "end_ts": row["end_ts"].isoformat(),
+                        "created_at": _dt_to_iso(meta["created_at"]),
+                        "fit": "full",
+                        "fit_reason": "batch",
+                        "engine": engine,
+                    },
+                )
+        await _progress()
+
+    # The process pool queues the fits itself; store them in the order they finish.
+    for next_fit in asyncio.as_completed([_fit(key) for key in to_fit]):
+        key, components, exc = await next_fit
+        if exc is not None:
+            await _failed(*key, exc)
+            await _progress()
+            continue
+        trend, seasonal, resid = components
+        inputs = prepared[key]
+        ts_arr, series_arr = inputs["ts"], inputs["series"]
+        if engine == "statsmodels" and end_dt is None:
+            # Newest bars of the pair: later auto-STL appends can refit the tail from here.
+            remember_state(
+                *key, period=inputs["period"], ts=ts_arr, close=series_arr, trend=trend, seasonal=seasonal, resid=resid
+            )
+        pending.append(
+            (
+                key,
+                {
+                    "symbol": key[0],
+                    "timeframe": key[1],
+                    "period": inputs["period"],
+                    "start_ts": datetime.fromtimestamp(int(ts_arr[0]), tz=timezone.utc),
+                    "end_ts": datetime.fromtimestamp(int(ts_arr[-1]), tz=timezone.utc),
+                    "rows_count": len(series_arr),
+                    "columns": {"ts": ts_arr, "close": series_arr, "trend": trend, "seasonal": seasonal, "resid": resid},
+                    "fingerprint": inputs["fingerprint"],
+                    "engine": engine,
+                },
+            )
+        )
+        if len(pending) >= STL_BATCH_WRITE:
+            await _store()
+    if pending:
+        await _store()
+
+    keep = [(sym, tf, res["run_id"]) for (sym, tf), res in results.items() if res.get("ok")]
+    try:
+        await prune_stl_runs(pool, keep)
+    except Exception as exc:
+        logger.warning("[stl] batch %s prune failed: %s", batch_id, exc)
+    await _progress("completed")
+    logger.info(
+        "[stl] batch %s scope=%s: %d pairs, %d fitted, %d reused, %d failed in %.1fs",
+        batch_id,
+        scope,
+        total,
+        total - counts["reused"] - counts["failed"],
+        counts["reused"],
+        counts["failed"],
+        time.monotonic() - started,
+    )
+    return [{"symbol": sym, "timeframe": tf, **results[(sym, tf)]} for sym, tf in pairs]
+
+
 async def _maybe_auto_stl(
     pool,
     *,
@@ -1363,7 +1765,7 @@ async def _maybe_auto_stl(
     timeframe: str,
     inserted: int,
     background: bool = True,
-    limit_points: int = 1500,
+    limit_points: int = STL_MAX_POINTS,
 ) -> None:
     """Automatically recompute STL for a symbol/TF when new bars were inserted.
 
@@ -1422,18 +1824,10 @@ async def _maybe_auto_stl(
             start_dt=None,
             end_dt=None,
             max_points=limit_points,
+            incremental=True,
         )
-        # Prune older STL runs for this symbol×TF (keep latest only)
-        try:
-            runs = await list_stl_runs(pool, str(symbol).upper(), tfu)
-            if runs and len(runs) > 1:
-                for old in runs[1:]:
-                    try:
-                        await delete_stl_run(pool, int(old["id"]))
-                    except Exception:
-                        pass
-        except Exception:
-            pass
+        # Prune other STL runs for this symbol×TF (keep the current one only)
+        await _prune_stl_runs(pool, symbol, tfu, keep_run_id=result.get("run_id"))
         await emit_stl_event(
             symbol=symbol,
             timeframe=timeframe,
@@ -1446,7 +1840,7 @@ async def _maybe_auto_stl(
             start_ts=str(result.get("start_ts") or ""),
             end_ts=str(result.get("end_ts") or ""),
             created_at=str(result.get("created_at") or ""),
-            note=f"inserted={inserted}",
+            note=f"inserted={inserted} fit={result.get('fit')}",
         )
     except Exception as exc:  # pragma: no cover - defensive logging
         try:
@@ -1523,8 +1917,13 @@ def _aggregate_yearly_from_monthly(symbol: str, monthly_bars: list[dict]) -> lis
     return sorted(buckets.values(), key=lambda b: b["ts"])
 
 
-async def _compute_yearly_bars(symbol: str, *, count: int | None = None, since: datetime | None = None) -> list[dict]:
-    loop = tornado.ioloop.IOLoop.current()
+async def _compute_yearly_bars(
+    symbol: str,
+    *,
+    count: int | None = None,
+    since: datetime | None = None,
+    priority: int = PRIORITY_INTERACTIVE,
+) -> list[dict]:
     months_to_fetch = max((count or 20) * 12, 120)
     months_to_fetch = min(months_to_fetch, 1200)
     monthly_bars: list[dict] = []
@@ -1534,11 +1933,9 @@ async def _compute_yearly_bars(symbol: str, *, count: int | None = None, since:
             since_dt = since_dt.replace(tzinfo=timezone.utc)
         # Go back an extra year to ensure full aggregation windows
         since_dt = since_dt - timedelta(days=370)
-        fetch_fn = partial(mt5_client.fetch_bars_since, symbol, "MN1", since_dt)
-        monthly_bars = await loop.run_in_executor(EXECUTOR, fetch_fn)
+        monthly_bars = await mt5_async.fetch_bars_since(symbol, "MN1", since_dt, priority=priority)
     else:
-        fetch_fn = partial(mt5_client.fetch_bars, symbol, "MN1", months_to_fetch)
-        monthly_bars = await loop.run_in_executor(EXECUTOR, fetch_fn)
+        monthly_bars = await mt5_async.fetch_bars(symbol, "MN1", months_to_fetch, priority=priority)
 
     yearly = _aggregate_yearly_from_monthly(symbol, monthly_bars)
     if count and count > 0:
@@ -1560,22 +1957,28 @@ def schedule_symbol_backfill(pool, symbol: str, *, timeframes: list[str] | None
                 days = _default_backfill_days(tf)
                 since = now - timedelta(days=days)
                 if tf == "Y1":
-                    bars = await _compute_yearly_bars(symbol, since=since)
+                    yearly = await _compute_yearly_bars(symbol, since=since, priority=PRIORITY_BACKFILL)
+                    bars = rows_to_columns(yearly, symbol, tf)
                     fetch_mode_name = "derived_yearly"
                 else:
-                    fetch_fn = partial(mt5_client.fetch_bars_since, symbol, tf, since)
-                    bars = await loop.run_in_executor(EXECUTOR, fetch_fn)
+                    bars = await mt5_async.fetch_bar_columns_since(symbol, tf, since, priority=PRIORITY_BACKFILL)
                     fetch_mode_name = "since"
-                if bars:
-                    inserted = await upsert_ohlc_bars(pool, bars)
-                    _backfill_info("[backfill] %s %s +%d bars (inserted=%d)", symbol, tf, len(bars), inserted)
+                fetched = columns_len(bars)
+                res = await upsert_ohlc_columns(pool, bars) if fetched else None
+                changed = (res["inserted"] + res["updated"]) if res else 0
+                if changed:
+                    _backfill_info(
+                        "[backfill] %s %s fetched=%d inserted=%d updated=%d",
+                        symbol, tf, fetched, res["inserted"], res["updated"],
+                    )
                     await emit_fetch_event(
                         symbol=symbol,
                         timeframe=tf,
                         mode="backfill",
                         fetch_mode=fetch_mode_name,
-                        inserted=inserted,
-                        fetched=len(bars),
+                        inserted=res["inserted"],
+                        updated=res["updated"],
+                        fetched=fetched,
                         scope="symbol_backfill",
                         background=True,
                         status="completed",
@@ -1583,22 +1986,9 @@ def schedule_symbol_backfill(pool, symbol: str, *, timeframes: list[str] | None
                     )
                     # Auto STL for updated TF (non-blocking)
                     try:
-                        await _maybe_auto_stl(pool, symbol=symbol, timeframe=tf, inserted=inserted, background=True, limit_points=1500)
+                        await _maybe_auto_stl(pool, symbol=symbol, timeframe=tf, inserted=changed, background=True, limit_points=STL_MAX_POINTS)
                     except Exception:
                         pass
-                else:
-                    await emit_fetch_event(
-                        symbol=symbol,
-                        timeframe=tf,
-                        mode="backfill",
-                        fetch_mode=fetch_mode_name,
-                        inserted=0,
-                        fetched=0,
-                        scope="symbol_backfill",
-                        background=True,
-                        status="completed",
-                        note=f"~{days}d window (no new bars)",
-                    )
             except Exception as exc:  # pragma: no cover - defensive
                 _backfill_warn("[backfill] %s %s failed: %s", symbol, tf, exc)
                 await emit_fetch_event(
@@ -1636,6 +2026,8 @@ async def _perform_fetch(
     """Unified fetch routine used by both the interactive handler and bulk/background jobs."""
     loop = tornado.ioloop.IOLoop.current()
     event_background = background or (mode == "full_async") or deferred
+    # Background and deferred jobs queue behind anything a user is waiting on.
+    priority = PRIORITY_BACKFILL if event_background else PRIORITY_INTERACTIVE
     base_info: dict[str, object] = {
         "ok": False,
         "symbol": symbol,
@@ -1646,27 +2038,26 @@ async def _perform_fetch(
     async def _run_fetch() -> dict[str, object]:
         info = dict(base_info)
         try:
-            bars: list[dict] = []
+            bars: dict | None = None
             fetch_mode: str | None = None
             if from_dt is not None or to_dt is not None:
                 # Range fetch (both bounds required)
                 if from_dt is None or to_dt is None:
                     raise ValueError("both from and to must be provided for range fetch")
                 fetch_mode = "range"
-                fetch_fn = partial(mt5_client.fetch_bars_range, symbol, timeframe, from_dt, to_dt)
-                bars = await loop.run_in_executor(EXECUTOR, fetch_fn)
+                bars = await mt5_async.fetch_bar_columns_range(symbol, timeframe, from_dt, to_dt, priority=priority)
             elif timeframe == "Y1":
                 fetch_mode = "derived_yearly"
                 yearly_count = count if count and count > 0 else None
-                bars = await _compute_yearly_bars(symbol, count=yearly_count)
+                yearly = await _compute_yearly_bars(symbol, count=yearly_count, priority=priority)
+                bars = rows_to_columns(yearly, symbol, timeframe)
                 info["source_timeframe"] = "MN1"
             elif mode == "inc":
                 last = await latest_bar_ts(pool, symbol, timeframe)
                 if last:
                     try:
                         fetch_mode = "inc"
-                        fetch_fn = partial(mt5_client.fetch_bars_since, symbol, timeframe, last)
-                        bars = await loop.run_in_executor(EXECUTOR, fetch_fn)
+                        bars = await mt5_async.fetch_bar_columns_since(symbol, timeframe, last, priority=priority)
                         info["since"] = last.isoformat()
                     except Exception as exc:  # pragma: no cover - fallback handled below
                         logger.warning(
@@ -1677,48 +2068,40 @@ async def _perform_fetch(
                             count,
                         )
                         fetch_mode = "full"
-                        fetch_fn = partial(mt5_client.fetch_bars, symbol, timeframe, count)
-                        bars = await loop.run_in_executor(EXECUTOR, fetch_fn)
+                        bars = await mt5_async.fetch_bar_columns(symbol, timeframe, count, priority=priority)
                 else:
                     fetch_mode = "full"
-                    fetch_fn = partial(mt5_client.fetch_bars, symbol, timeframe, count)
-                    bars = await loop.run_in_executor(EXECUTOR, fetch_fn)
+                    bars = await mt5_async.fetch_bar_columns(symbol, timeframe, count, priority=priority)
             elif mode == "full_async":
                 days = _default_backfill_days(timeframe)
 
                 async def _bg() -> None:
                     since = datetime.now(timezone.utc) - timedelta(days=days)
-                    fetch_fn = partial(mt5_client.fetch_bars_since, symbol, timeframe, since)
                     try:
-                        new_bars = await loop.run_in_executor(EXECUTOR, fetch_fn)
-                        if new_bars:
-                            await upsert_ohlc_bars(pool, new_bars)
-                            _backfill_info("/api/fetch full_async backfill %s %s: +%d", symbol, timeframe, len(new_bars))
-                            await emit_fetch_event(
-                                symbol=symbol,
-                                timeframe=timeframe,
-                                mode=mode,
-                                fetch_mode="since",
-                                inserted=len(new_bars),
-                                fetched=len(new_bars),
-                                scope=event_scope,
-                                background=True,
-                                status="completed",
-                                note=f"backfill ~{days}d",
-                            )
-                        else:
-                            await emit_fetch_event(
-                                symbol=symbol,
-                                timeframe=timeframe,
-                                mode=mode,
-                                fetch_mode="since",
-                                inserted=0,
-                                fetched=0,
-                                scope=event_scope,
-                                background=True,
-                                status="completed",
-                                note=f"backfill ~{days}d (no new bars)",
+                        new_bars = await mt5_async.fetch_bar_columns_since(symbol, timeframe, since, priority=PRIORITY_BACKFILL)
+                        fetched = columns_len(new_bars)
+                        res = await upsert_ohlc_columns(pool, new_bars) if fetched else None
+                        changed = (res["inserted"] + res["updated"]) if res else 0
+                        if changed:
+                            _backfill_info(
+                                "/api/fetch full_async backfill %s %s: fetched=%d inserted=%d updated=%d",
+                                symbol, timeframe, fetched, res["inserted"], res["updated"],
                             )
+                        # The UI saw a "scheduled" event, so always report completion;
+                        # "unchanged" tells it there is nothing to redraw.
+                        await emit_fetch_event(
+                            symbol=symbol,
+                            timeframe=timeframe,
+                            mode=mode,
+                            fetch_mode="since",
+                            inserted=res["inserted"] if res else 0,
+                            updated=res["updated"] if res else 0,
+                            fetched=fetched,
+                            scope=event_scope,
+                            background=True,
+                            status="completed" if changed else "unchanged",
+                            note=f"backfill ~{days}d" if changed else f"backfill ~{days}d (no new bars)",
+                        )
                     except Exception as exc:  # pragma: no cover - logging only
                         _backfill_exc("full_async backfill failed for %s %s: %s", symbol, timeframe, exc)
                         await emit_fetch_event(
@@ -1763,13 +2146,16 @@ async def _perform_fetch(
                 return info
             else:
                 fetch_mode = "full"
-                fetch_fn = partial(mt5_client.fetch_bars, symbol, timeframe, count)
-                bars = await loop.run_in_executor(EXECUTOR, fetch_fn)
+                bars = await mt5_async.fetch_bar_columns(symbol, timeframe, count, priority=priority)
 
             inserted = 0
-            fetched = len(bars)
-            if bars:
-                inserted = await upsert_ohlc_bars(pool, bars)
+            updated = 0
+            fetched = columns_len(bars)
+            if fetched:
+                res = await upsert_ohlc_columns(pool, bars)
+                inserted = res["inserted"]
+                updated = res["updated"]
+            changed = inserted + updated
             if persist_selection:
                 try:
                     await set_prefs(
@@ -1787,6 +2173,7 @@ async def _perform_fetch(
                 {
                     "ok": True,
                     "inserted": inserted,
+                    "updated": updated,
                     "fetched": fetched,
                     "fetch_mode": fetch_mode,
                 }
@@ -1795,24 +2182,28 @@ async def _perform_fetch(
             if schedule_backfill:
                 schedule_symbol_backfill(pool, symbol)
 
-            # Auto STL: recompute for this symbol/timeframe only when new bars were inserted
-            try:
-                loop.spawn_callback(_maybe_auto_stl, pool, symbol=symbol, timeframe=timeframe, inserted=inserted, background=True, limit_points=1500)
-            except Exception:
-                pass
+            # Auto STL: recompute for this symbol/timeframe only when bars actually changed
+            if changed:
+                try:
+                    loop.spawn_callback(_maybe_auto_stl, pool, symbol=symbol, timeframe=timeframe, inserted=changed, background=True, limit_points=STL_MAX_POINTS)
+                except Exception:
+                    pass
 
-            await emit_fetch_event(
-                symbol=symbol,
-                timeframe=timeframe,
-                mode=mode,
-                fetch_mode=fetch_mode,
-                inserted=inserted,
-                fetched=fetched,
-                scope=event_scope,
-                background=event_background,
-                status="ok",
-                note=info.get("since"),
-            )
+            # Unchanged polls stay silent unless a "scheduled" event is awaiting completion.
+            if changed or deferred:
+                await emit_fetch_event(
+                    symbol=symbol,
+                    timeframe=timeframe,
+                    mode=mode,
+                    fetch_mode=fetch_mode,
+                    inserted=inserted,
+                    updated=updated,
+                    fetched=fetched,
+                    scope=event_scope,
+                    background=event_background,
+                    status="ok" if changed else "unchanged",
+                    note=info.get("since"),
+                )
 
             return info
 
@@ -2103,17 +2494,18 @@ class FetchHandler(tornado.web.RequestHandler):
         )
         if info.get("ok"):
             logger.info(
-                "/api/fetch ok symbol=%s tf=%s fetched=%s inserted=%s mode=%s",
+                "/api/fetch ok symbol=%s tf=%s fetched=%s inserted=%s updated=%s mode=%s",
                 symbol,
                 timeframe,
                 info.get("fetched", 0),
                 info.get("inserted", 0),
+                info.get("updated", 0),
                 info.get("fetch_mode"),
             )
         else:
             logger.warning("/api/fetch error symbol=%s tf=%s: %s", symbol, timeframe, info.get("error"))
         self.set_header("Content-Type", "application/json")
-        self.finish(json.dumps(info))
+        self.finish(dumps(info))
 
 
 class DataHandler(tornado.web.RequestHandler):
@@ -2126,10 +2518,39 @@ class DataHandler(tornado.web.RequestHandler):
         limit = int(self.get_argument("limit", default="500"))
         if limit > 1500:
             limit = 1500
-        logger.debug("/api/data symbol=%s tf=%s limit=%s", symbol, timeframe, limit)
-        rows = await fetch_ohlc_bars(self.pool, symbol, timeframe, limit)
+        fmt = negotiate_format(self)
+        since_arg = self.get_argument("since", default=None)
+        try:
+            since_dt = _parse_since(since_arg)
+        except ValueError:
+            self.set_status(400)
+            self.set_header("Content-Type", "application/json")
+            self.finish(dumps({"ok": False, "error": f"invalid since: {since_arg}"}))
+            return
+        logger.debug("/api/data symbol=%s tf=%s limit=%s format=%s since=%s", symbol, timeframe, limit, fmt, since_arg)
+        # The tag names the window state, not the delta, so a client holding that
+        # window can revalidate a since= request against it as well.
+        marker = await ohlc_window_marker(self.pool, symbol, timeframe, limit)
+        if not_modified(self, strong_etag("data", symbol, timeframe, limit, fmt, *marker)):
+            return
+        meta = {"symbol": symbol, "timeframe": timeframe}
+        if since_dt is not None:
+            # Bars at or after since: the client's last bar may still be forming.
+            bars = await fetch_ohlc_arrays(self.pool, symbol, timeframe, since_dt, None, limit=limit)
+            meta["since"] = since_dt.isoformat()
+        elif fmt != "json":
+            bars = await fetch_ohlc_arrays(self.pool, symbol, timeframe, limit=limit)
+        else:
+            bars = None
+        if fmt != "json":
+            write_columns(self, fmt, {name: bars[name] for name in BAR_FIELDS}, meta)
+            return
+        if bars is not None:
+            rows = columns_to_rows(bars, iso_ts=True)
+        else:
+            rows = await fetch_ohlc_bars(self.pool, symbol, timeframe, limit)
         self.set_header("Content-Type", "application/json")
-        self.finish(json.dumps({"symbol": symbol, "timeframe": timeframe, "rows": rows}))
+        self.finish(dumps({**meta, "rows": rows}))
 
 
 class BulkFetchHandler(tornado.web.RequestHandler):
@@ -2187,18 +2608,19 @@ class BulkFetchHandler(tornado.web.RequestHandler):
         else:
             self.set_status(400)
             self.set_header("Content-Type", "application/json")
-            self.finish(json.dumps({"ok": False, "error": f"unknown scope {scope}"}))
+            self.finish(dumps({"ok": False, "error": f"unknown scope {scope}"}))
             return
 
         if not tasks:
             self.set_status(400)
             self.set_header("Content-Type", "application/json")
-            self.finish(json.dumps({"ok": False, "error": "no tasks scheduled"}))
+            self.finish(dumps({"ok": False, "error": "no tasks scheduled"}))
             return
 
         async def runner():
             logger.info("[bulk] starting %d fetch jobs scope=%s mode=%s count=%s", len(tasks), scope, mode, count)
             total_inserted = 0
+            total_updated = 0
             total_fetched = 0
             errors = 0
             for sym, tf in tasks:
@@ -2214,20 +2636,21 @@ class BulkFetchHandler(tornado.web.RequestHandler):
                     background=True,
                 )
                 if info.get("ok"):
-                    logger.info("[bulk] %s %s ok fetched=%s inserted=%s", sym, tf, info.get("fetched"), info.get("inserted"))
+                    logger.info("[bulk] %s %s ok fetched=%s inserted=%s updated=%s", sym, tf, info.get("fetched"), info.get("inserted"), info.get("updated"))
                     total_inserted += int(info.get("inserted") or 0)
+                    total_updated += int(info.get("updated") or 0)
                     total_fetched += int(info.get("fetched") or 0)
                 else:
                     logger.warning("[bulk] %s %s error: %s", sym, tf, info.get("error"))
                     errors += 1
                 await asyncio.sleep(0.1)
-            logger.info("[bulk] completed scope=%s jobs=%d inserted=%d fetched=%d errors=%d", scope, len(tasks), total_inserted, total_fetched, errors)
+            logger.info("[bulk] completed scope=%s jobs=%d inserted=%d updated=%d fetched=%d errors=%d", scope, len(tasks), total_inserted, total_updated, total_fetched, errors)
 
         tornado.ioloop.IOLoop.current().spawn_callback(runner)
 
         self.set_header("Content-Type", "application/json")
         self.finish(
-            json.dumps(
+            dumps(
                 {
                     "ok": True,
                     "scheduled": True,
@@ -2247,29 +2670,49 @@ class UpdatesSocket(WebSocketHandler):
         return True
 
     def open(self):
-        WS_CLIENTS.add(self)
+        UPDATES_HUB.add(self)
         self.set_nodelay(True)
-        logger.debug("[ws] client connected (total=%d)", len(WS_CLIENTS))
-        try:
-            self.write_message(
-                json.dumps(
-                    {
-                        "type": "hello",
-                        "ts": datetime.now(timezone.utc).isoformat(),
-                        "symbols": SUPPORTED_SYMBOLS,
-                    }
-                )
-            )
-        except Exception:
-            logger.debug("[ws] hello send failed")
+        logger.debug("[ws] client connected (total=%d)", len(UPDATES_HUB))
+        UPDATES_HUB.send(
+            self,
+            ("hello",),
+            dumps_text(
+                {
+                    "type": "hello",
+                    "ts": datetime.now(timezone.utc).isoformat(),
+                    "symbols": SUPPORTED_SYMBOLS,
+                    "tick_interval_ms": TICK_SAMPLER.interval_ms,
+                }
+            ),
+        )
 
     def on_message(self, message):
         # Clients may send lightweight pings or acknowledgements; log at debug level only.
         logger.debug("[ws] received message: %s", message)
+        try:
+            data = json.loads(message)
+        except Exception:
+            return
+        if not isinstance(data, dict):
+            return
+        kind = data.get("type")
+        if kind == "subscribe_ticks":
+            symbols = data.get("symbols")
+            accepted = TICK_SAMPLER.subscribe(self, symbols if isinstance(symbols, list) else [])
+            logger.debug("[ws] tick subscription %s", accepted)
+        elif kind in ("subscribe", "unsubscribe"):
+            if kind == "subscribe":
+                topics = UPDATES_HUB.subscribe(self, data)
+            else:
+                topics = UPDATES_HUB.unsubscribe(self, data)
+            logger.debug("[ws] topics %s", topics)
+            # Only the newest filter matters, so a queued ack is replaced by the next one.
+            UPDATES_HUB.send(self, ("subscribed",), dumps_text({"type": "subscribed", "topics": topics}))
 
     def on_close(self):
-        WS_CLIENTS.discard(self)
-        logger.debug("[ws] client disconnected (total=%d)", len(WS_CLIENTS))
+        UPDATES_HUB.discard(self)
+        TICK_SAMPLER.unsubscribe(self)
+        logger.debug("[ws] client disconnected (total=%d)", len(UPDATES_HUB))
 
 
 async def poll_and_store_account_balance(user: str = "lachlan") -> dict:
@@ -2277,7 +2720,7 @@ async def poll_and_store_account_balance(user: str = "lachlan") -> dict:
     if GLOBAL_POOL is None:
         return {"ok": False, "error": "no_pool"}
     try:
-        info = mt5_client.account_info()
+        info = await mt5_async.account_info()
     except Exception as exc:
         logger.warning("[balance] account_info failed: %s", exc)
         return {"ok": False, "error": str(exc)}
@@ -2339,11 +2782,23 @@ class MobileHandler(tornado.web.RequestHandler):
             news_ai_available=bool(AI_CLIENT),
         )
 
+async def _migrate_ohlc_prices(pool) -> None:
+    try:
+        res = await migrate_ohlc_bars_to_float(pool)
+        if res.get("migrated"):
+            logger.info("ohlc_bars prices migrated to float8 (%d rows)", res.get("rows", 0))
+    except Exception as exc:  # pragma: no cover - retried on next start
+        logger.warning("ohlc_bars float migration failed (will retry on next start): %s", exc)
+
+
 async def make_app():
     pool = await create_pool()
     await init_schema(pool)
     global GLOBAL_POOL
     GLOBAL_POOL = pool
+    if str(os.getenv("OHLC_FLOAT_MIGRATION", "1")).strip().lower() not in {"0", "false", "no", "off"}:
+        # Runs in the background; reads and ingest keep working against the old table.
+        tornado.ioloop.IOLoop.current().spawn_callback(_migrate_ohlc_prices, pool)
 
     def _log_request(handler: tornado.web.RequestHandler) -> None:
         try:
@@ -2367,12 +2822,15 @@ async def make_app():
         debug=True,
         template_path=os.path.join(os.path.dirname(__file__), "..", "templates"),
         static_path=os.path.join(os.path.dirname(__file__), "..", "static"),
+        static_handler_class=PrecompressedStaticFileHandler,
         pool=pool,
         log_function=_log_request,
     )
+    precompress_static(settings["static_path"])
     return tornado.web.Application(
         [
             (r"/", MainHandler),
+            (r"/sw.js", ServiceWorkerHandler),
             (r"/app", MobileHandler),
             (r"/api/fetch", FetchHandler, dict(pool=pool)),
             (r"/api/fetch_bulk", BulkFetchHandler, dict(pool=pool)),
@@ -2404,6 +2862,10 @@ async def make_app():
             (r"/api/health/run", HealthRunHandler, dict(pool=pool)),
             (r"/api/preferences", PreferencesHandler, dict(pool=pool)),
             (r"/api/ai/trade_plan", TradePlanHandler, dict(pool=pool)),
+            (r"/api/ai/cache", AICacheStatsHandler),
+            (r"/api/mt5/bridge", MT5BridgeStatsHandler),
+            (r"/api/cache/bars", BarCacheStatsHandler),
+            (r"/api/ws/stats", WebSocketStatsHandler),
             (r"/api/auto_trade/log", AutoTradeLogHandler, dict(pool=pool)),
             (r"/api/accounts", AccountsHandler, dict(pool=pool)),
             (r"/api/account/current", AccountCurrentHandler),
@@ -2414,6 +2876,7 @@ async def make_app():
             (r"/api/trades/signal", SignalTradesHandler, dict(pool=pool)),
             # Duplicate route removed (was registered twice)
         ],
+        transforms=[CompressionTransform],
         **settings,
     )
 
@@ -2429,16 +2892,15 @@ class StrategyHandler(tornado.web.RequestHandler):
         slow = int(self.get_argument("slow", default="50"))
         limit = max(slow + 5, 200)
         logger.info("/api/strategy/run symbol=%s tf=%s fast=%s slow=%s", symbol, timeframe, fast, slow)
-        rows = await fetch_ohlc_bars(self.pool, symbol, timeframe, limit)
-        closes = [r["close"] for r in rows if r.get("close") is not None]
-        sig = crossover_strategy(closes, fast=fast, slow=slow)
+        bars = await fetch_ohlc_arrays(self.pool, symbol, timeframe, limit=limit)
+        sig = crossover_strategy(bars["close"], fast=fast, slow=slow)
 
         # SMA strategy trading is disabled: return the signal only and never place orders here.
         enabled = False
         trade_result = None
 
         self.set_header("Content-Type", "application/json")
-        self.finish(json.dumps({
+        self.finish(dumps({
             "symbol": symbol,
             "timeframe": timeframe,
             "fast": fast,
@@ -2456,7 +2918,7 @@ class TradeHandler(tornado.web.RequestHandler):
             self.set_status(403)
             self.set_header("Content-Type", "application/json")
             self.set_header("Cache-Control", "no-store")
-            self.finish(json.dumps({"ok": False, "error": "trading_disabled (set TRADING_ENABLED=1)"}))
+            self.finish(dumps({"ok": False, "error": "trading_disabled (set TRADING_ENABLED=1)"}))
             return
         symbol = self.get_argument("symbol", default=default_symbol())
         side = self.get_argument("side", default="buy").lower()
@@ -2482,7 +2944,7 @@ class TradeHandler(tornado.web.RequestHandler):
                 self.set_status(403)
                 self.set_header("Content-Type", "application/json")
                 self.set_header("Cache-Control", "no-store")
-                self.finish(json.dumps({
+                self.finish(dumps({
                     "ok": False,
                     "error": "sma_trading_disabled",
                     "strategy": strategy,
@@ -2531,7 +2993,7 @@ class TradeHandler(tornado.web.RequestHandler):
                 #  - global cap → sum over all symbols: lots_raw × weight(symbol)
                 #  - per-symbol cap → sum lots_raw for this symbol × its weight
                 try:
-                    positions = mt5_client.list_positions_all() if use_global else mt5_client.list_positions(symbol)
+                    positions = await mt5_async.list_positions_all() if use_global else await mt5_async.list_positions(symbol)
                 except Exception:
                     positions = []
                 open_weighted = 0.0
@@ -2555,7 +3017,7 @@ class TradeHandler(tornado.web.RequestHandler):
                     logger.info("/api/trade skip: safe_max reached (global=%s open_weighted=%.3f safe=%.3f)", use_global, open_weighted, safe_max)
                     self.set_header("Content-Type", "application/json")
                     self.set_header("Cache-Control", "no-store")
-                    self.finish(json.dumps({
+                    self.finish(dumps({
                         "ok": False,
                         "error": "safe_max_exceeded",
                         "result": {
@@ -2574,13 +3036,13 @@ class TradeHandler(tornado.web.RequestHandler):
             # Non-fatal: continue
             pass
         try:
-            res = mt5_client.place_market(symbol, side, volume, sl=sl_val, tp=tp_val)
+            res = await mt5_async.place_market(symbol, side, volume, sl=sl_val, tp=tp_val)
         except Exception as e:
             logger.exception("trade failed: %s", e)
             self.set_status(500)
             self.set_header("Content-Type", "application/json")
             self.set_header("Cache-Control", "no-store")
-            self.finish(json.dumps({"ok": False, "error": str(e)}))
+            self.finish(dumps({"ok": False, "error": str(e)}))
             return
         logger.info("/api/trade result=%s", res)
         # Best-effort insert into signal_trades log
@@ -2610,10 +3072,10 @@ class TradeHandler(tornado.web.RequestHandler):
         self.set_header("Cache-Control", "no-store")
         # Include a quick snapshot of positions after trade
         try:
-            positions = mt5_client.list_positions(symbol)
+            positions = await mt5_async.list_positions(symbol)
         except Exception:
             positions = []
-        self.finish(json.dumps({"ok": res.get("ok", False), "result": res, "positions": positions}))
+        self.finish(dumps({"ok": res.get("ok", False), "result": res, "positions": positions}))
 
     async def post(self):
         # Allow POST to avoid any client/proxy caching issues with GET
@@ -2631,7 +3093,7 @@ class ExecutePlanHandler(tornado.web.RequestHandler):
             self.set_status(403)
             self.set_header("Content-Type", "application/json")
             self.set_header("Cache-Control", "no-store")
-            self.finish(json.dumps({"ok": False, "error": "trading_disabled (set TRADING_ENABLED=1)"}))
+            self.finish(dumps({"ok": False, "error": "trading_disabled (set TRADING_ENABLED=1)"}))
             return
         symbol = str(payload.get("symbol") or default_symbol())
         side = str(payload.get("side") or "buy").lower()
@@ -2659,7 +3121,7 @@ class ExecutePlanHandler(tornado.web.RequestHandler):
         # 1) Close opposite direction positions for this symbol
         opp = "short" if side == "buy" else "long"
         try:
-            closed = mt5_client.close_all_for(symbol, side=opp)
+            closed = await mt5_async.close_all_for(symbol, side=opp)
         except Exception as exc:
             closed = [{"ok": False, "error": str(exc)}]
         # Log summary of close step
@@ -2680,7 +3142,7 @@ class ExecutePlanHandler(tornado.web.RequestHandler):
         #    - TP updates when plan TP provided.
         modified: list[dict] = []
         try:
-            pos = mt5_client.list_positions(symbol)
+            pos = await mt5_async.list_positions(symbol)
             want_type = 0 if side == "buy" else 1
             for p in pos:
                 if int(p.get("type", -1)) != want_type:
@@ -2721,7 +3183,7 @@ class ExecutePlanHandler(tornado.web.RequestHandler):
                         new_sl = old_sl
                 # Only send modify if any change
                 if (new_sl != old_sl) or (new_tp != old_tp):
-                    res = mt5_client.modify_position_sltp(symbol, ticket, new_sl, new_tp)
+                    res = await mt5_async.modify_position_sltp(symbol, ticket, new_sl, new_tp)
                     entry = {
                         "symbol": symbol,
                         "ticket": ticket,
@@ -2772,7 +3234,7 @@ class ExecutePlanHandler(tornado.web.RequestHandler):
                         pass
             if safe_max and safe_max > 0:
                 try:
-                    positions = mt5_client.list_positions_all() if use_global else mt5_client.list_positions(symbol)
+                    positions = await mt5_async.list_positions_all() if use_global else await mt5_async.list_positions(symbol)
                 except Exception:
                     positions = []
                 open_weighted = 0.0
@@ -2801,7 +3263,7 @@ class ExecutePlanHandler(tornado.web.RequestHandler):
                         pass
                     self.set_header("Content-Type", "application/json")
                     self.set_header("Cache-Control", "no-store")
-                    self.finish(json.dumps({
+                    self.finish(dumps({
                         "ok": False,
                         "error": "safe_max_exceeded_post_plan",
                         "closed": closed,
@@ -2827,7 +3289,7 @@ class ExecutePlanHandler(tornado.web.RequestHandler):
             tp_val = None
         # Preflight broker stop distance: if TP/SL violate stops_level, skip order entirely
         try:
-            info = mt5_client.symbol_info(symbol)
+            info = await mt5_async.symbol_info(symbol)
             point = float(getattr(info, "point", 0.0) or 0.0) if info else 0.0
             stops_lvl = None
             for k in ("trade_stops_level", "stops_level"):
@@ -2842,7 +3304,7 @@ class ExecutePlanHandler(tornado.web.RequestHandler):
             # Fetch current price for side
             px = None
             try:
-                t = mt5_client.get_tick(symbol)
+                t = await mt5_async.get_tick(symbol)
                 if t:
                     px = float(t.get("ask") if side == "buy" else t.get("bid"))
             except Exception:
@@ -2877,7 +3339,7 @@ class ExecutePlanHandler(tornado.web.RequestHandler):
                     pass
                 self.set_header("Content-Type", "application/json")
                 self.set_header("Cache-Control", "no-store")
-                self.finish(json.dumps({
+                self.finish(dumps({
                     "ok": False,
                     "error": "invalid_stops_preflight",
                     "closed": closed,
@@ -2915,12 +3377,12 @@ class ExecutePlanHandler(tornado.web.RequestHandler):
                     com = com[:28]
             except Exception:
                 pass
-            res = mt5_client.place_market(symbol, side, volume, sl=sl_val, tp=tp_val, comment=com)
+            res = await mt5_async.place_market(symbol, side, volume, sl=sl_val, tp=tp_val, comment=com)
         except Exception as e:
             self.set_status(500)
             self.set_header("Content-Type", "application/json")
             self.set_header("Cache-Control", "no-store")
-            self.finish(json.dumps({
+            self.finish(dumps({
                 "ok": False,
                 "error": str(e),
                 "closed": closed,
@@ -2935,7 +3397,7 @@ class ExecutePlanHandler(tornado.web.RequestHandler):
             logger.info("/api/trade/execute_plan order symbol=%s side=%s vol=%.2f retcode=%s id=%s", symbol, side, volume, rc, oid)
         except Exception:
             pass
-        self.finish(json.dumps({
+        self.finish(dumps({
             "ok": bool(res.get("ok")) if isinstance(res, dict) else False,
             "order_result": res,
             "closed": closed,
@@ -2956,13 +3418,13 @@ class SignalTradesHandler(tornado.web.RequestHandler):
             rows = await list_signal_trades(self.pool, symbol=symbol, timeframe=timeframe, limit=limit, offset=offset)
             self.set_header("Content-Type", "application/json")
             self.set_header("Cache-Control", "no-store")
-            self.finish(json.dumps({"ok": True, "rows": rows}))
+            self.finish(dumps({"ok": True, "rows": rows}))
         except Exception as exc:
             logger.exception("list signal trades failed: %s", exc)
             self.set_status(500)
             self.set_header("Content-Type", "application/json")
             self.set_header("Cache-Control", "no-store")
-            self.finish(json.dumps({"ok": False, "error": str(exc)}))
+            self.finish(dumps({"ok": False, "error": str(exc)}))
 
 
 class CloseHandler(tornado.web.RequestHandler):
@@ -2980,15 +3442,15 @@ class CloseHandler(tornado.web.RequestHandler):
             logger.info("/api/close scope=%s symbol=%s side=%s", scope, symbol, side)
         try:
             if scope == "all":
-                res = mt5_client.close_all(side=None if side == "both" else side)
+                res = await mt5_async.close_all(side=None if side == "both" else side)
             else:
-                res = mt5_client.close_all_for(symbol, side=None if side == "both" else side)
+                res = await mt5_async.close_all_for(symbol, side=None if side == "both" else side)
         except Exception as e:
             logger.exception("close positions failed: %s", e)
             self.set_status(500)
             self.set_header("Content-Type", "application/json")
             self.set_header("Cache-Control", "no-store")
-            self.finish(json.dumps({"ok": False, "error": str(e)}))
+            self.finish(dumps({"ok": False, "error": str(e)}))
             return
         self.set_header("Content-Type", "application/json")
         self.set_header("Cache-Control", "no-store")
@@ -3009,7 +3471,7 @@ class CloseHandler(tornado.web.RequestHandler):
                 logger.info("/api/close done scope=%s symbol=%s side=%s reason=%s closed=%d", scope, symbol, side, reason, closed_count)
             else:
                 logger.info("/api/close done scope=%s symbol=%s side=%s closed=%d", scope, symbol, side, closed_count)
-        self.finish(json.dumps({"ok": True, "closed": res, "closed_count": closed_count, "scope": scope, "side": side}))
+        self.finish(dumps({"ok": True, "closed": res, "closed_count": closed_count, "scope": scope, "side": side}))
 
     async def post(self):
         return await self.get()
@@ -3029,11 +3491,11 @@ class CloseTicketsHandler(tornado.web.RequestHandler):
         if not isinstance(tickets, list) or not tickets:
             self.set_status(400)
             self.set_header("Content-Type", "application/json")
-            self.finish(json.dumps({"ok": False, "error": "tickets array required"}))
+            self.finish(dumps({"ok": False, "error": "tickets array required"}))
             return
         # Fetch raw positions from MT5 for this symbol (fall back to all when symbol empty)
         try:
-            raw = mt5_client.positions_for(symbol) if symbol else (getattr(mt5_client.mt5, 'positions_get')() or [])
+            raw = await mt5_async.positions_for(symbol or None)
         except Exception:
             raw = []
         # Index by ticket and filter by optional side
@@ -3066,7 +3528,7 @@ class CloseTicketsHandler(tornado.web.RequestHandler):
             if not p:
                 continue
             try:
-                res = mt5_client.close_position(p)
+                res = await mt5_async.close_position(p)
             except Exception as exc:
                 res = {"ok": False, "ticket": ti, "error": str(exc)}
             try:
@@ -3086,55 +3548,56 @@ class CloseTicketsHandler(tornado.web.RequestHandler):
             pass
         self.set_header("Content-Type", "application/json")
         self.set_header("Cache-Control", "no-store")
-        self.finish(json.dumps({"ok": True, "closed": closed, "closed_count": len(closed)}))
+        self.finish(dumps({"ok": True, "closed": closed, "closed_count": len(closed)}))
 
 class PositionsHandler(tornado.web.RequestHandler):
     async def get(self):
         symbol = self.get_argument("symbol", default=default_symbol())
         logger.debug("/api/positions symbol=%s", symbol)
         try:
-            positions = mt5_client.list_positions(symbol)
+            positions = await mt5_async.list_positions(symbol)
         except Exception as e:
             logger.exception("list positions failed: %s", e)
             self.set_status(500)
             self.set_header("Content-Type", "application/json")
             self.set_header("Cache-Control", "no-store")
-            self.finish(json.dumps({"ok": False, "error": str(e)}))
+            self.finish(dumps({"ok": False, "error": str(e)}))
             return
         self.set_header("Content-Type", "application/json")
         self.set_header("Cache-Control", "no-store")
-        self.finish(json.dumps({"ok": True, "positions": positions}))
+        self.finish(dumps({"ok": True, "positions": positions}))
 
 
 class PositionsAllHandler(tornado.web.RequestHandler):
     async def get(self):
         try:
-            positions = mt5_client.list_positions_all()
+            positions = await mt5_async.list_positions_all()
         except Exception as e:
             logger.exception("list all positions failed: %s", e)
             self.set_status(500)
             self.set_header("Content-Type", "application/json")
             self.set_header("Cache-Control", "no-store")
-            self.finish(json.dumps({"ok": False, "error": str(e)}))
+            self.finish(dumps({"ok": False, "error": str(e)}))
             return
         self.set_header("Content-Type", "application/json")
         self.set_header("Cache-Control", "no-store")
-        self.finish(json.dumps({"ok": True, "positions": positions}))
+        self.finish(dumps({"ok": True, "positions": positions}))
 
 
 class TickHandler(tornado.web.RequestHandler):
     async def get(self):
         symbol = self.get_argument("symbol", default=default_symbol())
         try:
-            t = mt5_client.get_tick(symbol)
+            # Served from the sampler's last-tick cache while it is fresh.
+            t = await TICK_SAMPLER.get(symbol)
         except Exception as e:
             self.set_status(500)
             self.set_header("Content-Type", "application/json")
-            self.finish(json.dumps({"ok": False, "error": str(e)}))
+            self.finish(dumps({"ok": False, "error": str(e)}))
             return
         self.set_header("Content-Type", "application/json")
         self.set_header("Cache-Control", "no-store")
-        self.finish(json.dumps({"ok": True, "tick": t}))
+        self.finish(dumps({"ok": True, "tick": t}))
 
 
 class TechSnapshotHistoryHandler(tornado.web.RequestHandler):
@@ -3249,16 +3712,16 @@ class TechSnapshotHistoryHandler(tornado.web.RequestHandler):
 
         # Open positions + latest tick + account
         try:
-            positions = mt5_client.list_positions(symbol)
+            positions = await mt5_async.list_positions(symbol)
         except Exception:
             positions = []
         try:
-            tick = mt5_client.get_tick(symbol)
+            tick = await mt5_async.get_tick(symbol)
         except Exception:
             tick = None
         # Account info (current session)
         try:
-            acct = mt5_client.account_info()
+            acct = await mt5_async.account_info()
         except Exception:
             acct = None
 
@@ -3381,7 +3844,7 @@ class TechSnapshotHistoryHandler(tornado.web.RequestHandler):
         self.set_header("Content-Type", "application/json")
         self.set_header("Cache-Control", "no-store")
         self.finish(
-            json.dumps(
+            dumps(
                 {
                     "ok": True,
                     "symbol": symbol,
@@ -3416,7 +3879,7 @@ class AccountBalanceHandler(tornado.web.RequestHandler):
                 account_id = None
         if account_id is None:
             try:
-                info = mt5_client.account_info()
+                info = await mt5_async.account_info()
                 account_id = int(info.get("login") or 0)
             except Exception:
                 account_id = 0
@@ -3424,7 +3887,7 @@ class AccountBalanceHandler(tornado.web.RequestHandler):
             # Graceful: return 200 with ok=false so UI can continue without console errors
             self.set_header("Content-Type", "application/json")
             self.set_header("Cache-Control", "no-store")
-            self.finish(json.dumps({"ok": False, "error": "account unavailable", "user": user, "account": None, "rows": []}))
+            self.finish(dumps({"ok": False, "error": "account unavailable", "user": user, "account": None, "rows": []}))
             return
         if refresh_flag:
             try:
@@ -3437,7 +3900,7 @@ class AccountBalanceHandler(tornado.web.RequestHandler):
             rows = await fetch_account_balances(self.pool, user_name=user, account_id=account_id, limit=limit)
         self.set_header("Content-Type", "application/json")
         self.set_header("Cache-Control", "no-store")
-        self.finish(json.dumps({"ok": True, "user": user, "account": account_id, "rows": rows}))
+        self.finish(dumps({"ok": True, "user": user, "account": account_id, "rows": rows}))
 
 
 class ClosedDealsHandler(tornado.web.RequestHandler):
@@ -3474,7 +3937,7 @@ class ClosedDealsHandler(tornado.web.RequestHandler):
             except Exception:
                 account_id = 0
         try:
-            info = mt5_client.account_info()
+            info = await mt5_async.account_info()
             current_login = int(info.get("login") or 0)
             if account_id == 0:
                 account_id = current_login
@@ -3492,7 +3955,7 @@ class ClosedDealsHandler(tornado.web.RequestHandler):
             # For 'auto': proactively top up from MT5 when we can (matching terminal login)
             if source == "auto" and account_id == current_login:
                 try:
-                    mt5_rows = mt5_client.closed_deals(start_dt, end_dt)
+                    mt5_rows = await mt5_async.closed_deals(start_dt, end_dt)
                     if mt5_rows:
                         if purge_flag:
                             try:
@@ -3514,7 +3977,7 @@ class ClosedDealsHandler(tornado.web.RequestHandler):
                 except Exception as exc:
                     logger.debug("auto top-up from MT5 skipped: %s", exc)
             elif source == "mt5" or (source == "auto" and not from_db and account_id == current_login):
-                deals = mt5_client.closed_deals(start_dt, end_dt)
+                deals = await mt5_async.closed_deals(start_dt, end_dt)
                 if debug_flag:
                     try:
                         sample = [
@@ -3576,7 +4039,7 @@ class ClosedDealsHandler(tornado.web.RequestHandler):
             self.set_status(500)
             self.set_header("Content-Type", "application/json")
             self.set_header("Cache-Control", "no-store")
-            self.finish(json.dumps({"ok": False, "error": str(e)}))
+            self.finish(dumps({"ok": False, "error": str(e)}))
             return
         if comment_filters:
             lf = [c.lower() for c in comment_filters]
@@ -3632,7 +4095,7 @@ class ClosedDealsHandler(tornado.web.RequestHandler):
             pass
         self.set_header("Content-Type", "application/json")
         self.set_header("Cache-Control", "no-store")
-        self.finish(json.dumps({
+        self.finish(dumps({
             "ok": True,
             "from": start_dt.isoformat(),
             "to": end_dt.isoformat(),
@@ -3665,12 +4128,12 @@ class ClosedDealsSyncHandler(tornado.web.RequestHandler):
                 account_id = 0
         if account_id == 0:
             try:
-                info = mt5_client.account_info()
+                info = await mt5_async.account_info()
                 account_id = int(info.get("login") or 0)
             except Exception as e:
                 self.set_status(503)
                 self.set_header("Content-Type", "application/json")
-                self.finish(json.dumps({"ok": False, "error": f"account unavailable: {e}"}))
+                self.finish(dumps({"ok": False, "error": f"account unavailable: {e}"}))
                 return
         logger.info("/api/account/closed_deals_sync from=%s to=%s step=%sd", start_dt, end_dt, step_days)
         # Match DB list window to MT5 future buffer to avoid head/tail missing in immediate readback
@@ -3695,7 +4158,7 @@ class ClosedDealsSyncHandler(tornado.web.RequestHandler):
                 cur = start_dt
                 while cur < end_dt:
                     nxt = min(end_dt, cur + timedelta(days=step_days))
-                    deals = mt5_client.closed_deals(cur, nxt)
+                    deals = await mt5_async.closed_deals(cur, nxt, priority=PRIORITY_BACKFILL)
                     if deals:
                         try:
                             await upsert_closed_deals(GLOBAL_POOL, account_id=account_id, rows=deals)
@@ -3725,7 +4188,7 @@ class ClosedDealsSyncHandler(tornado.web.RequestHandler):
                 logger.exception("[closed_sync] failed: %s", exc)
         tornado.ioloop.IOLoop.current().spawn_callback(runner)
         self.set_header("Content-Type", "application/json")
-        self.finish(json.dumps({"ok": True, "scheduled": True}))
+        self.finish(dumps({"ok": True, "scheduled": True}))
 
 
 class ClosedDealsPurgeHandler(tornado.web.RequestHandler):
@@ -3736,7 +4199,7 @@ class ClosedDealsPurgeHandler(tornado.web.RequestHandler):
         if not confirm:
             self.set_status(400)
             self.set_header("Content-Type", "application/json")
-            self.finish(json.dumps({"ok": False, "error": "confirm=1 required"}))
+            self.finish(dumps({"ok": False, "error": "confirm=1 required"}))
             return
         try:
             deleted = 0
@@ -3753,14 +4216,14 @@ class ClosedDealsPurgeHandler(tornado.web.RequestHandler):
                     if not account_arg:
                         self.set_status(400)
                         self.set_header("Content-Type", "application/json")
-                        self.finish(json.dumps({"ok": False, "error": "account or all=1 required"}))
+                        self.finish(dumps({"ok": False, "error": "account or all=1 required"}))
                         return
                     try:
                         account_id = int(account_arg)
                     except Exception:
                         self.set_status(400)
                         self.set_header("Content-Type", "application/json")
-                        self.finish(json.dumps({"ok": False, "error": "invalid account"}))
+                        self.finish(dumps({"ok": False, "error": "invalid account"}))
                         return
                     status = await conn.execute("DELETE FROM closed_deals WHERE account_id=$1", int(account_id))
                     try:
@@ -3775,11 +4238,11 @@ class ClosedDealsPurgeHandler(tornado.web.RequestHandler):
                 pass
             self.set_header("Content-Type", "application/json")
             self.set_header("Cache-Control", "no-store")
-            self.finish(json.dumps({"ok": True, "deleted": deleted, "all": all_flag}))
+            self.finish(dumps({"ok": True, "deleted": deleted, "all": all_flag}))
         except Exception as exc:
             self.set_status(500)
             self.set_header("Content-Type", "application/json")
-            self.finish(json.dumps({"ok": False, "error": str(exc)}))
+            self.finish(dumps({"ok": False, "error": str(exc)}))
 
 
 class STLHandler(tornado.web.RequestHandler):
@@ -3797,6 +4260,19 @@ class STLHandler(tornado.web.RequestHandler):
         include_data = self.get_argument("include_data", "1").lower() not in ("0", "false", "no", "off")
         limit_arg = self.get_argument("limit", default=None)
         limit = int(limit_arg) if limit_arg else None
+        # Period and engine the client would compute with, so staleness is judged
+        # against that fit (defaults: automatic period, statsmodels).
+        try:
+            period = int(self.get_argument("period", default=None) or 0) or None
+        except ValueError:
+            period = None
+        try:
+            engine = stl_engine(self.get_argument("engine", default=None))
+        except ValueError as exc:
+            self.set_status(400)
+            self.set_header("Content-Type", "application/json")
+            self.finish(dumps({"ok": False, "error": str(exc)}))
+            return
 
         run_id = None
         if run_id_arg:
@@ -3808,12 +4284,35 @@ class STLHandler(tornado.web.RequestHandler):
         start_dt = _normalize_dt(start_arg) if start_arg else None
         end_dt = _normalize_dt(end_arg) if end_arg else None
 
+        fmt = negotiate_format(self)
+        # The answer is a function of the request, the pair's bars and its (immutable)
+        # runs, so their cheap markers pin it before any run or close is loaded.
+        etag = strong_etag(
+            "stl",
+            symbol,
+            timeframe,
+            fmt,
+            limit,
+            include_data,
+            include_runs,
+            run_id,
+            _dt_to_iso(start_dt),
+            _dt_to_iso(end_dt),
+            all_data_flag,
+            period,
+            engine,
+            *await ohlc_window_marker(self.pool, symbol, timeframe, STL_MAX_POINTS),
+            *await stl_runs_marker(self.pool, symbol, timeframe),
+        )
+        self.set_header("Cache-Control", "no-store")
+        if not_modified(self, etag):
+            return
+
         dataset_range = await ohlc_range(self.pool, symbol, timeframe)
         if not dataset_range:
             self.set_header("Content-Type", "application/json")
-            self.set_header("Cache-Control", "no-store")
             self.finish(
-                json.dumps(
+                dumps(
                     {
                         "ok": True,
                         "symbol": symbol,
@@ -3847,11 +4346,35 @@ class STLHandler(tornado.web.RequestHandler):
                 or selected_run["timeframe"].upper() != timeframe
             ):
                 selected_run = None
+        # Fingerprints of the fit /api/stl/compute would run for this target now: a
+        # full fit, or a tail update of an earlier run over the same bars.
+        current_fps: tuple[str, ...] = ()
+        try:
+            inputs = await _stl_inputs(
+                self.pool,
+                symbol,
+                timeframe,
+                period=period,
+                start_dt=None if all_data_flag else target_start,
+                end_dt=None if all_data_flag else target_end,
+                max_points=STL_MAX_POINTS,
+                range_info=dataset_range,
+                engine=engine,
+            )
+            current_fps = (inputs["fingerprint"], inputs["tail_fingerprint"])
+        except ValueError:
+            pass  # too little data to fit; nothing to compute
+
         if not selected_run and runs:
-            for run in runs:
-                if run["start_ts"] <= target_start and run["end_ts"] >= target_end:
-                    selected_run = run
+            for fp in current_fps:
+                selected_run = next((run for run in runs if run.get("fingerprint") == fp), None)
+                if selected_run:
                     break
+            if not selected_run:
+                for run in runs:
+                    if run["start_ts"] <= target_start and run["end_ts"] >= target_end:
+                        selected_run = run
+                        break
             if not selected_run:
                 selected_run = runs[0]
         if selected_run and include_runs and all(run["id"] != selected_run["id"] for run in runs):
@@ -3859,39 +4382,34 @@ class STLHandler(tornado.web.RequestHandler):
 
         needs_compute = False
         reason = None
+        fit = None
         if target_start and target_end:
             if selected_run is None:
                 needs_compute = True
                 reason = "missing_run"
-            else:
-                start_ok = selected_run["start_ts"] <= target_start
-                end_ok = selected_run["end_ts"] >= target_end
-                if not all_data_flag:
-                    start_ok = abs((selected_run["start_ts"] - target_start).total_seconds()) < 1
-                    end_ok = abs((selected_run["end_ts"] - target_end).total_seconds()) < 1
-                if not (start_ok and end_ok):
+            elif current_fps:
+                run_fp = selected_run.get("fingerprint")
+                if run_fp in current_fps:
+                    fit = "full" if run_fp == current_fps[0] else "tail"
+                else:
                     needs_compute = True
-                    reason = "range_mismatch"
-                elif all_data_flag:
-                    dataset_start = dataset_range["start_ts"]
-                    dataset_end = dataset_range["end_ts"]
-                    if (
-                        selected_run["start_ts"] > dataset_start
-                        or selected_run["end_ts"] < dataset_end
-                        or selected_run["rows_count"] < dataset_range["rows_count"]
-                    ):
-                        needs_compute = True
-                        reason = "dataset_extended"
+                    reason = "stale" if run_fp else "no_fingerprint"
 
         rows = []
+        columns = None
         selected_run_serialized = None
         if selected_run and include_data:
-            run_data = await fetch_stl_run_data(self.pool, selected_run["id"])
-            if run_data:
-                rows = run_data["rows"]
-                if limit and limit > 0:
-                    rows = rows[-limit:]
-                selected_run = run_data["run"]
+            point_limit = limit if limit and limit > 0 else None
+            if fmt != "json":
+                run_data = await fetch_stl_run_columns(self.pool, selected_run["id"], limit=point_limit)
+                if run_data:
+                    columns = run_data["columns"]
+                    selected_run = run_data["run"]
+            else:
+                run_data = await fetch_stl_run_data(self.pool, selected_run["id"], limit=point_limit)
+                if run_data:
+                    rows = run_data["rows"]
+                    selected_run = run_data["run"]
         selected_run_serialized = _serialize_run(selected_run)
 
         response_runs = [_serialize_run(run) for run in runs] if include_runs else []
@@ -3906,25 +4424,27 @@ class STLHandler(tornado.web.RequestHandler):
             "all_data": all_data_flag,
         }
 
+        meta = {
+            "ok": True,
+            "symbol": symbol,
+            "timeframe": timeframe,
+            "runs": response_runs,
+            "selected_run_id": selected_run_serialized["id"] if selected_run_serialized else None,
+            "selected_run": selected_run_serialized,
+            "dataset": dataset_payload,
+            "target_range": target_payload,
+            "needs_compute": needs_compute,
+            "reason": reason,
+            "fit": fit,
+        }
+        if fmt != "json":
+            if columns is None:
+                columns = {name: np.empty(0) for name in STL_COMPONENT_FIELDS}
+                columns["ts"] = np.empty(0, dtype=np.int64)
+            write_columns(self, fmt, {name: columns[name] for name in STL_COMPONENT_FIELDS}, meta)
+            return
         self.set_header("Content-Type", "application/json")
-        self.set_header("Cache-Control", "no-store")
-        self.finish(
-            json.dumps(
-                {
-                    "ok": True,
-                    "symbol": symbol,
-                    "timeframe": timeframe,
-                    "runs": response_runs,
-                    "rows": rows,
-                    "selected_run_id": selected_run_serialized["id"] if selected_run_serialized else None,
-                    "selected_run": selected_run_serialized,
-                    "dataset": dataset_payload,
-                    "target_range": target_payload,
-                    "needs_compute": needs_compute,
-                    "reason": reason,
-                }
-            )
-        )
+        self.finish(dumps({**meta, "rows": rows}))
 
 
 class STLComputeHandler(tornado.web.RequestHandler):
@@ -3949,15 +4469,22 @@ class STLComputeHandler(tornado.web.RequestHandler):
         timeframe = str(payload.get("timeframe") or payload.get("tf") or "H1").upper()
         scope = str(payload.get("scope") or "current")
         # Max number of points to use for STL per task (default 1500)
-        limit = int(payload.get("limit") or 1500)
-        if limit > 1500:
-            limit = 1500
+        limit = int(payload.get("limit") or STL_MAX_POINTS)
+        if limit > STL_MAX_POINTS:
+            limit = STL_MAX_POINTS
 
         period_override = payload.get("period")
         try:
             period_override = int(period_override) if period_override is not None else None
         except (TypeError, ValueError):
             period_override = None
+        try:
+            engine = stl_engine(payload.get("engine"))
+        except ValueError as exc:
+            self.set_status(400)
+            self.set_header("Content-Type", "application/json")
+            self.finish(dumps({"ok": False, "error": str(exc)}))
+            return
 
         all_data_flag = str(payload.get("all_data", "1")).lower() not in ("0", "false", "no", "off")
         start_dt = None if all_data_flag else _normalize_dt(payload.get("start") or payload.get("start_ts"))
@@ -3995,19 +4522,22 @@ class STLComputeHandler(tornado.web.RequestHandler):
         else:
             self.set_status(400)
             self.set_header("Content-Type", "application/json")
-            self.finish(json.dumps({"ok": False, "error": f"unknown scope {scope}"}))
+            self.finish(dumps({"ok": False, "error": f"unknown scope {scope}"}))
             return
 
         if not tasks:
             self.set_status(400)
             self.set_header("Content-Type", "application/json")
-            self.finish(json.dumps({"ok": False, "error": "no tasks scheduled"}))
+            self.finish(dumps({"ok": False, "error": "no tasks scheduled"}))
             return
 
         loop = tornado.ioloop.IOLoop.current()
 
         # Optional: run synchronously (blocking) to ensure results are available immediately
         blocking = str(payload.get("blocking") or payload.get("sync") or "0").lower() in {"1","true","yes","on"}
+        # Single-pair refreshes may refit only the tail (app.stl_incremental); the
+        # client asks for this on auto-compute, explicit recalculations stay full fits.
+        incremental = str(payload.get("incremental") or "0").lower() in {"1","true","yes","on"}
 
         async def _run_task(sym: str, tf: str, event_start: str | None, event_end: str | None) -> dict:
             await emit_stl_event(
@@ -4026,22 +4556,14 @@ class STLComputeHandler(tornado.web.RequestHandler):
                     sym,
                     tf,
                     period=period_override,
-                    start_dt=start_dt if scope in ("current", "single") else None,
-                    end_dt=end_dt if scope in ("current", "single") else None,
+                    start_dt=start_dt,
+                    end_dt=end_dt,
                     max_points=limit,
+                    incremental=incremental,
+                    engine=engine,
                 )
-                # Prune older runs for this symbol×TF (keep latest only)
-                try:
-                    tfu = (tf or "").upper()
-                    runs = await list_stl_runs(self.pool, str(sym).upper(), tfu)
-                    if runs and len(runs) > 1:
-                        for old in runs[1:]:
-                            try:
-                                await delete_stl_run(self.pool, int(old["id"]))
-                            except Exception:
-                                pass
-                except Exception:
-                    pass
+                # Prune other runs for this symbol×TF (keep the current one only)
+                await _prune_stl_runs(self.pool, sym, tf, keep_run_id=result.get("run_id"))
                 logger.info("[stl] %s %s completed period=%s points=%s inserted=%s", sym, tf, result.get("period"), result.get("points"), result.get("inserted"))
                 await emit_stl_event(
                     symbol=sym,
@@ -4051,7 +4573,7 @@ class STLComputeHandler(tornado.web.RequestHandler):
                     scope=scope,
                     background=not blocking,
                     points=result.get("points"),
-                    note=f"inserted={result.get('inserted')}",
+                    note=f"inserted={result.get('inserted')} engine={engine}",
                     run_id=result.get("run_id"),
                     start_ts=result.get("start_ts"),
                     end_ts=result.get("end_ts"),
@@ -4073,31 +4595,40 @@ class STLComputeHandler(tornado.web.RequestHandler):
                 )
                 return {"ok": False, "error": str(exc)}
 
-        if blocking:
-            results: list[dict] = []
-            for sym, tf in tasks:
-                event_start = _dt_to_iso(start_dt) if scope in ("current", "single") else None
-                event_end = _dt_to_iso(end_dt) if scope in ("current", "single") else None
-                res = await _run_task(sym, tf, event_start, event_end)
-                results.append({"symbol": sym, "timeframe": tf, **res})
-            self.set_header("Content-Type", "application/json")
-            self.set_header("Cache-Control", "no-store")
-            self.finish(json.dumps({"ok": True, "scheduled": False, "results": results, "scope": scope}))
-            return
-
-        async def runner():
-            logger.info("[stl] starting %d jobs scope=%s period=%s", len(tasks), scope, period_override)
-            for sym, tf in tasks:
-                event_start = _dt_to_iso(start_dt) if scope in ("current", "single") else None
-                event_end = _dt_to_iso(end_dt) if scope in ("current", "single") else None
-                await _run_task(sym, tf, event_start, event_end)
-                await asyncio.sleep(0.05)
-
-        loop.spawn_callback(runner)
+        if scope not in ("current", "single"):
+            # Multi-pair scopes: one load, fits across the STL process pool, bulk writes.
+            batch_kwargs = {
+                "period": period_override,
+                "max_points": limit,
+                "start_dt": start_dt,
+                "end_dt": end_dt,
+                "engine": engine,
+                "scope": scope,
+            }
+            if blocking:
+                results = await _compute_stl_batch(self.pool, tasks, background=False, **batch_kwargs)
+                self.set_header("Content-Type", "application/json")
+                self.set_header("Cache-Control", "no-store")
+                self.finish(dumps({"ok": True, "scheduled": False, "results": results, "scope": scope}))
+                return
+            logger.info("[stl] starting batch of %d pairs scope=%s period=%s", len(tasks), scope, period_override)
+            loop.spawn_callback(_compute_stl_batch, self.pool, tasks, background=True, **batch_kwargs)
+        else:
+            event_start = _dt_to_iso(start_dt)
+            event_end = _dt_to_iso(end_dt)
+            if blocking:
+                res = await _run_task(symbol, timeframe, event_start, event_end)
+                self.set_header("Content-Type", "application/json")
+                self.set_header("Cache-Control", "no-store")
+                self.finish(
+                    dumps({"ok": True, "scheduled": False, "results": [{"symbol": symbol, "timeframe": timeframe, **res}], "scope": scope})
+                )
+                return
+            loop.spawn_callback(_run_task, symbol, timeframe, event_start, event_end)
 
         self.set_header("Content-Type", "application/json")
         self.set_header("Cache-Control", "no-store")
-        self.finish(json.dumps({"ok": True, "scheduled": len(tasks), "scope": scope, "symbol": symbol, "timeframe": timeframe, "period": period_override}))
+        self.finish(dumps({"ok": True, "scheduled": len(tasks), "scope": scope, "symbol": symbol, "timeframe": timeframe, "period": period_override, "engine": engine}))
 
 
 class STLDeleteHandler(tornado.web.RequestHandler):
@@ -4109,16 +4640,16 @@ class STLDeleteHandler(tornado.web.RequestHandler):
             run_id_int = int(run_id)
         except (TypeError, ValueError):
             self.set_status(400)
-            self.finish(json.dumps({"ok": False, "error": "invalid run id"}))
+            self.finish(dumps({"ok": False, "error": "invalid run id"}))
             return
         deleted = await delete_stl_run(self.pool, run_id_int)
         if deleted == 0:
             self.set_status(404)
-            self.finish(json.dumps({"ok": False, "error": "run not found"}))
+            self.finish(dumps({"ok": False, "error": "run not found"}))
             return
         self.set_header("Content-Type", "application/json")
         self.set_header("Cache-Control", "no-store")
-        self.finish(json.dumps({"ok": True, "run_id": run_id_int}))
+        self.finish(dumps({"ok": True, "run_id": run_id_int}))
 
 
 class STLPruneHandler(tornado.web.RequestHandler):
@@ -4136,7 +4667,7 @@ class STLPruneHandler(tornado.web.RequestHandler):
         if not symbol or not timeframe:
             self.set_status(400)
             self.set_header("Content-Type", "application/json")
-            self.finish(json.dumps({"ok": False, "error": "symbol and tf required"}))
+            self.finish(dumps({"ok": False, "error": "symbol and tf required"}))
             return
         symu = str(symbol).upper()
         tfu = str(timeframe).upper()
@@ -4156,7 +4687,7 @@ class STLPruneHandler(tornado.web.RequestHandler):
                     continue
         self.set_header("Content-Type", "application/json")
         self.set_header("Cache-Control", "no-store")
-        self.finish(json.dumps({
+        self.finish(dumps({
             "ok": True,
             "symbol": symu,
             "timeframe": tfu,
@@ -4176,7 +4707,7 @@ class STLPruneAllHandler(tornado.web.RequestHandler):
         if not confirm:
             self.set_status(400)
             self.set_header("Content-Type", "application/json")
-            self.finish(json.dumps({"ok": False, "error": "confirm=1 required"}))
+            self.finish(dumps({"ok": False, "error": "confirm=1 required"}))
             return
         keep_arg = self.get_argument("keep", default="1")
         try:
@@ -4206,11 +4737,11 @@ class STLPruneAllHandler(tornado.web.RequestHandler):
                     deleted = 0
             self.set_header("Content-Type", "application/json")
             self.set_header("Cache-Control", "no-store")
-            self.finish(json.dumps({"ok": True, "deleted": deleted, "kept": keep}))
+            self.finish(dumps({"ok": True, "deleted": deleted, "kept": keep}))
         except Exception as exc:
             self.set_status(500)
             self.set_header("Content-Type", "application/json")
-            self.finish(json.dumps({"ok": False, "error": str(exc)}))
+            self.finish(dumps({"ok": False, "error": str(exc)}))
 
 
 class PreferencesHandler(tornado.web.RequestHandler):
@@ -4226,7 +4757,7 @@ class PreferencesHandler(tornado.web.RequestHandler):
         prefs = await get_prefs(self.pool, keys)
         self.set_header("Content-Type", "application/json")
         self.set_header("Cache-Control", "no-store")
-        self.finish(json.dumps({"ok": True, "prefs": prefs}))
+        self.finish(dumps({"ok": True, "prefs": prefs}))
 
     async def post(self):
         raw = self.request.body or b"{}"
@@ -4235,7 +4766,7 @@ class PreferencesHandler(tornado.web.RequestHandler):
         except Exception:
             self.set_status(400)
             self.set_header("Content-Type", "application/json")
-            self.finish(json.dumps({"ok": False, "error": "invalid JSON"}))
+            self.finish(dumps({"ok": False, "error": "invalid JSON"}))
             return
         updates = {}
         if isinstance(payload, dict):
@@ -4362,7 +4893,7 @@ class PreferencesHandler(tornado.web.RequestHandler):
                     BALANCE_CB = None
         self.set_header("Content-Type", "application/json")
         self.set_header("Cache-Control", "no-store")
-        self.finish(json.dumps({"ok": True, "updated": sorted(updates.keys())}))
+        self.finish(dumps({"ok": True, "updated": sorted(updates.keys())}))
 
 
 class HealthFreshnessHandler(tornado.web.RequestHandler):
@@ -4568,7 +5099,7 @@ class HealthFreshnessHandler(tornado.web.RequestHandler):
         self.set_header("Content-Type", "application/json")
         self.set_header("Cache-Control", "no-store")
         self.finish(
-            json.dumps(
+            dumps(
                 {
                     "ok": True,
                     "symbol": symbol,
@@ -4679,7 +5210,7 @@ class TechFreshnessHandler(tornado.web.RequestHandler):
         self.set_header("Content-Type", "application/json")
         self.set_header("Cache-Control", "no-store")
         self.finish(
-            json.dumps(
+            dumps(
                 {
                     "ok": True,
                     "symbol": symbol,
@@ -4699,7 +5230,7 @@ class ConfigHandler(tornado.web.RequestHandler):
         self.set_header("Content-Type", "application/json")
         self.set_header("Cache-Control", "no-store")
         self.finish(
-            json.dumps(
+            dumps(
                 {
                     "ok": True,
                     "trading_enabled": enabled,
@@ -4710,6 +5241,49 @@ class ConfigHandler(tornado.web.RequestHandler):
         )
 
 
+class AICacheStatsHandler(tornado.web.RequestHandler):
+    async def get(self):
+        stats = None
+        if AI_CLIENT is not None:
+            try:
+                stats = AI_CLIENT.get_cache_stats()
+            except Exception:
+                stats = None
+        self.set_header("Content-Type", "application/json")
+        self.set_header("Cache-Control", "no-store")
+        self.finish(dumps({"ok": stats is not None, "cache": stats}))
+
+
+class BarCacheStatsHandler(tornado.web.RequestHandler):
+    async def get(self):
+        self.set_header("Content-Type", "application/json")
+        self.set_header("Cache-Control", "no-store")
+        self.finish(dumps({"ok": True, "cache": bar_cache.stats()}))
+
+
+class WebSocketStatsHandler(tornado.web.RequestHandler):
+    def get(self):
+        self.set_header("Content-Type", "application/json")
+        self.set_header("Cache-Control", "no-store")
+        self.finish(dumps({"ok": True, "updates": UPDATES_HUB.stats(), "ticks": TICK_SAMPLER.stats()}))
+
+
+class MT5BridgeStatsHandler(tornado.web.RequestHandler):
+    async def get(self):
+        self.set_header("Content-Type", "application/json")
+        self.set_header("Cache-Control", "no-store")
+        self.finish(
+            dumps(
+                {
+                    "ok": True,
+                    "bridge": mt5_bridge.stats(),
+                    "ticks": TICK_SAMPLER.stats(),
+                    "snapshots": mt5_client.snapshot_stats(),
+                }
+            )
+        )
+
+
 class NewsHandler(tornado.web.RequestHandler):
     def initialize(self, pool):
         self.pool = pool
@@ -4778,7 +5352,7 @@ class NewsHandler(tornado.web.RequestHandler):
                 self.set_status(500)
                 self.set_header("Content-Type", "application/json")
                 self.set_header("Cache-Control", "no-store")
-                self.finish(json.dumps({"ok": False, "error": str(e), "news": [], "snapshot": {}}))
+                self.finish(dumps({"ok": False, "error": str(e), "news": [], "snapshot": {}}))
                 return
         if not snapshot:
             try:
@@ -4789,7 +5363,7 @@ class NewsHandler(tornado.web.RequestHandler):
         self.set_header("Content-Type", "application/json")
         self.set_header("Cache-Control", "no-store")
         logger.info("[news] respond symbol=%s count=%d snapshot=%s", symbol, len(rows), bool(snapshot))
-        self.finish(json.dumps({"ok": True, "symbol": symbol, "news": rows, "snapshot": snapshot}))
+        self.finish(dumps({"ok": True, "symbol": symbol, "news": rows, "snapshot": snapshot}))
 
 
 class NewsBackfillHandler(tornado.web.RequestHandler):
@@ -4820,12 +5394,12 @@ class NewsBackfillHandler(tornado.web.RequestHandler):
             result = await run_news_backfill(days=days)
             self.set_header("Content-Type", "application/json")
             self.set_header("Cache-Control", "no-store")
-            self.finish(json.dumps(result))
+            self.finish(dumps(result))
         except Exception as e:
             self.set_status(500)
             self.set_header("Content-Type", "application/json")
             self.set_header("Cache-Control", "no-store")
-            self.finish(json.dumps({"ok": False, "error": str(e)}))
+            self.finish(dumps({"ok": False, "error": str(e)}))
 
     async def post(self):
         await self._run()
@@ -4842,21 +5416,21 @@ class NewsAnalysisHandler(tornado.web.RequestHandler):
         if not self.ai_client:
             self.set_status(503)
             self.set_header("Content-Type", "application/json")
-            self.finish(json.dumps({"ok": False, "error": "LLM analysis unavailable"}))
+            self.finish(dumps({"ok": False, "error": "LLM analysis unavailable"}))
             return
         try:
             payload = json.loads(self.request.body or "{}")
         except json.JSONDecodeError:
             self.set_status(400)
             self.set_header("Content-Type", "application/json")
-            self.finish(json.dumps({"ok": False, "error": "Invalid JSON body"}))
+            self.finish(dumps({"ok": False, "error": "Invalid JSON body"}))
             return
 
         article_id, article_text = _compose_article_payload(payload)
         if not article_text:
             self.set_status(400)
             self.set_header("Content-Type", "application/json")
-            self.finish(json.dumps({"ok": False, "error": "Article text required"}))
+            self.finish(dumps({"ok": False, "error": "Article text required"}))
             return
 
         loop = tornado.ioloop.IOLoop.current()
@@ -4868,7 +5442,7 @@ class NewsAnalysisHandler(tornado.web.RequestHandler):
             logger.warning("news analysis failed: %s", exc)
             self.set_status(502)
             self.set_header("Content-Type", "application/json")
-            self.finish(json.dumps({"ok": False, "error": "AI analysis failed"}))
+            self.finish(dumps({"ok": False, "error": "AI analysis failed"}))
             return
 
         answers_raw = raw.get("answers", []) if isinstance(raw, dict) else []
@@ -4896,7 +5470,7 @@ class NewsAnalysisHandler(tornado.web.RequestHandler):
 
         self.set_header("Content-Type", "application/json")
         self.set_header("Cache-Control", "no-store")
-        self.finish(json.dumps({"ok": True, "article_id": article_id, "answers": structured}))
+        self.finish(dumps({"ok": True, "article_id": article_id, "answers": structured}))
 
 
 class HealthRunsHandler(tornado.web.RequestHandler):
@@ -4934,7 +5508,7 @@ class HealthRunsHandler(tornado.web.RequestHandler):
             if not base or not quote:
                 self.set_status(400)
                 self.set_header("Content-Type", "application/json")
-                self.finish(json.dumps({"ok": False, "error": "base/quote required for forex_pair"}))
+                self.finish(dumps({"ok": False, "error": "base/quote required for forex_pair"}))
                 return
             # When grouping, fetch a larger pool then filter in-memory
             if group_filter:
@@ -5045,7 +5619,7 @@ class HealthRunsHandler(tornado.web.RequestHandler):
         payload = {"ok": True, "runs": [_ser(r) for r in runs]}
         self.set_header("Content-Type", "application/json")
         self.set_header("Cache-Control", "no-store")
-        self.finish(json.dumps(payload))
+        self.finish(dumps(payload))
 
 
 class HealthRunHandler(tornado.web.RequestHandler):
@@ -5057,7 +5631,7 @@ class HealthRunHandler(tornado.web.RequestHandler):
         if AI_CLIENT is None:
             self.set_status(503)
             self.set_header("Content-Type", "application/json")
-            self.finish(json.dumps({"ok": False, "error": "LLM unavailable"}))
+            self.finish(dumps({"ok": False, "error": "LLM unavailable"}))
             return
         try:
             payload = json.loads(self.request.body or "{}")
@@ -5112,7 +5686,7 @@ class HealthRunHandler(tornado.web.RequestHandler):
             if not snapshot_text:
                 self.set_status(400)
                 self.set_header("Content-Type", "application/json")
-                self.finish(json.dumps({"ok": False, "error": "tech_snapshot text required"}))
+                self.finish(dumps({"ok": False, "error": "tech_snapshot text required"}))
                 return
             # Choose strategy (position variant only)
             chosen_strategy = strategy_override or "tech_snapshot_10q_position.json"
@@ -5238,7 +5812,7 @@ class HealthRunHandler(tornado.web.RequestHandler):
             self.set_header("Content-Type", "application/json")
             self.set_header("Cache-Control", "no-store")
             self.finish(
-                json.dumps(
+                dumps(
                     {
                         "ok": True,
                         "kind": "forex_pair" if is_fx else "stock",
@@ -5265,7 +5839,7 @@ class HealthRunHandler(tornado.web.RequestHandler):
             if not sym or len(sym) < 6:
                 self.set_status(400)
                 self.set_header("Content-Type", "application/json")
-                self.finish(json.dumps({"ok": False, "error": "symbol (pair) required e.g. XAUUSD"}))
+                self.finish(dumps({"ok": False, "error": "symbol (pair) required e.g. XAUUSD"}))
                 return
             base, quote = sym[:3], sym[3:6]
 
@@ -5545,7 +6119,7 @@ class HealthRunHandler(tornado.web.RequestHandler):
             self.set_header("Content-Type", "application/json")
             self.set_header("Cache-Control", "no-store")
             self.finish(
-                json.dumps(
+                dumps(
                     {
                         "ok": True,
                         "kind": "forex_pair",
@@ -5830,7 +6404,7 @@ class HealthRunHandler(tornado.web.RequestHandler):
         self.set_header("Content-Type", "application/json")
         self.set_header("Cache-Control", "no-store")
         self.finish(
-            json.dumps(
+            dumps(
                 {
                     "ok": True,
                     "kind": "stock",
@@ -5866,7 +6440,7 @@ class TradePlanHandler(tornado.web.RequestHandler):
         if AI_CLIENT is None:
             self.set_status(503)
             self.set_header("Content-Type", "application/json")
-            self.finish(json.dumps({"ok": False, "error": "LLM unavailable"}))
+            self.finish(dumps({"ok": False, "error": "LLM unavailable"}))
             return
         try:
             payload = json.loads(self.request.body or "{}")
@@ -5892,11 +6466,11 @@ class TradePlanHandler(tornado.web.RequestHandler):
             deep_run_id = None
         if action not in {"BUY", "SELL"}:
             self.set_status(400)
-            self.finish(json.dumps({"ok": False, "error": "action must be BUY or SELL"}))
+            self.finish(dumps({"ok": False, "error": "action must be BUY or SELL"}))
             return
         if not snapshot_text:
             self.set_status(400)
-            self.finish(json.dumps({"ok": False, "error": "tech_snapshot required"}))
+            self.finish(dumps({"ok": False, "error": "tech_snapshot required"}))
             return
 
         # Compose Basic and Tech+AI blocks from selected or latest runs
@@ -6117,7 +6691,7 @@ class TradePlanHandler(tornado.web.RequestHandler):
         template = prompts.get(template_key) or ""
         if not template:
             self.set_status(500)
-            self.finish(json.dumps({"ok": False, "error": "trade prompt template missing"}))
+            self.finish(dumps({"ok": False, "error": "trade prompt template missing"}))
             return
         prompt = (
             template
@@ -6161,7 +6735,7 @@ class TradePlanHandler(tornado.web.RequestHandler):
             )
         except Exception as exc:
             self.set_status(502)
-            self.finish(json.dumps({"ok": False, "error": str(exc)}))
+            self.finish(dumps({"ok": False, "error": str(exc)}))
             return
 
         # Normalize and enforce loss cap
@@ -6175,7 +6749,7 @@ class TradePlanHandler(tornado.web.RequestHandler):
         rows = await fetch_ohlc_bars(self.pool, symbol, timeframe, 1)
         ref_price = float(rows[-1]["close"]) if rows else 0.0
         try:
-            _tick = mt5_client.get_tick(symbol)
+            _tick = await mt5_async.get_tick(symbol)
             bid = float(_tick.get("bid") or 0) if isinstance(_tick, dict) else 0.0
             ask = float(_tick.get("ask") or 0) if isinstance(_tick, dict) else 0.0
             last = float(_tick.get("last") or 0) if isinstance(_tick, dict) else 0.0
@@ -6361,7 +6935,7 @@ class TradePlanHandler(tornado.web.RequestHandler):
 
         self.set_header("Content-Type", "application/json")
         self.set_header("Cache-Control", "no-store")
-        self.finish(json.dumps({
+        self.finish(dumps({
             "ok": True,
             "symbol": symbol,
             "timeframe": timeframe,
@@ -6436,7 +7010,7 @@ class AutoTradeLogHandler(tornado.web.RequestHandler):
             )
             self.set_header("Content-Type", "application/json")
             self.set_header("Cache-Control", "no-store")
-            self.finish(json.dumps({
+            self.finish(dumps({
                 "ok": True,
                 "run_id": ins.get("id"),
                 "created_at": ins.get("created_at").isoformat() if ins.get("created_at") else None,
@@ -6444,7 +7018,7 @@ class AutoTradeLogHandler(tornado.web.RequestHandler):
         except Exception as exc:
             self.set_status(500)
             self.set_header("Content-Type", "application/json")
-            self.finish(json.dumps({"ok": False, "error": str(exc)}))
+            self.finish(dumps({"ok": False, "error": str(exc)}))
 
 
 class AccountsHandler(tornado.web.RequestHandler):
@@ -6490,11 +7064,11 @@ class AccountsHandler(tornado.web.RequestHandler):
                 last = ""
             self.set_header("Content-Type", "application/json")
             self.set_header("Cache-Control", "no-store")
-            self.finish(json.dumps({"ok": True, "accounts": out, "last": last or ""}))
+            self.finish(dumps({"ok": True, "accounts": out, "last": last or ""}))
         except Exception as exc:
             self.set_status(500)
             self.set_header("Content-Type", "application/json")
-            self.finish(json.dumps({"ok": False, "error": str(exc)}))
+            self.finish(dumps({"ok": False, "error": str(exc)}))
 
 
 class AccountCurrentHandler(tornado.web.RequestHandler):
@@ -6503,11 +7077,11 @@ class AccountCurrentHandler(tornado.web.RequestHandler):
             login = mt5_client.current_login
             self.set_header("Content-Type", "application/json")
             self.set_header("Cache-Control", "no-store")
-            self.finish(json.dumps({"ok": True, "login": int(login) if login else None}))
+            self.finish(dumps({"ok": True, "login": int(login) if login else None}))
         except Exception as exc:
             self.set_status(500)
             self.set_header("Content-Type", "application/json")
-            self.finish(json.dumps({"ok": False, "error": str(exc)}))
+            self.finish(dumps({"ok": False, "error": str(exc)}))
 
     async def post(self):
         try:
@@ -6521,7 +7095,7 @@ class AccountCurrentHandler(tornado.web.RequestHandler):
         if not login_raw or not password:
             self.set_status(400)
             self.set_header("Content-Type", "application/json")
-            self.finish(json.dumps({"ok": False, "error": "login and password required"}))
+            self.finish(dumps({"ok": False, "error": "login and password required"}))
             return
         try:
             raw = await get_pref(self.pool, "mt5_accounts")
@@ -6560,11 +7134,11 @@ class AccountCurrentHandler(tornado.web.RequestHandler):
             await set_pref(self.pool, "last_account", login_raw)
             self.set_header("Content-Type", "application/json")
             self.set_header("Cache-Control", "no-store")
-            self.finish(json.dumps({"ok": True, "login": login_raw}))
+            self.finish(dumps({"ok": True, "login": login_raw}))
         except Exception as exc:
             self.set_status(500)
             self.set_header("Content-Type", "application/json")
-            self.finish(json.dumps({"ok": False, "error": str(exc)}))
+            self.finish(dumps({"ok": False, "error": str(exc)}))
 
     async def delete(self):
         """Delete an account by login.
@@ -6584,7 +7158,7 @@ class AccountCurrentHandler(tornado.web.RequestHandler):
         if not login_raw:
             self.set_status(400)
             self.set_header("Content-Type", "application/json")
-            self.finish(json.dumps({"ok": False, "error": "login required"}))
+            self.finish(dumps({"ok": False, "error": "login required"}))
             return
         try:
             raw = await get_pref(self.pool, "mt5_accounts")
@@ -6610,11 +7184,11 @@ class AccountCurrentHandler(tornado.web.RequestHandler):
                 await set_pref(self.pool, "last_account", new_last)
             self.set_header("Content-Type", "application/json")
             self.set_header("Cache-Control", "no-store")
-            self.finish(json.dumps({"ok": True, "removed": before - len(arr)}))
+            self.finish(dumps({"ok": True, "removed": before - len(arr)}))
         except Exception as exc:
             self.set_status(500)
             self.set_header("Content-Type", "application/json")
-            self.finish(json.dumps({"ok": False, "error": str(exc)}))
+            self.finish(dumps({"ok": False, "error": str(exc)}))
 
 
 class AccountLoginHandler(tornado.web.RequestHandler):
@@ -6630,7 +7204,7 @@ class AccountLoginHandler(tornado.web.RequestHandler):
         if not login_raw:
             self.set_status(400)
             self.set_header("Content-Type", "application/json")
-            self.finish(json.dumps({"ok": False, "error": "login required"}))
+            self.finish(dumps({"ok": False, "error": "login required"}))
             return
         try:
             raw = await get_pref(self.pool, "mt5_accounts")
@@ -6644,33 +7218,33 @@ class AccountLoginHandler(tornado.web.RequestHandler):
             if not rec:
                 self.set_status(404)
                 self.set_header("Content-Type", "application/json")
-                self.finish(json.dumps({"ok": False, "error": "account not found"}))
+                self.finish(dumps({"ok": False, "error": "account not found"}))
                 return
             pw = rec.get("password") or ""
             srv = rec.get("server") or os.getenv("MT5_SERVER")
             # Attempt login via MT5 client
             try:
-                ok = mt5_client.login(int(login_raw), password=pw, server=srv)
+                ok = await mt5_async.login(int(login_raw), password=pw, server=srv)
             except Exception as exc:
                 # Graceful: do not raise 502; return ok=false so UI can retry without network errors
                 self.set_header("Content-Type", "application/json")
                 self.set_header("Cache-Control", "no-store")
-                self.finish(json.dumps({"ok": False, "error": f"login failed: {exc}"}))
+                self.finish(dumps({"ok": False, "error": f"login failed: {exc}"}))
                 return
             if not ok:
                 code, msg = mt5_client.last_login_error or (None, "login failed")
                 self.set_header("Content-Type", "application/json")
                 self.set_header("Cache-Control", "no-store")
-                self.finish(json.dumps({"ok": False, "error": f"login failed: {code} {msg}"}))
+                self.finish(dumps({"ok": False, "error": f"login failed: {code} {msg}"}))
                 return
             await set_pref(self.pool, "last_account", login_raw)
             self.set_header("Content-Type", "application/json")
             self.set_header("Cache-Control", "no-store")
-            self.finish(json.dumps({"ok": True, "login": login_raw}))
+            self.finish(dumps({"ok": True, "login": login_raw}))
         except Exception as exc:
             self.set_status(500)
             self.set_header("Content-Type", "application/json")
-            self.finish(json.dumps({"ok": False, "error": str(exc)}))
+            self.finish(dumps({"ok": False, "error": str(exc)}))
 def main():
     # Load .env automatically if present (handy on Windows)
     # Allow .env to override any previously-set variables in this process
@@ -6716,12 +7290,10 @@ def main():
         interval_ms = int(float(os.getenv("AUTO_FETCH_SEC", "60")) * 1000)
 
         async def do_fetch():
-            loop = tornado.ioloop.IOLoop.current()
-            fetch_fn = partial(mt5_client.fetch_bars, sym, tf, cnt)
             try:
-                bars = await loop.run_in_executor(EXECUTOR, fetch_fn)
+                bars = await mt5_async.fetch_bar_columns(sym, tf, cnt, priority=PRIORITY_BACKFILL)
                 if GLOBAL_POOL is not None:
-                    await upsert_ohlc_bars(GLOBAL_POOL, bars)
+                    await upsert_ohlc_columns(GLOBAL_POOL, bars)
             except Exception as e:
                 logger.exception("auto-fetch error: %s", e)
 
@@ -6781,7 +7353,12 @@ def main():
         schedule_news_backfill_aligned(max(1, interval_min))
 
     # Start IOLoop (blocking)
-    loop.start()
+    try:
+        loop.start()
+    finally:
+        TICK_SAMPLER.stop()
+        shutdown_stl_workers()
+        mt5_bridge.stop()
 
 
 if __name__ == "__main__":
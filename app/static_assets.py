@@ -0,0 +1,230 @@
+"""Response compression and precompressed, fingerprinted static assets.
+
+``CompressionTransform`` replaces Tornado's gzip-only transform: it prefers
+brotli when the optional ``brotli`` package is installed and the client
+accepts it, falls back to gzip, and leaves responses below
+COMPRESS_MIN_BYTES (default 1024) alone.
+
+``PrecompressedStaticFileHandler`` serves /static/ files from variants
+compressed once at startup (``precompress_static``), and marks versioned URLs
+(``static_url`` adds ``?v=<hash>``) as immutable for a year. ``/sw.js`` is
+rendered from static/sw.js with the hashed URLs of the shell assets so the
+service worker precaches exactly the current build.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+
+import tornado.web
+
+from app.wire import BINARY_TYPE
+
+try:  # optional: gzip only without it
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+logger = logging.getLogger("mt5app.static")
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+# Static files worth precompressing; images are already compressed.
+_PRECOMPRESS_EXTS = {".js", ".css", ".html", ".json", ".webmanifest", ".svg", ".ico", ".txt", ".map"}
+# Files the service worker precaches (relative to static/).
+SW_PRECACHE = ("manifest.webmanifest", "logo.png", "favicon.ico", "favicon.png")
+
+
+def compress_min_bytes() -> int:
+    """Smallest response body (env COMPRESS_MIN_BYTES, default 1024) worth compressing."""
+    try:
+        return max(0, int(os.getenv("COMPRESS_MIN_BYTES", "1024") or 1024))
+    except Exception:
+        return 1024
+
+
+def _accepts(request, coding: str) -> bool:
+    accept = request.headers.get("Accept-Encoding", "") or ""
+    for item in accept.split(","):
+        name, *params = item.split(";")
+        if name.strip().lower() != coding:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        return q > 0
+    return False
+
+
+class CompressionTransform(tornado.web.GZipContentEncoding):
+    """gzip/brotli content encoding for dynamic responses above a size threshold."""
+
+    CONTENT_TYPES = tornado.web.GZipContentEncoding.CONTENT_TYPES | {
+        "application/manifest+json",
+        BINARY_TYPE,
+    }
+    MIN_LENGTH = compress_min_bytes()
+    # Dynamic responses: favour speed; static variants use the maximum level.
+    BROTLI_QUALITY = 5
+
+    def __init__(self, request) -> None:
+        super().__init__(request)
+        self._brotli = brotli is not None and _accepts(request, "br")
+        self._compressor = None
+
+    def transform_first_chunk(self, status_code, headers, chunk, finishing):
+        if not self._brotli:
+            return super().transform_first_chunk(status_code, headers, chunk, finishing)
+        self._gzipping = False
+        if "Vary" in headers:
+            headers["Vary"] += ", Accept-Encoding"
+        else:
+            headers["Vary"] = "Accept-Encoding"
+        ctype = str(headers.get("Content-Type", "")).split(";")[0]
+        self._brotli = (
+            self._compressible_type(ctype)
+            and (not finishing or len(chunk) >= self.MIN_LENGTH)
+            and "Content-Encoding" not in headers
+        )
+        if self._brotli:
+            headers["Content-Encoding"] = "br"
+            self._compressor = brotli.Compressor(quality=self.BROTLI_QUALITY)
+            chunk = self.transform_chunk(chunk, finishing)
+            if "Content-Length" in headers:
+                if finishing:
+                    headers["Content-Length"] = str(len(chunk))
+                else:
+                    del headers["Content-Length"]
+        return status_code, headers, chunk
+
+    def transform_chunk(self, chunk, finishing):
+        if self._compressor is None:
+            return super().transform_chunk(chunk, finishing)
+        out = self._compressor.process(chunk)
+        out += self._compressor.finish() if finishing else self._compressor.flush()
+        return out
+
+
+# abspath -> {"mtime": float, "gzip": bytes, "br": bytes}
+_VARIANTS: dict[str, dict] = {}
+
+
+def _compress_file(path: str) -> dict | None:
+    try:
+        with open(path, "rb") as fh:
+            data = fh.read()
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    variants: dict = {"mtime": mtime}
+    gz = gzip.compress(data, compresslevel=9, mtime=0)
+    if len(gz) < len(data):
+        variants["gzip"] = gz
+    if brotli is not None:
+        br = brotli.compress(data, quality=11)
+        if len(br) < len(data):
+            variants["br"] = br
+    return variants if len(variants) > 1 else None
+
+
+def precompress_static(static_path: str) -> dict:
+    """Compress every compressible file under ``static_path`` once; returns a summary."""
+    _VARIANTS.clear()
+    files = raw = packed = 0
+    for root, _dirs, names in os.walk(static_path):
+        for name in names:
+            if os.path.splitext(name)[1].lower() not in _PRECOMPRESS_EXTS:
+                continue
+            path = os.path.abspath(os.path.join(root, name))
+            variants = _compress_file(path)
+            if not variants:
+                continue
+            _VARIANTS[path] = variants
+            files += 1
+            raw += os.path.getsize(path)
+            packed += min(len(v) for k, v in variants.items() if k != "mtime")
+    summary = {"files": files, "bytes": raw, "compressed_bytes": packed, "brotli": brotli is not None}
+    logger.info("[static] precompressed %s", summary)
+    return summary
+
+
+class PrecompressedStaticFileHandler(tornado.web.StaticFileHandler):
+    """StaticFileHandler that serves startup-compressed variants and immutable versioned URLs."""
+
+    CACHE_MAX_AGE = IMMUTABLE_MAX_AGE
+
+    def _variant(self) -> tuple[str, bytes] | None:
+        if self.request.headers.get("Range"):
+            return None
+        variants = _VARIANTS.get(self.absolute_path or "")
+        if not variants:
+            return None
+        try:
+            if os.path.getmtime(self.absolute_path) != variants["mtime"]:
+                return None  # edited since startup; serve the file as-is
+        except OSError:
+            return None
+        for coding in ("br", "gzip"):
+            if coding in variants and _accepts(self.request, coding):
+                return coding, variants[coding]
+        return None
+
+    async def get(self, path: str, include_body: bool = True) -> None:
+        self._selected_variant = None
+        self.path = self.parse_url_path(path)
+        absolute_path = self.get_absolute_path(self.root, self.path)
+        self.absolute_path = self.validate_absolute_path(self.root, absolute_path)
+        if self.absolute_path is not None:
+            self._selected_variant = self._variant()
+        if self._selected_variant is None:
+            # Let the stock handler do validation, ranges and conditional GETs.
+            return await super().get(path, include_body)
+        coding, body = self._selected_variant
+        self.modified = self.get_modified_time()
+        self.set_headers()
+        self.set_header("Content-Encoding", coding)
+        if self.should_return_304():
+            self.set_status(304)
+            return
+        self.set_header("Content-Length", len(body))
+        if include_body:
+            self.write(body)
+
+    def compute_etag(self) -> str | None:
+        etag = super().compute_etag()
+        variant = getattr(self, "_selected_variant", None)
+        if etag and variant:
+            # A different byte stream needs a different strong tag.
+            etag = etag[:-1] + "-" + variant[0] + '"'
+        return etag
+
+    def set_extra_headers(self, path: str) -> None:
+        if "v" in self.request.arguments:
+            self.set_header("Cache-Control", f"public, max-age={IMMUTABLE_MAX_AGE}, immutable")
+        else:
+            self.set_header("Cache-Control", "no-cache")
+
+
+class ServiceWorkerHandler(tornado.web.RequestHandler):
+    """Serve static/sw.js at the site root with the hashed shell asset list filled in."""
+
+    def get(self) -> None:
+        static_path = self.settings.get("static_path") or ""
+        try:
+            with open(os.path.join(static_path, "sw.js"), "r", encoding="utf-8") as fh:
+                source = fh.read()
+        except OSError:
+            raise tornado.web.HTTPError(404)
+        urls = [self.static_url(name) for name in SW_PRECACHE if os.path.exists(os.path.join(static_path, name))]
+        build = hashlib.sha1("\n".join(urls).encode("utf-8")).hexdigest()[:12]
+        source = source.replace("__PRECACHE__", json.dumps(urls)).replace("__BUILD__", build)
+        self.set_header("Content-Type", "application/javascript; charset=utf-8")
+        # Browsers recheck the worker script on navigation; it must never be stale.
+        self.set_header("Cache-Control", "no-cache")
+        self.set_header("Service-Worker-Allowed", "/")
+        self.finish(source)
@@ -1,26 +1,29 @@
 from __future__ import annotations
 
-def sma(values: list[float], period: int) -> list[float]:
-    out: list[float] = []
-    s = 0.0
-    for i, v in enumerate(values):
-        s += v
-        if i >= period:
-            s -= values[i - period]
-        if i + 1 >= period:
-            out.append(s / period)
-        else:
-            out.append(float("nan"))
+import numpy as np
+
+
+def sma(values, period: int) -> np.ndarray:
+    """Simple moving average; the first ``period - 1`` points are NaN."""
+    arr = np.asarray(values, dtype=np.float64)
+    out = np.full(arr.shape, np.nan)
+    if period <= 0 or len(arr) < period:
+        return out
+    csum = np.cumsum(arr)
+    out[period - 1] = csum[period - 1] / period
+    out[period:] = (csum[period:] - csum[:-period]) / period
     return out
 
 
-def crossover_strategy(closes: list[float], fast: int = 20, slow: int = 50) -> dict:
+def crossover_strategy(closes, fast: int = 20, slow: int = 50) -> dict:
     if slow <= 1 or fast <= 1:
         return {"signal": "hold", "reason": "invalid_periods"}
     if len(closes) < slow + 2:
         return {"signal": "hold", "reason": "insufficient_data"}
-    s_fast = sma(closes, fast)
-    s_slow = sma(closes, slow)
+    # Only the last two points of each average matter; no need to smooth the whole series.
+    tail = np.asarray(closes, dtype=np.float64)[-(max(fast, slow) + 1):]
+    s_fast = sma(tail, fast)
+    s_slow = sma(tail, slow)
     # Look at last two points
     a1, b1 = s_fast[-2], s_slow[-2]
     a2, b2 = s_fast[-1], s_slow[-1]
@@ -29,4 +32,3 @@ def crossover_strategy(closes: list[float], fast: int = 20, slow: int = 50) -> d
     if a1 >= b1 and a2 < b2:
         return {"signal": "sell", "reason": "fast_cross_down"}
     return {"signal": "hold", "reason": "no_cross"}
-
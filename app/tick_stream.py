@@ -0,0 +1,200 @@
+"""Server-side tick sampling shared by every connected client.
+
+Websocket clients subscribe to symbols; a single periodic task reads each
+subscribed symbol once per interval (env TICK_SAMPLE_MS) and pushes a
+``{"type": "tick", ...}`` message to that symbol's subscribers when the quote
+changes. Messages go through ``send`` (app.ws_topics.UpdatesHub.send), i.e. the
+client's bounded outbox, where a newer tick for a symbol replaces a queued
+older one. The latest tick per symbol is kept so REST ``/api/tick`` requests are
+answered from memory while it is fresh, however many tabs are polling.
+"""
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timezone
+
+import tornado.ioloop
+
+from app.jsonio import dumps_text
+
+logger = logging.getLogger("mt5app.ticks")
+
+MAX_SYMBOLS_PER_CLIENT = 20
+_QUOTE_FIELDS = ("bid", "ask", "last", "time")
+
+
+def tick_sample_ms() -> int:
+    """Sampling interval in ms (env TICK_SAMPLE_MS, default 1000, minimum 100)."""
+    try:
+        ms = int(os.getenv("TICK_SAMPLE_MS", "1000") or 1000)
+    except Exception:
+        ms = 1000
+    return max(100, ms)
+
+
+def _quote(tick: dict | None) -> tuple | None:
+    if not tick:
+        return None
+    return tuple(tick.get(k) for k in _QUOTE_FIELDS)
+
+
+class TickSampler:
+    """Poll subscribed symbols once per interval and fan ticks out to clients.
+
+    ``fetch_tick`` is an async callable ``symbol -> tick dict``. Concurrent
+    cache misses for the same symbol share one in-flight fetch. ``send`` is
+    ``(client, key, msg) -> bool`` and queues ``msg`` for ``client`` under a
+    coalescing ``key``; False means the client is gone.
+    """
+
+    def __init__(self, fetch_tick, send, *, interval_ms: int | None = None) -> None:
+        self._fetch_tick = fetch_tick
+        self._send_to = send
+        self.interval_ms = interval_ms or tick_sample_ms()
+        self._subs: dict[str, set] = {}
+        self._client_symbols: dict[object, set[str]] = {}
+        self._last: dict[str, tuple[float, dict]] = {}
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._callback: tornado.ioloop.PeriodicCallback | None = None
+        self._sampling = False
+        self.samples = 0
+        self.pushes = 0
+        self.cache_hits = 0
+        self.errors = 0
+
+    # --- Subscriptions ---
+
+    def subscribe(self, client, symbols) -> list[str]:
+        """Replace ``client``'s subscription set; returns the accepted symbols."""
+        wanted: list[str] = []
+        for sym in symbols or []:
+            if not isinstance(sym, str):
+                continue
+            sym = sym.strip().upper()
+            if sym and sym not in wanted:
+                wanted.append(sym)
+        wanted = wanted[:MAX_SYMBOLS_PER_CLIENT]
+        self._drop_client(client)
+        if wanted:
+            self._client_symbols[client] = set(wanted)
+            for sym in wanted:
+                self._subs.setdefault(sym, set()).add(client)
+        self._update_timer()
+        # Send the cached quote right away so a new subscriber is not blank for an interval.
+        for sym in wanted:
+            cached = self._last.get(sym)
+            if cached is not None:
+                self._send(client, sym, self._message(sym, cached[1]))
+        return wanted
+
+    def unsubscribe(self, client) -> None:
+        self._drop_client(client)
+        self._update_timer()
+
+    def _drop_client(self, client) -> None:
+        for sym in self._client_symbols.pop(client, ()):
+            subs = self._subs.get(sym)
+            if subs is None:
+                continue
+            subs.discard(client)
+            if not subs:
+                del self._subs[sym]
+
+    def _update_timer(self) -> None:
+        if self._subs and self._callback is None:
+            self._callback = tornado.ioloop.PeriodicCallback(self._tick, self.interval_ms)
+            self._callback.start()
+            logger.debug("[ticks] sampler started interval=%dms", self.interval_ms)
+        elif not self._subs and self._callback is not None:
+            self._callback.stop()
+            self._callback = None
+            logger.debug("[ticks] sampler stopped (no subscribers)")
+
+    def stop(self) -> None:
+        if self._callback is not None:
+            self._callback.stop()
+            self._callback = None
+
+    # --- Cache ---
+
+    async def get(self, symbol: str, *, max_age_ms: int | None = None) -> dict:
+        """Latest tick for ``symbol``: cached when younger than ``max_age_ms``."""
+        symbol = symbol.strip().upper()
+        max_age = (self.interval_ms if max_age_ms is None else max_age_ms) / 1000.0
+        cached = self._last.get(symbol)
+        if cached is not None and (time.monotonic() - cached[0]) <= max_age:
+            self.cache_hits += 1
+            return dict(cached[1])
+        return dict(await self._refresh(symbol))
+
+    async def _refresh(self, symbol: str) -> dict:
+        fut = self._inflight.get(symbol)
+        if fut is not None:
+            return await asyncio.shield(fut)
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[symbol] = fut
+        try:
+            tick = await self._fetch_tick(symbol)
+            self.samples += 1
+            self._last[symbol] = (time.monotonic(), tick)
+            fut.set_result(tick)
+            return tick
+        except BaseException as exc:
+            fut.set_exception(exc)
+            # Mark retrieved so a miss with no other waiter does not log "never retrieved".
+            fut.exception()
+            raise
+        finally:
+            self._inflight.pop(symbol, None)
+
+    # --- Sampling ---
+
+    @staticmethod
+    def _message(symbol: str, tick: dict) -> str:
+        return dumps_text(
+            {
+                "type": "tick",
+                "symbol": symbol,
+                "tick": tick,
+                "ts": datetime.now(timezone.utc).isoformat(),
+            }
+        )
+
+    def _send(self, client, symbol: str, msg: str) -> bool:
+        return self._send_to(client, ("tick", symbol), msg)
+
+    async def _tick(self) -> None:
+        if self._sampling:
+            return  # previous round still waiting on the terminal
+        self._sampling = True
+        try:
+            for symbol in list(self._subs):
+                prev = self._last.get(symbol)
+                try:
+                    tick = await self._refresh(symbol)
+                except Exception as exc:
+                    self.errors += 1
+                    logger.debug("[ticks] sample %s failed: %s", symbol, exc)
+                    continue
+                if prev is not None and _quote(prev[1]) == _quote(tick):
+                    continue
+                msg = self._message(symbol, tick)
+                dead = [c for c in list(self._subs.get(symbol, ())) if not self._send(c, symbol, msg)]
+                self.pushes += 1
+                for client in dead:
+                    self.unsubscribe(client)
+        finally:
+            self._sampling = False
+
+    def stats(self) -> dict:
+        return {
+            "interval_ms": self.interval_ms,
+            "running": self._callback is not None,
+            "symbols": {sym: len(clients) for sym, clients in self._subs.items()},
+            "clients": len(self._client_symbols),
+            "samples": self.samples,
+            "pushes": self.pushes,
+            "cache_hits": self.cache_hits,
+            "errors": self.errors,
+        }
@@ -0,0 +1,119 @@
+"""Compact encodings for bar and STL series responses.
+
+``/api/data`` and ``/api/stl`` answer in one of three formats:
+
+    json     default; one object per point with ISO timestamps
+    columns  columnar JSON: {"columns": {"ts": [epoch s...], "close": [...]}, ...}
+    binary   packed little-endian columns (content type BINARY_TYPE)
+
+The format is picked by the ``format`` query argument, else by the Accept
+header (COLUMNS_TYPE / BINARY_TYPE), else json.
+
+Binary layout, all little-endian::
+
+    b"MQB1"                     magic
+    uint32 header_len           length of the JSON header that follows
+    header (utf-8 JSON)         {"length": n, "columns": [{"name": ..., "dtype": "i8"|"f8"}, ...], "meta": {...}}
+    zero padding                up to the next multiple of 8
+    column 0 .. column k-1      n * 8 bytes each, in header order
+
+Every column is 8 bytes wide, so each one starts 8-byte aligned and the
+browser can view it in place as a Float64Array / BigInt64Array.
+
+Series handlers also tag responses with ``strong_etag`` over cheap state
+markers and answer ``If-None-Match`` with 304 before loading any data.
+"""
+import hashlib
+import os
+import struct
+import time
+
+import numpy as np
+
+from app.jsonio import dumps
+
+MAGIC = b"MQB1"
+BINARY_TYPE = "application/vnd.microquant.columns"
+COLUMNS_TYPE = "application/vnd.microquant.columns+json"
+FORMATS = ("json", "columns", "binary")
+
+# Salts ETags with the process start: write versions in app.bar_cache restart at zero.
+_ETAG_BOOT = f"{os.getpid()}:{time.time_ns()}"
+
+
+def negotiate_format(handler) -> str:
+    """Response format for a request: ``format=`` argument, then Accept, then json."""
+    fmt = (handler.get_argument("format", default="") or "").strip().lower()
+    if fmt in FORMATS:
+        return fmt
+    accept = handler.request.headers.get("Accept", "") or ""
+    if COLUMNS_TYPE in accept:
+        return "columns"
+    if BINARY_TYPE in accept:
+        return "binary"
+    return "json"
+
+
+def _as_column(values) -> np.ndarray:
+    arr = np.asarray(values)
+    if arr.dtype.kind in "iub":
+        return np.ascontiguousarray(arr, dtype="<i8")
+    return np.ascontiguousarray(arr, dtype="<f8")
+
+
+def encode_binary(columns: dict, meta: dict | None = None) -> bytes:
+    """Pack equal-length numeric columns (name -> array) behind a JSON header."""
+    arrays = {name: _as_column(values) for name, values in columns.items()}
+    lengths = {len(a) for a in arrays.values()}
+    if len(lengths) > 1:
+        raise ValueError("columns differ in length")
+    header = dumps(
+        {
+            "length": lengths.pop() if lengths else 0,
+            "columns": [{"name": name, "dtype": "i8" if a.dtype.kind == "i" else "f8"} for name, a in arrays.items()],
+            "meta": meta or {},
+        }
+    )
+    head = MAGIC + struct.pack("<I", len(header)) + header
+    parts = [head, b"\0" * (-len(head) % 8)]
+    parts.extend(a.tobytes() for a in arrays.values())
+    return b"".join(parts)
+
+
+def encode_columns_json(columns: dict, meta: dict | None = None) -> bytes:
+    """Columnar JSON: the meta keys plus ``length`` and ``columns`` (NaN -> null)."""
+    arrays = {name: _as_column(values) for name, values in columns.items()}
+    payload = dict(meta or {})
+    payload["length"] = len(next(iter(arrays.values()))) if arrays else 0
+    payload["columns"] = arrays
+    return dumps(payload)
+
+
+def write_columns(handler, fmt: str, columns: dict, meta: dict | None = None) -> None:
+    """Finish ``handler`` with ``columns`` + ``meta`` encoded as ``fmt`` (columns/binary)."""
+    handler.set_header("Vary", "Accept")
+    if fmt == "binary":
+        handler.set_header("Content-Type", BINARY_TYPE)
+        handler.finish(encode_binary(columns, meta))
+    else:
+        handler.set_header("Content-Type", "application/json")
+        handler.finish(encode_columns_json(columns, meta))
+
+
+def strong_etag(*parts) -> str:
+    """Quoted strong ETag over ``parts`` (anything with a stable ``str``)."""
+    digest = hashlib.sha1(_ETAG_BOOT.encode("utf-8"))
+    for part in parts:
+        digest.update(b"\x1f")
+        digest.update(str(part).encode("utf-8"))
+    return '"' + digest.hexdigest()[:32] + '"'
+
+
+def not_modified(handler, etag: str) -> bool:
+    """Set ``etag`` on ``handler``; finish with 304 and return True if the client has it."""
+    handler.set_header("Etag", etag)
+    if handler.check_etag_header():
+        handler.set_status(304)
+        handler.finish()
+        return True
+    return False
@@ -0,0 +1,345 @@
+"""Topic routing and non-blocking fan-out for ``/ws/updates`` events.
+
+Each event (``fetch_complete``, ``stl_complete``, ``news_update``,
+``balance_update``, ...) has a topic made of its type, symbol and timeframe.
+A client filters on any of those three dimensions with websocket messages::
+
+    {"type": "subscribe", "symbols": ["EURUSD"], "timeframes": ["H1"], "events": ["fetch_complete"]}
+    {"type": "unsubscribe", "symbols": ["EURUSD"]}
+
+``subscribe`` replaces the listed dimensions and leaves the others alone;
+``"*"`` (or a missing dimension) matches everything. ``unsubscribe`` removes
+values, and an empty dimension then matches nothing. Events without a symbol
+or timeframe (balance, closed deals) pass those dimensions. A client that
+never subscribes receives every event, as before.
+
+``publish`` never waits on a socket. Events first collect in a short window
+(WS_BATCH_MS, default 150 ms) where a later event for a topic replaces the
+earlier one and counts it in ``merged``. When the window closes each client
+gets one frame: the event itself, or ``{"type": "batch", "events": [...]}``
+when several of its topics fired. Each event is serialized once per window
+and batch frames are spliced from those strings.
+
+Frames go onto each client's bounded outbox and are written by that client's
+own sender task. A queued single-event frame is replaced by a newer one for
+the same topic; when an outbox is full the oldest entry is dropped. A client
+whose outbox stays full for WS_SLOW_CLIENT_S seconds is disconnected.
+Tick frames from app.tick_stream share the outbox through ``send`` under the
+key ``("tick", SYMBOL)``, so a client only ever has the newest tick queued;
+the socket's own hello and ``subscribed`` frames go the same way.
+"""
+import asyncio
+import itertools
+import logging
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from app.jsonio import dumps_text
+
+logger = logging.getLogger("mt5app.ws")
+
+MAX_VALUES_PER_DIMENSION = 50
+# client message key -> event field
+DIMENSIONS = {"events": "type", "symbols": "symbol", "timeframes": "timeframe"}
+
+
+def ws_queue_size() -> int:
+    """Outbound events buffered per client (env WS_QUEUE_SIZE, default 256)."""
+    try:
+        return max(1, int(os.getenv("WS_QUEUE_SIZE", "256") or 256))
+    except Exception:
+        return 256
+
+
+def ws_slow_client_s() -> float:
+    """Seconds a client's outbox may stay full before it is dropped (env WS_SLOW_CLIENT_S, default 30)."""
+    try:
+        return max(1.0, float(os.getenv("WS_SLOW_CLIENT_S", "30") or 30))
+    except Exception:
+        return 30.0
+
+
+def ws_batch_ms() -> int:
+    """Window (env WS_BATCH_MS, default 150) over which events are merged per topic; 0 sends at once."""
+    try:
+        return max(0, int(os.getenv("WS_BATCH_MS", "150") or 0))
+    except Exception:
+        return 150
+
+
+def topic_of(event: dict) -> tuple[str, str | None, str | None]:
+    """(type, SYMBOL, TIMEFRAME) of an event; missing parts are None."""
+    parts = []
+    for field in DIMENSIONS.values():
+        value = event.get(field)
+        parts.append(str(value).upper() if value and field != "type" else (value or None))
+    return tuple(parts)
+
+
+def _clean(values, *, upper: bool) -> set[str] | None:
+    """Normalise a requested value list; None means wildcard."""
+    if values is None or values == "*":
+        return None
+    if isinstance(values, str):
+        values = [values]
+    out: set[str] = set()
+    for value in values if isinstance(values, (list, tuple)) else []:
+        if not isinstance(value, str):
+            continue
+        value = value.strip()
+        if value == "*":
+            return None
+        if value:
+            out.add(value.upper() if upper else value)
+        if len(out) >= MAX_VALUES_PER_DIMENSION:
+            break
+    return out
+
+
+class _Outbox:
+    """Bounded, coalescing send queue drained by one task per client."""
+
+    def __init__(self, hub: "UpdatesHub", client) -> None:
+        self.hub = hub
+        self.client = client
+        self.filters: dict[str, set[str] | None] = {key: None for key in DIMENSIONS}
+        self.pending: OrderedDict = OrderedDict()
+        self.full_since: float | None = None
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+        self._wake = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def put(self, key, msg: str) -> None:
+        if key in self.pending:
+            del self.pending[key]
+            self.coalesced += 1
+        elif len(self.pending) >= self.hub.queue_size:
+            self.pending.popitem(last=False)
+            self.dropped += 1
+            now = time.monotonic()
+            if self.full_since is None:
+                self.full_since = now
+            elif now - self.full_since >= self.hub.slow_client_s:
+                self.hub.disconnect_slow(self)
+                return
+        self.pending[key] = msg
+        self.max_depth = max(self.max_depth, len(self.pending))
+        self._wake.set()
+
+    async def _run(self) -> None:
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            while self.pending:
+                _key, msg = self.pending.popitem(last=False)
+                try:
+                    await self.client.write_message(msg)
+                except Exception:
+                    # Closed socket: on_close removes the client.
+                    self.hub.errors += 1
+                    return
+                self.sent += 1
+                if len(self.pending) < self.hub.queue_size:
+                    self.full_since = None
+
+    def close(self) -> None:
+        self._task.cancel()
+        self.pending.clear()
+
+    def stats(self) -> dict:
+        request = getattr(self.client, "request", None)
+        return {
+            "remote": getattr(request, "remote_ip", None),
+            "depth": len(self.pending),
+            "max_depth": self.max_depth,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "full_for_s": round(time.monotonic() - self.full_since, 1) if self.full_since is not None else None,
+        }
+
+
+class UpdatesHub:
+    """Connected update sockets, their topic filters and outboxes."""
+
+    def __init__(
+        self,
+        *,
+        queue_size: int | None = None,
+        slow_client_s: float | None = None,
+        batch_ms: int | None = None,
+    ) -> None:
+        self.queue_size = queue_size or ws_queue_size()
+        self.slow_client_s = slow_client_s or ws_slow_client_s()
+        self._clients: dict[object, _Outbox] = {}
+        self._seq = itertools.count()
+        self.published = 0
+        self.delivered = 0
+        self.filtered = 0
+        self.batch_ms = ws_batch_ms() if batch_ms is None else batch_ms
+        self._window: dict = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self.errors = 0
+        self.slow_disconnects = 0
+        self.merged = 0
+        self.batches = 0
+        # Counters of clients that have gone away, so totals do not shrink.
+        self._closed_dropped = 0
+        self._closed_coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def add(self, client) -> None:
+        self._clients[client] = _Outbox(self, client)
+
+    def discard(self, client) -> None:
+        box = self._clients.pop(client, None)
+        if box is not None:
+            self._closed_dropped += box.dropped
+            self._closed_coalesced += box.coalesced
+            box.close()
+
+    def disconnect_slow(self, box: _Outbox) -> None:
+        self.slow_disconnects += 1
+        logger.warning("[ws] disconnecting slow client %s (%s dropped)", box.stats()["remote"], box.dropped)
+        self.discard(box.client)
+        try:
+            box.client.close(1008, "slow consumer")
+        except Exception:
+            pass
+
+    def send(self, client, key, msg: str) -> bool:
+        """Queue a pre-encoded frame for one client under coalescing ``key``; False if it is not connected."""
+        box = self._clients.get(client)
+        if box is None:
+            return False
+        box.put(key, msg)
+        return True
+
+    # --- Subscriptions ---
+
+    def subscribe(self, client, message: dict) -> dict:
+        """Replace the dimensions present in ``message``; returns the client's filter."""
+        box = self._clients.get(client)
+        if box is None:
+            return {}
+        for key, field in DIMENSIONS.items():
+            if key in message:
+                box.filters[key] = _clean(message[key], upper=field != "type")
+        return self.describe(client)
+
+    def unsubscribe(self, client, message: dict) -> dict:
+        """Remove the listed values; with no dimensions given, reset to everything."""
+        box = self._clients.get(client)
+        if box is None:
+            return {}
+        filters = box.filters
+        listed = [key for key in DIMENSIONS if key in message]
+        if not listed:
+            for key in DIMENSIONS:
+                filters[key] = None
+        for key in listed:
+            drop = _clean(message[key], upper=DIMENSIONS[key] != "type")
+            if drop is None:
+                filters[key] = set()  # "*": unsubscribe from the whole dimension
+            elif filters[key] is not None:
+                filters[key] -= drop
+        return self.describe(client)
+
+    def describe(self, client) -> dict:
+        box = self._clients.get(client)
+        filters = box.filters if box is not None else {}
+        return {key: ("*" if values is None else sorted(values)) for key, values in filters.items()}
+
+    @staticmethod
+    def _matches(filters: dict, topic: tuple) -> bool:
+        for key, value in zip(DIMENSIONS, topic):
+            allowed = filters[key]
+            if allowed is None or value is None:
+                continue
+            if value not in allowed:
+                return False
+        return True
+
+    # --- Delivery ---
+
+    def publish(self, event: dict) -> None:
+        """Queue ``event`` for matching clients; never waits on sockets.
+
+        With a batch window the event waits up to WS_BATCH_MS in the window,
+        where a later event for the same topic replaces it.
+        """
+        if not self._clients:
+            return
+        self.published += 1
+        topic = topic_of(event)
+        if self.batch_ms <= 0:
+            self._deliver({topic: event})
+            return
+        previous = self._window.pop(topic, None)
+        if previous is not None:
+            self.merged += 1
+            event = {**event, "merged": int(previous.get("merged") or 1) + 1}
+        self._window[topic] = event
+        if self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(self.batch_ms / 1000.0, self._flush)
+
+    def _flush(self) -> None:
+        self._flush_handle = None
+        window, self._window = self._window, {}
+        if window and self._clients:
+            self._deliver(window)
+
+    def _deliver(self, events: dict) -> None:
+        """Send each client the events it subscribes to: one frame, batched when several match."""
+        encoded: dict = {}
+        frames: dict = {}
+        for box in list(self._clients.values()):
+            topics = tuple(topic for topic in events if self._matches(box.filters, topic))
+            self.filtered += len(events) - len(topics)
+            if not topics:
+                continue
+            for topic in topics:
+                if topic not in encoded:
+                    encoded[topic] = dumps_text(events[topic])
+            self.delivered += len(topics)
+            if len(topics) == 1:
+                box.put(topics[0], encoded[topics[0]])
+                continue
+            frame = frames.get(topics)
+            if frame is None:
+                # Events are already JSON; splice them instead of encoding again per client.
+                frame = frames[topics] = (
+                    '{"type":"batch","ts":' + dumps_text(datetime.now(timezone.utc).isoformat())
+                    + ',"events":[' + ",".join(encoded[t] for t in topics) + "]}"
+                )
+                self.batches += 1
+            box.put(next(self._seq), frame)
+
+    def stats(self) -> dict:
+        boxes = list(self._clients.values())
+        return {
+            "clients": len(boxes),
+            "filtered_clients": sum(1 for b in boxes if any(v is not None for v in b.filters.values())),
+            "queue_size": self.queue_size,
+            "slow_client_s": self.slow_client_s,
+            "batch_ms": self.batch_ms,
+            "published": self.published,
+            "merged": self.merged,
+            "batches": self.batches,
+            "delivered": self.delivered,
+            "filtered": self.filtered,
+            "queued": sum(len(b.pending) for b in boxes),
+            "dropped": self._closed_dropped + sum(b.dropped for b in boxes),
+            "coalesced": self._closed_coalesced + sum(b.coalesced for b in boxes),
+            "errors": self.errors,
+            "slow_disconnects": self.slow_disconnects,
+            "per_client": [b.stats() for b in boxes],
+        }
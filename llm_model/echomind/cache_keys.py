@@ -0,0 +1,117 @@
+"""Stable cache keys and legacy cache migration for the echomind clients."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from typing import Any, Optional
+
+LOGGER = logging.getLogger(__name__)
+
+CACHE_KEY_VERSION = 1
+LEGACY_DIRNAME = 'legacy'
+_MIGRATION_MARKER = '.cache_keys_v1'
+_LEGACY_NAME_RE = re.compile(r'^\d+\.json$')
+
+
+def make_cache_key(
+    provider: str,
+    model: Optional[str],
+    schema_name: Optional[str],
+    schema: Any,
+    system_content: Optional[str],
+    prompt: str,
+) -> str:
+    """Return a sha256 hex digest over the canonical JSON of the request parameters.
+
+    Unlike ``hash()`` this is identical across processes, and it separates
+    entries by provider, model, schema and system prompt.
+    """
+    payload = {
+        'v': CACHE_KEY_VERSION,
+        'provider': (provider or '').lower(),
+        'model': model or '',
+        'schema_name': schema_name or '',
+        'schema': schema,
+        'system': system_content or '',
+        'prompt': prompt or '',
+    }
+    blob = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str)
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+
+def legacy_prompt_key(prompt: str) -> str:
+    """Key used for entries migrated from the old ``abs(hash(prompt))`` files."""
+    return hashlib.sha256((prompt or '').encode('utf-8')).hexdigest()
+
+
+_MIGRATE_LOCK = threading.Lock()
+
+
+def migrate_legacy_cache(cache_dir: str) -> int:
+    """Move old ``<abs(hash(prompt))>.json`` files to ``legacy/<sha256(prompt)>.json``.
+
+    The old names depended on the per-process string hash seed, so they could
+    never be found again after a restart. The legacy files only record the
+    prompt, so they are re-keyed by prompt and served read-only to requests
+    that match the old writer (default provider and model, no schema). Runs
+    once per cache directory.
+    """
+    with _MIGRATE_LOCK:
+        marker = os.path.join(cache_dir, _MIGRATION_MARKER)
+        if os.path.exists(marker) or not os.path.isdir(cache_dir):
+            return 0
+        legacy_dir = os.path.join(cache_dir, LEGACY_DIRNAME)
+        moved = 0
+        for name in os.listdir(cache_dir):
+            if not _LEGACY_NAME_RE.match(name):
+                continue
+            src = os.path.join(cache_dir, name)
+            try:
+                with open(src, 'r', encoding='utf-8') as fh:
+                    data = json.load(fh)
+                prompt = data.get('prompt')
+                if not isinstance(prompt, str) or 'response' not in data:
+                    continue
+                os.makedirs(legacy_dir, exist_ok=True)
+                os.replace(src, os.path.join(legacy_dir, f"{legacy_prompt_key(prompt)}.json"))
+                moved += 1
+            except Exception as exc:  # pragma: no cover - corrupt file
+                LOGGER.warning("cache migration: skipping %s: %s", src, exc)
+        try:
+            with open(marker, 'w', encoding='utf-8') as fh:
+                fh.write(f"{CACHE_KEY_VERSION}\n")
+        except Exception:
+            pass
+        if moved:
+            LOGGER.info("cache migration: re-keyed %d legacy entries in %s", moved, cache_dir)
+        return moved
+
+
+class CacheStats:
+    """Thread-safe hit/miss counters for a response cache."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / total) if total else None,
+            }
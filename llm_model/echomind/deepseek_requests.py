@@ -22,6 +22,11 @@ except ModuleNotFoundError:  # pragma: no cover - optional dependency
     pygame = stub  # type: ignore
 from openai import OpenAI
 
+try:  # Prefer relative import when used as a package
+    from .cache_keys import CacheStats, LEGACY_DIRNAME, legacy_prompt_key, make_cache_key, migrate_legacy_cache  # type: ignore
+except ImportError:  # Fallback for legacy sys.path setups
+    from echomind.cache_keys import CacheStats, LEGACY_DIRNAME, legacy_prompt_key, make_cache_key, migrate_legacy_cache  # type: ignore
+
 
 class JSONValidationError(Exception):
     def __init__(self, message, json_string=None):
@@ -41,7 +46,9 @@ class JSONParsingError(Exception):
 
 
 class DeepSeekRequestJSONBase:
-    def __init__(self, use_cache=True, max_retries=3, cache_dir='cache'):
+    PROVIDER = 'deepseek'
+
+    def __init__(self, use_cache=True, max_retries=3, cache_dir='cache', response_cache=None):
         api_key = os.environ.get("DEEPSEEK_API_KEY")
         if not api_key:
             raise ValueError("DEEPSEEK_API_KEY environment variable is required")
@@ -52,6 +59,10 @@ class DeepSeekRequestJSONBase:
         self.audio_cache_dir = os.path.join(cache_dir, 'audio')
         self.ensure_dir_exists(self.cache_dir)
         self.ensure_dir_exists(self.audio_cache_dir)
+        self.cache_stats = CacheStats()
+        # Optional shared ResponseCache; without it entries are JSON files in cache_dir.
+        self.response_cache = response_cache
+        migrate_legacy_cache(self.cache_dir)
         try:
             pygame.mixer.init()
         except:
@@ -61,15 +72,13 @@ class DeepSeekRequestJSONBase:
         if not os.path.exists(path):
             os.makedirs(path)
 
-    def get_cache_file_path(self, prompt, filename=None):
+    def get_cache_file_path(self, cache_key, filename=None):
         if filename is None:
-            filename = f"{abs(hash(prompt))}.json"
-        cache_path = os.path.join(self.cache_dir, filename)
-        print("cache_path: ", cache_path)
-        cache_dir = os.path.dirname(cache_path)
-        print("cache_dir: ", cache_dir)
-        os.makedirs(cache_dir, exist_ok=True)
-        return cache_path
+            filename = f"{cache_key}.json"
+        return os.path.join(self.cache_dir, filename)
+
+    def make_cache_key(self, prompt, model, system_content=None, schema_name=None, json_schema=None):
+        return make_cache_key(self.PROVIDER, model, schema_name, json_schema, system_content, prompt)
 
     def get_audio_cache_file_path(self, text, voice, model="tts-1", instructions=""):
         cache_key = f"{text}_{voice}_{model}_{instructions}"
@@ -78,19 +87,48 @@ class DeepSeekRequestJSONBase:
         cache_path = os.path.join(self.audio_cache_dir, filename)
         return cache_path
 
-    def save_to_cache(self, prompt, response, filename=None):
-        file_path = self.get_cache_file_path(prompt, filename=filename)
+    def save_to_cache(self, cache_key, response, filename=None, prompt=None):
+        if self.response_cache is not None:
+            self.response_cache.set(f"file:{filename}" if filename else cache_key, response)
+            return
+        file_path = self.get_cache_file_path(cache_key, filename=filename)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
         with open(file_path, 'w', encoding='utf-8') as file:
-            json.dump({"prompt": prompt, "response": response}, file, ensure_ascii=False, indent=4)
+            json.dump({"key": cache_key, "prompt": prompt, "response": response}, file, ensure_ascii=False, indent=4)
 
-    def load_from_cache(self, prompt, filename=None):
-        file_path = self.get_cache_file_path(prompt, filename=filename)
+    def load_from_cache(self, cache_key, filename=None, legacy_prompt=None):
+        if self.response_cache is not None:
+            return self._load_from_response_cache(cache_key, filename, legacy_prompt)
+        file_path = self.get_cache_file_path(cache_key, filename=filename)
         if os.path.exists(file_path):
             with open(file_path, 'r', encoding='utf-8') as file:
                 cached_data = json.load(file)
-                return cached_data["response"]
+            self.cache_stats.record(True)
+            return cached_data["response"]
+        if legacy_prompt is not None and filename is None:
+            # Entries migrated from the old hash(prompt) names carry no provider,
+            # model or schema; callers only pass legacy_prompt for requests shaped
+            # like the old writer's, and the entry is read in place, never re-keyed.
+            legacy_path = os.path.join(self.cache_dir, LEGACY_DIRNAME, f"{legacy_prompt_key(legacy_prompt)}.json")
+            if os.path.exists(legacy_path):
+                with open(legacy_path, 'r', encoding='utf-8') as file:
+                    cached_data = json.load(file)
+                self.cache_stats.record(True)
+                return cached_data.get("response")
+        self.cache_stats.record(False)
         return None
 
+    def _load_from_response_cache(self, cache_key, filename=None, legacy_prompt=None):
+        store = self.response_cache
+        response = store.get(f"file:{filename}" if filename else cache_key)
+        if response is None and legacy_prompt is not None and filename is None:
+            response = store.get(f"legacy:{legacy_prompt_key(legacy_prompt)}")
+        self.cache_stats.record(response is not None)
+        return response
+
+    def get_cache_stats(self):
+        return self.cache_stats.as_dict()
+
     def load_audio_from_cache(self, audio_path):
         if os.path.exists(audio_path):
             return audio_path
@@ -141,11 +179,10 @@ Make sure your response is valid JSON that follows this structure."""
             {"role": "system", "content": enhanced_system_content},
             {"role": "user", "content": prompt}
         ]
-        print("self.use_cache: ", self.use_cache)
+        cache_key = self.make_cache_key(prompt, model, system_content, schema_name, json_schema)
         if self.use_cache:
-            cached_response = self.load_from_cache(prompt, filename=filename)
+            cached_response = self.load_from_cache(cache_key, filename=filename)
             if cached_response:
-                print("DeepSeek cache found. ")
                 return cached_response
         while retries < self.max_retries:
             try:
@@ -161,7 +198,7 @@ Make sure your response is valid JSON that follows this structure."""
                     raise Exception("DeepSeek returned empty content. This is a known issue with the JSON output feature.")
                 parsed_response = json.loads(message.content)
                 if self.use_cache:
-                    self.save_to_cache(prompt, parsed_response, filename=filename)
+                    self.save_to_cache(cache_key, parsed_response, filename=filename, prompt=prompt)
                 return parsed_response
             except json.JSONDecodeError as e:
                 error_msg = f"Failed to decode JSON response: {e}. Response content: {message.content if 'message' in locals() else 'No content'}"
@@ -183,11 +220,10 @@ Make sure your response is valid JSON that follows this structure."""
     def send_simple_request(self, prompt, system_content="You are a helpful AI assistant.", model=None):
         if model is None:
             model = os.environ.get("DEEPSEEK_MODEL", "deepseek-chat")
-        cache_key = f"{system_content}_{prompt}"
+        cache_key = self.make_cache_key(prompt, model, system_content)
         if self.use_cache:
             cached_response = self.load_from_cache(cache_key)
             if cached_response:
-                print("DeepSeek simple request cache found.")
                 return cached_response
         retries = 0
         messages = [
@@ -204,7 +240,7 @@ Make sure your response is valid JSON that follows this structure."""
                 message = response.choices[0].message
                 response_text = message.content
                 if self.use_cache:
-                    self.save_to_cache(cache_key, response_text)
+                    self.save_to_cache(cache_key, response_text, prompt=prompt)
                 return response_text
             except Exception as e:
                 error_msg = f"DeepSeek API error: {e}"
@@ -4,6 +4,7 @@
 from __future__ import annotations
 
 import logging
+import os
 from typing import Dict, List, Optional
 
 try:  # Prefer relative import when used as a package
@@ -19,8 +20,17 @@ except Exception:  # pragma: no cover - DeepSeek optional
     except Exception:
         DeepSeekRequestJSONBase = None  # type: ignore
 
+try:
+    from .cache_keys import migrate_legacy_cache  # type: ignore
+    from .response_cache import ResponseCache  # type: ignore
+except ImportError:  # Fallback for legacy sys.path setups
+    from echomind.cache_keys import migrate_legacy_cache  # type: ignore
+    from echomind.response_cache import ResponseCache  # type: ignore
+
 LOGGER = logging.getLogger(__name__)
 
+CACHE_DB_NAME = 'llm_cache.sqlite3'
+
 
 class MixedAIRequestJSONBase:
     """Proxy client that tries providers in order with graceful fallback."""
@@ -38,12 +48,27 @@ class MixedAIRequestJSONBase:
         self.use_cache = use_cache
         self.max_retries = max_retries
         self.cache_dir = cache_dir
+        # One indexed store shared by all providers (in-memory LRU + SQLite file).
+        self.response_cache: Optional[ResponseCache] = None
+        if use_cache:
+            try:
+                self.response_cache = ResponseCache(os.path.join(cache_dir, CACHE_DB_NAME))
+                migrate_legacy_cache(cache_dir)
+                self.response_cache.import_json_dir(cache_dir)
+            except Exception as exc:  # pragma: no cover - fall back to JSON files
+                LOGGER.warning("MixedAI: response cache unavailable, using JSON files: %s", exc)
+                self.response_cache = None
 
         for name in order:
             key = (name or '').strip().lower()
             if key == 'openai':
                 try:
-                    client = OpenAIRequestJSONBase(use_cache=use_cache, max_retries=max_retries, cache_dir=cache_dir)
+                    client = OpenAIRequestJSONBase(
+                        use_cache=use_cache,
+                        max_retries=max_retries,
+                        cache_dir=cache_dir,
+                        response_cache=self.response_cache,
+                    )
                     self._clients['openai'] = client
                     self._order.append('openai')
                 except Exception as exc:  # pragma: no cover - initialization failure
@@ -53,7 +78,12 @@ class MixedAIRequestJSONBase:
                     LOGGER.warning("MixedAI: DeepSeek client not available (module import failed)")
                     continue
                 try:
-                    client = DeepSeekRequestJSONBase(use_cache=use_cache, max_retries=max_retries, cache_dir=cache_dir)
+                    client = DeepSeekRequestJSONBase(
+                        use_cache=use_cache,
+                        max_retries=max_retries,
+                        cache_dir=cache_dir,
+                        response_cache=self.response_cache,
+                    )
                     self._clients['deepseek'] = client
                     self._order.append('deepseek')
                 except Exception as exc:  # pragma: no cover - initialization failure
@@ -96,6 +126,27 @@ class MixedAIRequestJSONBase:
     def send_simple_request(self, *args, **kwargs):
         return self._call_with_fallback('send_simple_request', *args, **kwargs)
 
+    def get_cache_stats(self) -> Dict[str, object]:
+        """Per-provider and combined response cache hit/miss counters."""
+        per_provider: Dict[str, dict] = {}
+        hits = misses = 0
+        for name in self._order:
+            getter = getattr(self._clients.get(name), 'get_cache_stats', None)
+            if getter is None:
+                continue
+            stats = getter()
+            per_provider[name] = stats
+            hits += int(stats.get('hits') or 0)
+            misses += int(stats.get('misses') or 0)
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': (hits / total) if total else None,
+            'providers': per_provider,
+            'store': self.response_cache.stats() if self.response_cache is not None else None,
+        }
+
     def __getattr__(self, item):
         # Fallback to primary provider for any other attributes/methods
         primary = self._order[0]
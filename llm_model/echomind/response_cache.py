@@ -0,0 +1,247 @@
+"""Two-tier response cache: in-memory LRU in front of a single SQLite file."""
+
+from __future__ import annotations
+
+import copy
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)) or default)
+    except (TypeError, ValueError):
+        return default
+
+
+class ResponseCache:
+    """Key/value store for LLM responses with TTL, size cap and compression.
+
+    Values are JSON-serialisable objects. Lookups hit the in-memory LRU first
+    and fall back to an indexed SQLite table; both tiers honour the TTL. When
+    the table exceeds ``max_entries`` or ``max_bytes`` the least recently used
+    rows are evicted in batches. Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        memory_items: Optional[int] = None,
+        ttl_sec: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        compress_min_bytes: int = 2048,
+    ) -> None:
+        self.path = path
+        self.memory_items = memory_items if memory_items is not None else _env_int('LLM_CACHE_MEMORY_ITEMS', 2048)
+        self.ttl_sec = ttl_sec if ttl_sec is not None else _env_int('LLM_CACHE_TTL_SEC', 30 * 86400)
+        self.max_entries = max_entries if max_entries is not None else _env_int('LLM_CACHE_MAX_ENTRIES', 500_000)
+        self.max_bytes = max_bytes if max_bytes is not None else _env_int('LLM_CACHE_MAX_MB', 1024) * 1024 * 1024
+        self.compress_min_bytes = compress_min_bytes
+        self._lock = threading.RLock()
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            ' key TEXT PRIMARY KEY,'
+            ' value BLOB NOT NULL,'
+            ' compressed INTEGER NOT NULL DEFAULT 0,'
+            ' size INTEGER NOT NULL,'
+            ' created_at REAL NOT NULL,'
+            ' accessed_at REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries (accessed_at)')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)')
+        row = self._conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+        self._entries = int(row[0])
+        self._bytes = int(row[1])
+
+    # --- Encoding ---
+
+    def _encode(self, value: Any) -> Tuple[bytes, int]:
+        raw = json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        if len(raw) >= self.compress_min_bytes:
+            return zlib.compress(raw, 6), 1
+        return raw, 0
+
+    @staticmethod
+    def _decode(blob: bytes, compressed: int) -> Any:
+        raw = zlib.decompress(blob) if compressed else blob
+        return json.loads(raw)
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_sec > 0 and (now - created_at) > self.ttl_sec
+
+    def _remember(self, key: str, created_at: float, value: Any) -> None:
+        if self.memory_items <= 0:
+            return
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    # --- Public API ---
+
+    def get(self, key: str, default: Any = None) -> Any:
+        now = time.time()
+        with self._lock:
+            item = self._memory.get(key, _MISSING)
+            if item is not _MISSING:
+                created_at, value = item
+                if not self._expired(created_at, now):
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return copy.deepcopy(value)
+                self._memory.pop(key, None)
+            row = self._conn.execute(
+                'SELECT value, compressed, size, created_at, accessed_at FROM entries WHERE key = ?',
+                (key,),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return default
+            blob, compressed, size, created_at, accessed_at = row
+            if self._expired(created_at, now):
+                self._conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+                self._entries -= 1
+                self._bytes -= int(size)
+                self.expired += 1
+                self.misses += 1
+                return default
+            value = self._decode(blob, compressed)
+            self._remember(key, created_at, copy.deepcopy(value))
+            # Refresh recency coarsely so reads do not turn into writes.
+            if now - accessed_at > 3600:
+                self._conn.execute('UPDATE entries SET accessed_at = ? WHERE key = ?', (now, key))
+            self.disk_hits += 1
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        blob, compressed = self._encode(value)
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute('SELECT size FROM entries WHERE key = ?', (key,)).fetchone()
+            self._conn.execute(
+                'INSERT OR REPLACE INTO entries (key, value, compressed, size, created_at, accessed_at)'
+                ' VALUES (?, ?, ?, ?, ?, ?)',
+                (key, sqlite3.Binary(blob), compressed, len(blob), now, now),
+            )
+            if old is None:
+                self._entries += 1
+            else:
+                self._bytes -= int(old[0])
+            self._bytes += len(blob)
+            self._remember(key, now, copy.deepcopy(value))
+            if self._entries > self.max_entries or self._bytes > self.max_bytes:
+                self._evict()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._memory.pop(key, None)
+            row = self._conn.execute('SELECT size FROM entries WHERE key = ?', (key,)).fetchone()
+            if row is not None:
+                self._conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+                self._entries -= 1
+                self._bytes -= int(row[0])
+
+    def _evict(self) -> None:
+        # Trim to 90% of the caps so eviction runs in batches, not per insert.
+        target_entries = int(self.max_entries * 0.9)
+        target_bytes = int(self.max_bytes * 0.9)
+        while self._entries > target_entries or self._bytes > target_bytes:
+            excess = self._entries - target_entries
+            batch = min(500, excess) if excess > 0 else 100
+            rows = self._conn.execute(
+                'SELECT key, size FROM entries ORDER BY accessed_at LIMIT ?', (batch,)
+            ).fetchall()
+            if not rows:
+                break
+            self._conn.executemany('DELETE FROM entries WHERE key = ?', [(k,) for k, _ in rows])
+            for k, size in rows:
+                self._memory.pop(k, None)
+                self._entries -= 1
+                self._bytes -= int(size)
+            self.evictions += len(rows)
+
+    def get_meta(self, name: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute('SELECT value FROM meta WHERE name = ?', (name,)).fetchone()
+            return row[0] if row else None
+
+    def set_meta(self, name: str, value: str) -> None:
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)', (name, value))
+
+    def import_json_dir(self, cache_dir: str, legacy_dirname: str = 'legacy') -> int:
+        """Load the old one-file-per-entry JSON cache into the store (runs once)."""
+        if self.get_meta('json_import') or not os.path.isdir(cache_dir):
+            return 0
+        imported = 0
+        sources = [(cache_dir, '')]
+        legacy_dir = os.path.join(cache_dir, legacy_dirname)
+        if os.path.isdir(legacy_dir):
+            sources.append((legacy_dir, 'legacy:'))
+        for directory, prefix in sources:
+            for name in os.listdir(directory):
+                if not name.endswith('.json'):
+                    continue
+                try:
+                    with open(os.path.join(directory, name), 'r', encoding='utf-8') as fh:
+                        data = json.load(fh)
+                    if 'response' not in data:
+                        continue
+                    key = prefix + (data.get('key') or name[:-5])
+                    self.set(key, data['response'])
+                    imported += 1
+                except Exception as exc:  # pragma: no cover - corrupt file
+                    LOGGER.warning("response cache: skipping %s: %s", name, exc)
+        self.set_meta('json_import', str(int(time.time())))
+        if imported:
+            LOGGER.info("response cache: imported %d JSON entries from %s", imported, cache_dir)
+        return imported
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            total = hits + self.misses
+            return {
+                'hits': hits,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': (hits / total) if total else None,
+                'evictions': self.evictions,
+                'expired': self.expired,
+                'entries': self._entries,
+                'bytes': self._bytes,
+                'memory_entries': len(self._memory),
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
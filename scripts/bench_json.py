@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Benchmark response serialization: stdlib json.dumps vs app.jsonio.
+
+Builds synthetic payloads shaped like the heaviest endpoints (/api/data rows,
+/api/stl rows, columnar series, closed deals, health runs with their jsonb
+answers) and times the previous handler path (``json.dumps`` to str, then
+UTF-8 encode in ``finish``) against ``app.jsonio.dumps`` and its stdlib
+fallback. Also times the jsonb decode path (json.loads vs jsonio.loads).
+
+    python scripts/bench_json.py --bars 1500 --repeat 20
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from app import jsonio  # type: ignore  # noqa: E402
+
+
+def data_rows(n: int) -> dict:
+    t0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    rows = []
+    for i in range(n):
+        px = 1.1 + math.sin(i / 50.0) * 0.01
+        rows.append({
+            "symbol": "EURUSD", "timeframe": "M1", "ts": (t0 + timedelta(minutes=i)).isoformat(),
+            "open": px, "high": px + 0.0002, "low": px - 0.0002, "close": px + 0.0001,
+            "tick_volume": 100 + i % 50, "spread": 12, "real_volume": 0,
+        })
+    return {"symbol": "EURUSD", "timeframe": "M1", "rows": rows}
+
+
+def stl_rows(n: int) -> dict:
+    t0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    rows = [
+        {"ts": (t0 + timedelta(minutes=i)).isoformat(), "close": 1.1 + i * 1e-6,
+         "trend": 1.1 + i * 1e-6, "seasonal": math.sin(i / 30.0) * 1e-3, "resid": ((i * 7919) % 13 - 6) * 1e-5}
+        for i in range(n)
+    ]
+    return {"run": {"id": 1, "symbol": "EURUSD", "timeframe": "M1", "n": n}, "rows": rows}
+
+
+def columns(n: int) -> dict:
+    ts = np.arange(1_704_067_200, 1_704_067_200 + 60 * n, 60, dtype=np.int64)
+    close = 1.1 + np.sin(np.arange(n) / 50.0) * 0.01
+    return {"length": n, "columns": {"ts": ts, "open": close, "high": close + 2e-4, "low": close - 2e-4, "close": close}}
+
+
+def closed_deals(n: int) -> dict:
+    t0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    deals = [
+        {"ticket": 10_000_000 + i, "position_id": 5_000_000 + i // 2, "symbol": "EURUSD", "type": "buy" if i % 2 else "sell",
+         "volume": 0.1, "price": 1.1 + i * 1e-5, "profit": (i % 17 - 8) * 1.25, "commission": -0.7, "swap": 0.0,
+         "comment": "tp", "magic": 0, "time": (t0 + timedelta(minutes=7 * i)).isoformat()}
+        for i in range(n)
+    ]
+    return {"ok": True, "deals": deals, "count": n}
+
+
+def health_runs(n: int) -> dict:
+    answers = {
+        "strategy": "fundamental",
+        "answers": [{"q": f"question {k}", "a": "neutral bias with moderate conviction " * 4, "score": k % 5} for k in range(12)],
+        "summary": "Macro backdrop mixed; rates differential favours the base currency. " * 6,
+    }
+    runs = [
+        {"id": i, "kind": "fundamental", "symbol": "EURUSD", "base_ccy": "EUR", "quote_ccy": "USD", "news_count": 25,
+         "news_ids": list(range(i, i + 25)), "answers_json": answers, "created_at": "2024-01-01T00:00:00+00:00"}
+        for i in range(n)
+    ]
+    return {"ok": True, "runs": runs}
+
+
+def median_ms(fn, payload, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(payload)
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples) * 1000
+
+
+def stdlib_handler(obj) -> bytes:
+    # Previous handler path: json.dumps(...) then Tornado encodes the str.
+    return json.dumps(obj).encode("utf-8")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bars", type=int, default=1500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    payloads = (
+        (f"/api/data rows ({args.bars})", data_rows(args.bars)),
+        ("/api/stl rows (5000)", stl_rows(5000)),
+        (f"columns, numpy ({args.bars})", columns(args.bars)),
+        ("closed deals (2000)", closed_deals(2000)),
+        ("health runs (100)", health_runs(100)),
+    )
+    fast = jsonio.orjson is not None
+    print(f"median of {args.repeat}; orjson {'available' if fast else 'NOT installed (fast column = fallback)'}")
+    print(f"  {'payload':<28} {'bytes':>9} {'stdlib':>9} {'jsonio':>9} {'fallback':>9} {'speedup':>8}")
+    for label, payload in payloads:
+        # Old path cannot serialize numpy arrays; convert them the way handlers used to.
+        plain = payload if "numpy" not in label else {
+            **payload, "columns": {k: v.tolist() for k, v in payload["columns"].items()}
+        }
+        body = jsonio.dumps(payload)
+        old = median_ms(stdlib_handler, plain, args.repeat)
+        new = median_ms(jsonio.dumps, payload, args.repeat)
+        fallback = median_ms(lambda obj: jsonio._stdlib_dumps(obj).encode("utf-8"), payload, args.repeat)
+        print(f"  {label:<28} {len(body):>9,} {old:>8.2f}ms {new:>8.2f}ms {fallback:>8.2f}ms {old / new:>7.1f}x")
+
+    text = json.dumps(health_runs(1)["runs"][0]["answers_json"])
+    old = median_ms(lambda s: [json.loads(s) for _ in range(1000)], text, args.repeat)
+    new = median_ms(lambda s: [jsonio.loads(s) for _ in range(1000)], text, args.repeat)
+    print(f"  {'jsonb decode (1000 rows)':<28} {len(text):>9,} {old:>8.2f}ms {new:>8.2f}ms {'':>9} {old / new:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
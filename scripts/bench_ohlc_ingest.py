@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Benchmark OHLC ingest: executemany vs the unnest statement vs binary COPY.
+
+Writes synthetic bars for a scratch symbol into ohlc_bars (DATABASE_URL) and
+deletes them afterwards. Each size is timed on a fresh insert and on a second
+pass where every bar is re-sent unchanged.
+
+    python scripts/bench_ohlc_ingest.py --sizes 10000,100000,1000000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+try:
+    from dotenv import load_dotenv
+except ImportError:
+    load_dotenv = None
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+if load_dotenv is not None:
+    env_path = ROOT / ".env"
+    if env_path.exists():
+        load_dotenv(env_path)
+    else:
+        load_dotenv()
+
+from app.db import create_pool, init_schema, upsert_ohlc_bars  # type: ignore
+
+SYMBOL = "__BENCH__"
+TIMEFRAME = "M1"
+
+EXECUTEMANY_SQL = """
+    INSERT INTO ohlc_bars
+        (symbol, timeframe, ts, open, high, low, close, tick_volume, spread, real_volume)
+    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
+    ON CONFLICT (symbol, timeframe, ts) DO UPDATE SET
+        open = EXCLUDED.open, high = EXCLUDED.high, low = EXCLUDED.low, close = EXCLUDED.close,
+        tick_volume = EXCLUDED.tick_volume, spread = EXCLUDED.spread, real_volume = EXCLUDED.real_volume
+"""
+
+
+def make_bars(n: int) -> list[dict]:
+    start = datetime(2000, 1, 1, tzinfo=timezone.utc)
+    bars = []
+    price = 1.1
+    for i in range(n):
+        price += ((i * 7919) % 13 - 6) * 1e-5
+        bars.append(
+            {
+                "symbol": SYMBOL,
+                "timeframe": TIMEFRAME,
+                "ts": start + timedelta(minutes=i),
+                "open": price,
+                "high": price + 2e-4,
+                "low": price - 2e-4,
+                "close": price + 1e-5,
+                "tick_volume": 100 + i % 50,
+                "spread": 12,
+                "real_volume": 0,
+            }
+        )
+    return bars
+
+
+async def cleanup(pool) -> None:
+    async with pool.acquire() as conn:
+        await conn.execute("DELETE FROM ohlc_bars WHERE symbol = $1", SYMBOL)
+
+
+async def run_executemany(pool, bars: list[dict]) -> None:
+    args = [
+        (b["symbol"], b["timeframe"], b["ts"], b["open"], b["high"], b["low"], b["close"],
+         b["tick_volume"], b["spread"], b["real_volume"])
+        for b in bars
+    ]
+    async with pool.acquire() as conn:
+        await conn.executemany(EXECUTEMANY_SQL, args)
+
+
+async def timed(label: str, n: int, coro) -> None:
+    t0 = time.perf_counter()
+    await coro
+    dt = time.perf_counter() - t0
+    print(f"  {label:<32} {dt:8.2f}s  {n / dt if dt else 0:12,.0f} rows/s")
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    args = parser.parse_args()
+    sizes = [int(x) for x in args.sizes.split(",") if x.strip()]
+
+    pool = await create_pool()
+    await init_schema(pool)
+    try:
+        for n in sizes:
+            bars = make_bars(n)
+            print(f"{n:,} bars")
+            for label, fn in (
+                ("executemany", lambda: run_executemany(pool, bars)),
+                ("unnest statement", lambda: upsert_ohlc_bars(pool, bars, copy=False)),
+                ("binary COPY + merge", lambda: upsert_ohlc_bars(pool, bars, copy=True)),
+            ):
+                await cleanup(pool)
+                await timed(f"{label} (fresh)", n, fn())
+                await timed(f"{label} (unchanged)", n, fn())
+            await cleanup(pool)
+    finally:
+        await cleanup(pool)
+        await pool.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(asyncio.run(main()))
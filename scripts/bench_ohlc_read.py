@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""Benchmark reading a bar range: NUMERIC + Decimal casts vs float8 storage.
+
+Creates two scratch tables shaped like ohlc_bars (prices NUMERIC vs DOUBLE
+PRECISION) in the DATABASE_URL database, fills them with synthetic bars, times
+the fetch_ohlc_bars_range read path against each plus the binary COPY column
+path used by fetch_ohlc_arrays, and drops them afterwards.
+
+    python scripts/bench_ohlc_read.py --rows 100000 --repeat 5
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+try:
+    from dotenv import load_dotenv
+except ImportError:
+    load_dotenv = None
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+if load_dotenv is not None:
+    env_path = ROOT / ".env"
+    if env_path.exists():
+        load_dotenv(env_path)
+    else:
+        load_dotenv()
+
+import asyncpg  # noqa: E402
+
+from app.bars import pgcopy_to_columns  # type: ignore  # noqa: E402
+from app.db import _init_connection, get_db_url  # type: ignore  # noqa: E402
+
+TABLES = {"numeric": "bench_ohlc_numeric", "float8": "bench_ohlc_float8"}
+
+CREATE = """
+    DROP TABLE IF EXISTS {table};
+    CREATE TABLE {table} (
+        symbol TEXT NOT NULL, timeframe TEXT NOT NULL, ts TIMESTAMPTZ NOT NULL,
+        open {price} NOT NULL, high {price} NOT NULL, low {price} NOT NULL, close {price} NOT NULL,
+        tick_volume BIGINT, spread INTEGER, real_volume BIGINT,
+        PRIMARY KEY (symbol, timeframe, ts)
+    );
+    INSERT INTO {table}
+    SELECT 'BENCH', 'M1', to_timestamp(i * 60),
+           round((1.1 + sin(i / 500.0) * 0.01)::numeric, 5), round((1.1002 + sin(i / 500.0) * 0.01)::numeric, 5),
+           round((1.0998 + sin(i / 500.0) * 0.01)::numeric, 5), round((1.1001 + sin(i / 500.0) * 0.01)::numeric, 5),
+           100 + i % 50, 12, 0
+    FROM generate_series(1, {rows}) AS i;
+    ANALYZE {table};
+"""
+
+SELECT = """
+    SELECT symbol, timeframe, ts, open, high, low, close, tick_volume, spread, real_volume
+    FROM {table}
+    WHERE symbol = 'BENCH' AND timeframe = 'M1'
+    ORDER BY ts ASC
+"""
+
+COPY_SELECT = """
+    SELECT ts, open::float8, high::float8, low::float8, close::float8,
+           COALESCE(tick_volume, 0)::int8, COALESCE(spread, 0)::int8, COALESCE(real_volume, 0)::int8
+    FROM {table}
+    WHERE symbol = 'BENCH' AND timeframe = 'M1'
+    ORDER BY ts ASC
+"""
+
+
+def rows_with_casts(records) -> list[dict]:
+    # Previous fetch_ohlc_bars_range body: Decimal -> float per row.
+    out = []
+    for rec in records:
+        row = dict(rec)
+        row["ts"] = rec["ts"].isoformat() if isinstance(rec["ts"], datetime) else str(rec["ts"])
+        for key in ("open", "high", "low", "close"):
+            if row[key] is not None:
+                row[key] = float(row[key])
+        out.append(row)
+    return out
+
+
+def rows_native(records) -> list[dict]:
+    out = []
+    for rec in records:
+        row = dict(rec)
+        row["ts"] = rec["ts"].isoformat()
+        out.append(row)
+    return out
+
+
+async def timed(conn, table: str, convert, repeat: int) -> tuple[float, float]:
+    q = SELECT.format(table=table)
+    fetch_s, total_s = [], []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        records = await conn.fetch(q)
+        t1 = time.perf_counter()
+        convert(records)
+        t2 = time.perf_counter()
+        fetch_s.append(t1 - t0)
+        total_s.append(t2 - t0)
+    return statistics.median(fetch_s), statistics.median(total_s)
+
+
+async def timed_arrays(conn, table: str, repeat: int) -> tuple[float, float]:
+    q = COPY_SELECT.format(table=table)
+    fetch_s, total_s = [], []
+    for _ in range(repeat):
+        chunks: list[bytes] = []
+
+        async def sink(chunk: bytes) -> None:
+            chunks.append(chunk)
+
+        t0 = time.perf_counter()
+        await conn.copy_from_query(q, output=sink, format="binary")
+        t1 = time.perf_counter()
+        pgcopy_to_columns(b"".join(chunks), "BENCH", "M1")
+        t2 = time.perf_counter()
+        fetch_s.append(t1 - t0)
+        total_s.append(t2 - t0)
+    return statistics.median(fetch_s), statistics.median(total_s)
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    dsn = get_db_url()
+    if not dsn:
+        print("DATABASE_URL not set", file=sys.stderr)
+        return 1
+    plain = await asyncpg.connect(dsn)
+    coded = await asyncpg.connect(dsn)
+    await _init_connection(coded)
+    try:
+        for kind, table in TABLES.items():
+            price = "NUMERIC" if kind == "numeric" else "DOUBLE PRECISION"
+            await plain.execute(CREATE.format(table=table, price=price, rows=args.rows))
+        cases = (
+            ("before: NUMERIC, Decimal + per-row casts", plain, TABLES["numeric"], rows_with_casts),
+            ("NUMERIC with float codec", coded, TABLES["numeric"], rows_native),
+            ("after: DOUBLE PRECISION", coded, TABLES["float8"], rows_native),
+        )
+        print(f"{args.rows:,} bars, median of {args.repeat}")
+        for label, conn, table, convert in cases:
+            fetch_s, total_s = await timed(conn, table, convert, args.repeat)
+            print(f"  {label:<42} fetch {fetch_s * 1000:8.1f}ms  total {total_s * 1000:8.1f}ms  {args.rows / total_s:12,.0f} rows/s")
+        fetch_s, total_s = await timed_arrays(coded, TABLES["float8"], args.repeat)
+        label = "DOUBLE PRECISION, binary COPY -> numpy"
+        print(f"  {label:<42} fetch {fetch_s * 1000:8.1f}ms  total {total_s * 1000:8.1f}ms  {args.rows / total_s:12,.0f} rows/s")
+    finally:
+        for table in TABLES.values():
+            await plain.execute(f"DROP TABLE IF EXISTS {table}")
+        await plain.close()
+        await coded.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(asyncio.run(main()))
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""Benchmark STL engines: statsmodels (robust / non-robust) vs the numpy fast engine.
+
+Fits the newest ``--points`` closes of each stored symbol/timeframe (default
+XAUUSD and EURUSD on M15, H1, H4, D1) from the DATABASE_URL database with
+every engine and reports the median fit time plus how far each result is from
+the robust statsmodels fit the app stores by default: RMSE of trend and
+seasonal (relative to the close's standard deviation) and the correlation of
+the seasonal components. ``--synthetic`` uses generated series instead of the
+database.
+
+    python scripts/bench_stl_engines.py --symbols XAUUSD,EURUSD --timeframes H1,H4
+    python scripts/bench_stl_engines.py --synthetic
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+try:
+    from dotenv import load_dotenv
+except ImportError:
+    load_dotenv = None
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+if load_dotenv is not None:
+    env_path = ROOT / ".env"
+    if env_path.exists():
+        load_dotenv(env_path)
+    else:
+        load_dotenv()
+
+from app.server import STL_PERIOD_MAP  # type: ignore  # noqa: E402
+from app.stl_worker import fit_stl  # type: ignore  # noqa: E402
+
+# (label, engine, robust); the first one is the reference.
+CASES = (
+    ("statsmodels robust", "statsmodels", True),
+    ("statsmodels", "statsmodels", False),
+    ("fast", "fast", False),
+)
+
+CLOSES = """
+    SELECT close::float8 FROM (
+        SELECT ts, close FROM ohlc_bars
+        WHERE symbol = $1 AND timeframe = $2
+        ORDER BY ts DESC
+        LIMIT $3
+    ) AS newest
+    ORDER BY ts ASC
+"""
+
+
+async def load_series(symbols: list[str], timeframes: list[str], points: int) -> list[tuple[str, str, np.ndarray]]:
+    import asyncpg
+
+    from app.db import get_db_url  # type: ignore
+
+    dsn = get_db_url()
+    if not dsn:
+        raise SystemExit("DATABASE_URL not set (use --synthetic to run without a database)")
+    conn = await asyncpg.connect(dsn)
+    out = []
+    try:
+        for symbol in symbols:
+            for tf in timeframes:
+                rows = await conn.fetch(CLOSES, symbol, tf, points)
+                values = np.array([r[0] for r in rows], dtype=np.float64)
+                values = values[np.isfinite(values)]
+                if len(values) < 24:
+                    print(f"  skip {symbol} {tf}: {len(values)} bars stored")
+                    continue
+                out.append((f"{symbol} {tf}", tf, values))
+    finally:
+        await conn.close()
+    return out
+
+
+def synthetic_series(timeframes: list[str], points: int) -> list[tuple[str, str, np.ndarray]]:
+    rng = np.random.default_rng(7)
+    out = []
+    for tf in timeframes:
+        period = STL_PERIOD_MAP.get(tf, 30)
+        t = np.arange(points, dtype=np.float64)
+        walk = np.cumsum(rng.normal(0.0, 0.4, points))
+        season = 1.5 * np.sin(2 * np.pi * t / period) * (1 + 0.3 * np.sin(2 * np.pi * t / points))
+        spikes = np.where(rng.random(points) < 0.01, rng.normal(0.0, 8.0, points), 0.0)
+        out.append((f"synthetic {tf}", tf, 2000.0 + walk + season + spikes + rng.normal(0.0, 0.3, points)))
+    return out
+
+
+def median_ms(fn, repeat: int) -> tuple[float, tuple]:
+    samples, result = [], None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples) * 1000, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", default="XAUUSD,EURUSD")
+    parser.add_argument("--timeframes", default="M15,H1,H4,D1")
+    parser.add_argument("--points", type=int, default=1500)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--synthetic", action="store_true", help="generated series instead of stored bars")
+    args = parser.parse_args()
+
+    symbols = [s.strip().upper() for s in args.symbols.split(",") if s.strip()]
+    timeframes = [tf.strip().upper() for tf in args.timeframes.split(",") if tf.strip()]
+    if args.synthetic:
+        series = synthetic_series(timeframes, args.points)
+    else:
+        series = asyncio.run(load_series(symbols, timeframes, args.points))
+    if not series:
+        print("no series to fit")
+        return 1
+
+    # Import (and warm up) statsmodels outside the timings.
+    fit_stl(series[0][2][:48], 12)
+    print(f"median of {args.repeat}; errors vs statsmodels robust, RMSE in close std units")
+    print(f"  {'series':<16} {'n':>5} {'period':>6}  {'engine':<20} {'fit':>9} {'trend':>7} {'seas.':>7} {'corr':>6}")
+    for label, tf, values in series:
+        # Same period rule as _stl_inputs.
+        period = min(max(3, STL_PERIOD_MAP.get(tf, 30)), max(3, len(values) // 2))
+        scale = float(np.std(values)) or 1.0
+        reference = None
+        for name, engine, robust in CASES:
+            ms, (trend, seasonal, _resid) = median_ms(lambda: fit_stl(values, period, robust, engine), args.repeat)
+            if reference is None:
+                reference = (trend, seasonal)
+                errors = f"{'-':>7} {'-':>7} {'-':>6}"
+            else:
+                trend_err = np.sqrt(np.mean((trend - reference[0]) ** 2)) / scale
+                seas_err = np.sqrt(np.mean((seasonal - reference[1]) ** 2)) / scale
+                corr = np.corrcoef(seasonal, reference[1])[0, 1] if np.std(seasonal) and np.std(reference[1]) else float("nan")
+                errors = f"{trend_err:>7.4f} {seas_err:>7.4f} {corr:>6.3f}"
+            print(f"  {label:<16} {len(values):>5} {period:>6}  {name:<20} {ms:>7.1f}ms {errors}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Fail if code running on the event loop in app/ calls the blocking MT5 client directly.
+
+That is every ``async def`` plus the sync entry points of Tornado handler
+classes (``get``/``post``/..., ``prepare``, websocket ``open``/``on_message``),
+which Tornado also runs on the loop. There the terminal must be reached
+through the awaitable facade (``mt5_async``), which runs the call on the MT5
+bridge thread. Calls
+passed by reference (``mt5_bridge.call(mt5_client.fetch_bars, ...)``) and
+plain attribute reads (``mt5_client.current_login``) are fine, as are the
+client methods in NON_BLOCKING_METHODS that only read in-process state; nested
+sync functions and lambdas are skipped because they run wherever they are sent.
+
+    python scripts/test_mt5_async_facade.py
+    python -m pytest scripts/test_mt5_async_facade.py
+"""
+from __future__ import annotations
+
+import ast
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+BLOCKING_NAMES = {"mt5_client"}
+# Client methods that never reach the terminal (snapshot cache reads and counters).
+NON_BLOCKING_METHODS = {"snapshot_stats", "cached_snapshot"}
+# Handler methods Tornado calls on the IOLoop.
+HANDLER_METHODS = {"get", "post", "put", "patch", "delete", "head", "options", "prepare", "open", "on_message"}
+HANDLER_BASES = ("RequestHandler", "WebSocketHandler", "StaticFileHandler")
+
+
+def _root_name(node: ast.AST) -> str | None:
+    while isinstance(node, ast.Attribute):
+        node = node.value
+    return node.id if isinstance(node, ast.Name) else None
+
+
+def _handler_methods(tree: ast.Module):
+    """Sync request/websocket entry points of handler classes (bases resolved within the file)."""
+    classes = {node.name: node for node in ast.walk(tree) if isinstance(node, ast.ClassDef)}
+    handlers: set[str] = set()
+    changed = True
+    while changed:
+        changed = False
+        for name, cls in classes.items():
+            if name in handlers:
+                continue
+            bases = [ast.unparse(base) for base in cls.bases]
+            if any(b.endswith(HANDLER_BASES) or b.split(".")[-1] in handlers for b in bases):
+                handlers.add(name)
+                changed = True
+    for name in handlers:
+        for node in classes[name].body:
+            if isinstance(node, ast.FunctionDef) and node.name in HANDLER_METHODS:
+                yield classes[name], node
+
+
+def _blocking_calls(fn: ast.AsyncFunctionDef | ast.FunctionDef):
+    stack = list(fn.body)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (ast.FunctionDef, ast.Lambda, ast.ClassDef)):
+            continue
+        if isinstance(node, ast.AsyncFunctionDef):
+            continue  # visited on its own
+        if (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Attribute)
+            and _root_name(node.func) in BLOCKING_NAMES
+            and node.func.attr not in NON_BLOCKING_METHODS
+        ):
+            yield node
+        stack.extend(ast.iter_child_nodes(node))
+
+
+def check_file(path: Path) -> list[str]:
+    tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+    problems = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.AsyncFunctionDef):
+            continue
+        for call in _blocking_calls(node):
+            problems.append(
+                f"{path.relative_to(ROOT)}:{call.lineno}: {ast.unparse(call.func)}() called in async def {node.name}"
+            )
+    for cls, node in _handler_methods(tree):
+        for call in _blocking_calls(node):
+            problems.append(
+                f"{path.relative_to(ROOT)}:{call.lineno}: {ast.unparse(call.func)}() called in {cls.name}.{node.name}"
+            )
+    return problems
+
+
+def find_problems() -> list[str]:
+    problems: list[str] = []
+    for path in sorted((ROOT / "app").glob("*.py")):
+        problems.extend(check_file(path))
+    return sorted(problems)
+
+
+def test_no_blocking_mt5_calls_on_event_loop():
+    problems = find_problems()
+    assert not problems, "blocking MT5 calls on the event loop; use mt5_async instead:\n" + "\n".join(problems)
+
+
+def main() -> int:
+    problems = find_problems()
+    for line in problems:
+        print(line)
+    if problems:
+        print(f"{len(problems)} blocking MT5 call(s) on the event loop; use mt5_async instead", file=sys.stderr)
+        return 1
+    print("ok: no blocking MT5 calls on the event loop")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,12 +1,13 @@
--- Simple OHLC bars storage
+-- Simple OHLC bars storage (prices as float8, the MT5 source type;
+-- older NUMERIC tables are migrated online by app.db.migrate_ohlc_bars_to_float)
 CREATE TABLE IF NOT EXISTS ohlc_bars (
     symbol       TEXT        NOT NULL,
     timeframe    TEXT        NOT NULL,
     ts           TIMESTAMPTZ NOT NULL,
-    open         NUMERIC     NOT NULL,
-    high         NUMERIC     NOT NULL,
-    low          NUMERIC     NOT NULL,
-    close        NUMERIC     NOT NULL,
+    open         DOUBLE PRECISION NOT NULL,
+    high         DOUBLE PRECISION NOT NULL,
+    low          DOUBLE PRECISION NOT NULL,
+    close        DOUBLE PRECISION NOT NULL,
     tick_volume  BIGINT,
     spread       INTEGER,
     real_volume  BIGINT,
@@ -37,6 +38,16 @@ CREATE TABLE IF NOT EXISTS stl_runs (
 CREATE INDEX IF NOT EXISTS idx_stl_runs_symbol_tf_created
     ON stl_runs(symbol, timeframe, created_at DESC);
 
+-- Hash of the fit inputs (app.stl_worker.stl_fingerprint); a recompute with
+-- the same fingerprint reuses the run. NULL for runs stored before it existed.
+ALTER TABLE stl_runs ADD COLUMN IF NOT EXISTS fingerprint TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_stl_runs_fingerprint
+    ON stl_runs(symbol, timeframe, fingerprint);
+
+-- Decomposition engine that produced the run (app.stl_worker.STL_ENGINES).
+ALTER TABLE stl_runs ADD COLUMN IF NOT EXISTS engine TEXT NOT NULL DEFAULT 'statsmodels';
+
 CREATE TABLE IF NOT EXISTS stl_run_components (
     run_id    BIGINT        NOT NULL REFERENCES stl_runs(id) ON DELETE CASCADE,
     ts        TIMESTAMPTZ   NOT NULL,
@@ -50,6 +61,26 @@ CREATE TABLE IF NOT EXISTS stl_run_components (
 CREATE INDEX IF NOT EXISTS idx_stl_run_components_run_ts
     ON stl_run_components(run_id, ts DESC);
 
+-- Packed STL components: one row per run, each column little-endian
+-- (ts int64 epoch seconds, the rest float8) in the layout app.wire serves.
+-- stl_run_components above is only read for runs written before this table.
+CREATE TABLE IF NOT EXISTS stl_run_arrays (
+    run_id    BIGINT PRIMARY KEY REFERENCES stl_runs(id) ON DELETE CASCADE,
+    ts        BYTEA NOT NULL,
+    close     BYTEA NOT NULL,
+    trend     BYTEA NOT NULL,
+    seasonal  BYTEA NOT NULL,
+    resid     BYTEA NOT NULL
+);
+
+-- Float arrays barely compress; store them out of line without trying.
+ALTER TABLE stl_run_arrays
+    ALTER COLUMN ts SET STORAGE EXTERNAL,
+    ALTER COLUMN close SET STORAGE EXTERNAL,
+    ALTER COLUMN trend SET STORAGE EXTERNAL,
+    ALTER COLUMN seasonal SET STORAGE EXTERNAL,
+    ALTER COLUMN resid SET STORAGE EXTERNAL;
+
 
 -- News articles storage
 CREATE TABLE IF NOT EXISTS news_articles (
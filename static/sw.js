@@ -1,15 +1,11 @@
-// Very small service worker: cache shell assets; network-first for API
-const CACHE_NAME = 'microquant-v1';
-const SHELL = [
-  '/',
-  '/app',
-  '/static/manifest.webmanifest',
-  '/static/logo.png',
-  '/static/favicon.ico'
-];
+// Small service worker, served from /sw.js with the hashed shell assets filled in.
+// Versioned static URLs never change content, so they are cache-first; pages are
+// network-first (they embed per-user defaults) and only fall back to cache offline.
+const PRECACHE = __PRECACHE__;
+const CACHE_NAME = 'microquant-__BUILD__';
 
 self.addEventListener('install', (event) => {
-  event.waitUntil(caches.open(CACHE_NAME).then(c => c.addAll(SHELL)));
+  event.waitUntil(caches.open(CACHE_NAME).then(c => c.addAll(PRECACHE)));
   self.skipWaiting();
 });
 
@@ -21,17 +17,32 @@ self.addEventListener('activate', (event) => {
 });
 
 self.addEventListener('fetch', (event) => {
+  if (event.request.method !== 'GET') return;
   const url = new URL(event.request.url);
-  if (url.pathname.startsWith('/api/')) {
-    // Network-first for dynamic data
+  if (url.origin !== self.location.origin || url.pathname.startsWith('/api/') || url.pathname.startsWith('/ws/')) {
+    return; // dynamic data: straight to the network
+  }
+  if (url.pathname.startsWith('/static/') && url.searchParams.has('v')) {
     event.respondWith(
-      fetch(event.request).catch(() => caches.match(event.request))
+      caches.match(event.request).then((hit) => hit || fetch(event.request).then((resp) => {
+        if (resp.ok) {
+          const copy = resp.clone();
+          caches.open(CACHE_NAME).then(c => c.put(event.request, copy));
+        }
+        return resp;
+      }))
     );
     return;
   }
-  // Cache-first for shell/static
-  event.respondWith(
-    caches.match(event.request).then((resp) => resp || fetch(event.request))
-  );
+  if (event.request.mode === 'navigate') {
+    event.respondWith(
+      fetch(event.request).then((resp) => {
+        if (resp.ok) {
+          const copy = resp.clone();
+          caches.open(CACHE_NAME).then(c => c.put(event.request, copy));
+        }
+        return resp;
+      }).catch(() => caches.match(event.request))
+    );
+  }
 });
-